@@ -0,0 +1,66 @@
+"""Fixtures for the benchmark suite (run with ``tox -e benchmarks``)."""
+
+from pathlib import Path
+
+from gate import calibrate
+import pytest
+
+from rst_to_myst.corpus import generate_document
+from rst_to_myst.namespace import compile_namespace
+
+TEXTS_PATH = Path(__file__).parent.parent / "tests" / "texts"
+TEXTS = sorted(TEXTS_PATH.glob("*.rst"))
+
+
+@pytest.fixture(scope="session")
+def namespace():
+    """The namespace of directives/roles, compiled once for all benchmarks."""
+    return compile_namespace(use_sphinx=True)
+
+
+@pytest.fixture(params=TEXTS, ids=[path.stem for path in TEXTS])
+def text(request) -> str:
+    """The text of each bundled RST file."""
+    return request.param.read_text("utf8")
+
+
+# a minimal document, to which a single feature is added
+MINIMAL = {
+    "sections": 0,
+    "paragraphs": 1,
+    "list_items": 0,
+    "tables": 0,
+    "footnotes": 0,
+    "citations": 0,
+    "substitutions": 0,
+    "links": 0,
+    "directives": 0,
+    "roles": 0,
+}
+
+# feature -> generate_document counts, for a scale
+FEATURES = {
+    "paragraphs": lambda scale: {"paragraphs": scale},
+    "sections": lambda scale: {"sections": scale, "section_depth": 3},
+    "list_nesting": lambda scale: {"list_items": 1, "list_depth": scale},
+    "table_rows": lambda scale: {"tables": 1, "table_rows": scale},
+    "directives": lambda scale: {"directives": scale},
+    "roles": lambda scale: {"roles": scale},
+}
+
+
+def generate(feature: str, scale: int) -> str:
+    """Generate an RST document, scaled by a count of a single feature."""
+    return generate_document(**{**MINIMAL, **FEATURES[feature](scale)})
+
+
+def pytest_configure(config):
+    config._calibration = calibrate()
+
+
+def pytest_benchmark_update_json(config, benchmarks, output_json):
+    """Record the machine speed, to normalise by when comparing to the baseline.
+
+    This is measured at the start and end of the session, to reduce noise.
+    """
+    output_json["calibration"] = min(config._calibration, calibrate())
@@ -0,0 +1,198 @@
+"""Compare benchmark results against a stored baseline, failing on regressions.
+
+Run the benchmarks, saving the results as JSON, then compare them::
+
+    pytest benchmarks --benchmark-json=.benchmarks/current.json
+    python benchmarks/gate.py .benchmarks/current.json
+
+On noisy machines, results of several runs can be given,
+and the minimum time of each benchmark across the runs is compared.
+Times are normalised by a calibration loop (recorded in the results by the
+``pytest_benchmark_update_json`` hook in ``conftest.py``),
+so that a baseline recorded on one machine can be compared on another.
+To update the baseline (keeping any per-benchmark tolerances)::
+
+    python benchmarks/gate.py .benchmarks/current.json --update
+"""
+
+import argparse
+import json
+from pathlib import Path
+import sys
+import time
+from typing import Any, Optional
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+DEFAULT_TOLERANCE = 0.3
+
+
+def echo(text: str) -> None:
+    print(text)  # noqa: T201
+
+
+def calibrate(repeat: int = 30) -> float:
+    """Time a fixed pure-Python workload (best of ``repeat``, in seconds).
+
+    The workload (string splitting/joining, dict and list operations)
+    is similar to that of parsing and rendering,
+    so that its time is roughly proportional to the benchmark times on a machine.
+    Many short repeats make the minimum robust to interruptions by other processes.
+    """
+    line = "A *paragraph* with ``literal`` text and a :role:`target` in it"
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        counts: dict[str, int] = {}
+        for index in range(5000):
+            words = line.split()
+            for word in words:
+                counts[word] = counts.get(word, 0) + index % 3
+            "-".join(sorted(words)).upper()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def load_results(paths: list[Path]) -> tuple[dict[str, float], float]:
+    """Load pytest-benchmark JSON results, of one or more runs.
+
+    The minimum of each benchmark (and the calibration) across runs is taken,
+    which reduces the noise on shared/virtual machines.
+
+    :returns: (benchmark name -> minimum time, calibration time)
+    """
+    times: dict[str, float] = {}
+    calibrations = []
+    for path in paths:
+        data = json.loads(path.read_text("utf8"))
+        for bench in data["benchmarks"]:
+            name, value = bench["fullname"], bench["stats"]["min"]
+            times[name] = min(value, times.get(name, value))
+        if "calibration" in data:
+            calibrations.append(data["calibration"])
+    if not calibrations:
+        echo("No calibration in results, calibrating now")
+        calibrations.append(calibrate())
+    return times, min(calibrations)
+
+
+def compare(
+    times: dict[str, float], calibration: float, baseline: dict[str, Any]
+) -> list[dict[str, Any]]:
+    """Compare normalised times against the baseline.
+
+    :returns: A row per benchmark in both, sorted by worst ratio first
+    """
+    default_tolerance = baseline.get("tolerance", DEFAULT_TOLERANCE)
+    rows = []
+    for name, value in times.items():
+        base = baseline["benchmarks"].get(name)
+        if base is None:
+            continue
+        ratio = (value / calibration) / (base["time"] / baseline["calibration"])
+        tolerance = base.get("tolerance", default_tolerance)
+        rows.append(
+            {
+                "name": name,
+                "baseline": base["time"],
+                "current": value,
+                "ratio": ratio,
+                "tolerance": tolerance,
+                "regression": ratio > 1 + tolerance,
+            }
+        )
+    return sorted(rows, key=lambda row: -row["ratio"])
+
+
+def format_table(rows: list[dict[str, Any]], top: int) -> str:
+    """Format the worst ``top`` rows as a table."""
+    width = max([len(row["name"]) for row in rows[:top]] + [9])
+    lines = [
+        f"{'benchmark':<{width}}  {'base ms':>9}  {'now ms':>9}  {'ratio':>6}  {'tol':>5}"
+    ]
+    lines.extend(
+        f"{row['name']:<{width}}  {row['baseline'] * 1000:>9.3f}"
+        f"  {row['current'] * 1000:>9.3f}  {row['ratio']:>6.2f}"
+        f"  {row['tolerance']:>5.0%}" + ("  REGRESSION" if row["regression"] else "")
+        for row in rows[:top]
+    )
+    return "\n".join(lines)
+
+
+def update_baseline(
+    path: Path,
+    times: dict[str, float],
+    calibration: float,
+    baseline: Optional[dict[str, Any]],
+) -> None:
+    """Write the results as the new baseline, keeping per-benchmark tolerances."""
+    old = baseline["benchmarks"] if baseline else {}
+    data = {
+        "tolerance": baseline.get("tolerance", DEFAULT_TOLERANCE)
+        if baseline
+        else DEFAULT_TOLERANCE,
+        "calibration": calibration,
+        "benchmarks": {
+            name: {
+                "time": value,
+                **(
+                    {"tolerance": old[name]["tolerance"]}
+                    if "tolerance" in old.get(name, {})
+                    else {}
+                ),
+            }
+            for name, value in sorted(times.items())
+        },
+    }
+    path.write_text(json.dumps(data, indent=2) + "\n", "utf8")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "results", type=Path, nargs="+", help="pytest-benchmark JSON results"
+    )
+    parser.add_argument(
+        "--baseline", type=Path, default=BASELINE_PATH, help="Baseline JSON"
+    )
+    parser.add_argument(
+        "--top", type=int, default=10, help="Number of worst benchmarks to show"
+    )
+    parser.add_argument(
+        "--update", action="store_true", help="Write the results as the baseline"
+    )
+    args = parser.parse_args(argv)
+
+    times, calibration = load_results(args.results)
+    baseline = (
+        json.loads(args.baseline.read_text("utf8")) if args.baseline.exists() else None
+    )
+    if args.update:
+        update_baseline(args.baseline, times, calibration, baseline)
+        echo(f"Updated baseline: {args.baseline}")
+        return 0
+    if baseline is None:
+        echo(f"No baseline found: {args.baseline}")
+        return 1
+
+    rows = compare(times, calibration, baseline)
+    echo(
+        f"calibration: {calibration * 1000:.1f} ms "
+        f"(baseline {baseline['calibration'] * 1000:.1f} ms)"
+    )
+    echo(format_table(rows, args.top))
+    missing = sorted(set(baseline["benchmarks"]).difference(times))
+    new = sorted(set(times).difference(baseline["benchmarks"]))
+    if missing:
+        echo(f"Not run (in baseline): {len(missing)}")
+    if new:
+        echo(f"Not in baseline: {len(new)}")
+    regressions = [row for row in rows if row["regression"]]
+    if regressions:
+        echo(f"FAILED: {len(regressions)} regressions")
+        return 1
+    echo(f"PASSED: {len(rows)} benchmarks within tolerance")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""Gate the work done by a conversion, over generated documents.
+
+The function calls made by each conversion are counted (with ``sys.setprofile``),
+and gated against a ceiling, proportional to the size of the input.
+Unlike times, the counts are deterministic (for a given Python and dependencies),
+so a regression fails reliably.
+"""
+
+import sys
+
+from conftest import generate
+import pytest
+
+from rst_to_myst import rst_to_myst
+
+# feature -> scale
+SCALES = {
+    "paragraphs": 100,
+    "sections": 100,
+    "list_nesting": 20,
+    "table_rows": 100,
+    "directives": 100,
+    "roles": 100,
+}
+
+# feature -> ceiling of the calls per input character
+# (around 1.25x that measured, on Python 3.11)
+CALLS_PER_CHAR = {
+    "paragraphs": 10,
+    "sections": 14,
+    "list_nesting": 64,
+    "table_rows": 43,
+    "directives": 49,
+    "roles": 16,
+}
+
+
+def count_calls(func, *args, **kwargs) -> int:
+    """Count the (Python and builtin) function calls made by a function call."""
+    calls = 0
+
+    def profile(frame, event, arg):
+        nonlocal calls
+        if event in ("call", "c_call"):
+            calls += 1
+
+    sys.setprofile(profile)
+    try:
+        func(*args, **kwargs)
+    finally:
+        sys.setprofile(None)
+    return calls
+
+
+@pytest.mark.parametrize(("feature", "scale"), SCALES.items())
+def test_calls(namespace, feature, scale):
+    text = generate(feature, scale)
+    # warm up, so that one-off work (e.g. imports and caches) is not counted
+    rst_to_myst(text, namespace=namespace)
+    calls = count_calls(rst_to_myst, text, namespace=namespace)
+    ceiling = CALLS_PER_CHAR[feature] * len(text)
+    assert calls <= ceiling, f"{calls} calls for {len(text)} characters"
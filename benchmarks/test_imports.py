@@ -0,0 +1,45 @@
+"""Benchmarks of the startup time of the CLI, against that of the converter.
+
+Each benchmark times a fresh interpreter importing the module,
+and the cumulative import time of the module (from ``python -X importtime``)
+is recorded in the ``extra_info`` of the benchmark (in the JSON results).
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+
+def import_times(statement: str) -> dict[str, int]:
+    """Run a statement in a fresh interpreter, with ``-X importtime``.
+
+    :returns: mapping of module name -> cumulative import time (us)
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize("module", ["rst_to_myst.cli", "rst_to_myst.mdformat_render"])
+def test_import(benchmark, module):
+    statement = f"import {module}"
+    # warm up, so that bytecode is cached
+    import_times(statement)
+    results = []
+    benchmark.pedantic(
+        lambda: results.append(import_times(statement)[module]),
+        rounds=10,
+        iterations=1,
+    )
+    benchmark.extra_info.update(module=module, import_us=min(results))
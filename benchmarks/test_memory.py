@@ -0,0 +1,56 @@
+"""Benchmarks of memory-profiled conversion, over generated documents.
+
+The peak traced memory of each conversion is gated against a ceiling,
+proportional to the size of the input,
+and the peak and retained memory of each stage are recorded in the ``extra_info``
+of each benchmark (in the JSON results).
+These benchmarks are not in the timing baseline,
+since their time only measures the overhead of tracing.
+"""
+
+from conftest import generate
+import pytest
+
+from rst_to_myst import rst_to_myst
+
+# feature -> scale (smaller than for timing, since tracing is slow)
+SCALES = {
+    "paragraphs": 100,
+    "sections": 100,
+    "list_nesting": 20,
+    "table_rows": 100,
+    "directives": 100,
+    "roles": 100,
+}
+
+# feature -> ceiling of the peak memory, in bytes per input character
+# (around 1.5x that measured, on Python 3.11)
+PEAK_PER_CHAR = {
+    "paragraphs": 110,
+    "sections": 160,
+    "list_nesting": 800,
+    "table_rows": 375,
+    "directives": 240,
+    "roles": 230,
+}
+
+
+@pytest.mark.parametrize(("feature", "scale"), SCALES.items())
+def test_memory(benchmark, namespace, feature, scale):
+    text = generate(feature, scale)
+    # warm up, so that one-off allocations (e.g. imports) are not included
+    rst_to_myst(text, namespace=namespace)
+    output = benchmark(rst_to_myst, text, namespace=namespace, memprofile=True)
+    benchmark.extra_info.update(
+        feature=feature,
+        scale=scale,
+        input_bytes=len(text),
+        peak_bytes=output.memory.peak,
+        retained_bytes=output.memory.retained,
+        stages={
+            stage.name: {"peak": stage.peak, "retained": stage.retained}
+            for stage in output.memory.stages
+        },
+    )
+    ceiling = PEAK_PER_CHAR[feature] * len(text)
+    assert output.memory.peak <= ceiling, output.memory.format()
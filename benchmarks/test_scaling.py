@@ -0,0 +1,26 @@
+"""Benchmarks of end-to-end conversion, over generated documents of increasing size."""
+
+from conftest import generate
+import pytest
+
+from rst_to_myst import rst_to_myst
+
+# feature -> scales (list nesting is limited by the recursion limit)
+SCALES = {
+    "paragraphs": (10, 100, 300),
+    "sections": (10, 100, 300),
+    "list_nesting": (5, 20, 50),
+    "table_rows": (10, 100, 300),
+    "directives": (10, 100, 300),
+    "roles": (10, 100, 300),
+}
+
+
+@pytest.mark.parametrize(
+    ("feature", "scale"),
+    [(feature, scale) for feature, scales in SCALES.items() for scale in scales],
+)
+def test_scaling(benchmark, namespace, feature, scale):
+    text = generate(feature, scale)
+    benchmark.extra_info.update(feature=feature, scale=scale, input_bytes=len(text))
+    benchmark(rst_to_myst, text, namespace=namespace)
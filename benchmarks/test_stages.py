@@ -0,0 +1,25 @@
+"""Benchmarks of each stage of the conversion, over the bundled test texts."""
+
+from rst_to_myst import rst_to_myst, to_docutils_ast
+from rst_to_myst.markdownit import MarkdownItRenderer
+from rst_to_myst.mdformat_render import from_tokens
+
+
+def test_parse(benchmark, namespace, text):
+    benchmark(to_docutils_ast, text, namespace=namespace)
+
+
+def test_to_tokens(benchmark, namespace, text):
+    document, _ = to_docutils_ast(text, namespace=namespace)
+    renderer = MarkdownItRenderer(document)
+    benchmark(renderer.to_tokens)
+
+
+def test_from_tokens(benchmark, namespace, text):
+    document, _ = to_docutils_ast(text, namespace=namespace)
+    output = MarkdownItRenderer(document).to_tokens()
+    benchmark(from_tokens, output)
+
+
+def test_rst_to_myst(benchmark, namespace, text):
+    benchmark(rst_to_myst, text, namespace=namespace)
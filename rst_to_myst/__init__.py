@@ -1,9 +1,49 @@
 """Convert RST to MyST-Markdown."""
 
-from .mdformat_render import rst_to_myst
-from .namespace import compile_namespace
-from .parser import to_docutils_ast
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
 
-__all__ = ("compile_namespace", "rst_to_myst", "to_docutils_ast")
+if TYPE_CHECKING:
+    from .aio import rst_to_myst_async
+    from .cache import ResultCache
+    from .converter import Converter
+    from .mdformat_render import rst_to_myst
+    from .namespace import compile_namespace
+    from .parser import to_docutils_ast
+    from .pool import ConversionPool
+
+__all__ = (
+    "ConversionPool",
+    "Converter",
+    "ResultCache",
+    "compile_namespace",
+    "rst_to_myst",
+    "rst_to_myst_async",
+    "to_docutils_ast",
+)
 
 __version__ = "0.4.0"
+
+# the public API is imported on first access (PEP 562),
+# since docutils, mdformat, etc are slow to import
+_LAZY_IMPORTS = {
+    "ConversionPool": ".pool",
+    "Converter": ".converter",
+    "ResultCache": ".cache",
+    "compile_namespace": ".namespace",
+    "rst_to_myst": ".mdformat_render",
+    "rst_to_myst_async": ".aio",
+    "to_docutils_ast": ".parser",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_LAZY_IMPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
@@ -0,0 +1,121 @@
+"""Asyncio API, running conversions in a thread or process executor."""
+
+import asyncio
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from concurrent.futures import Executor
+from functools import partial
+from typing import Any, Optional, TypeVar, Union
+
+from .converter import get_converter
+from .mdformat_render import ConvertedOutput
+
+K = TypeVar("K")
+
+
+def _convert(
+    text: str, options: dict[str, Any], profile: bool, memprofile: bool
+) -> ConvertedOutput:
+    """Convert in the executor,
+    reusing the (warm) converter of the worker thread/process for the options."""
+    return get_converter(**options).convert(
+        text, profile=profile, memprofile=memprofile
+    )
+
+
+async def rst_to_myst_async(
+    text: str,
+    *,
+    executor: Optional[Executor] = None,
+    profile: bool = False,
+    memprofile: bool = False,
+    **options: Any,
+) -> ConvertedOutput:
+    """Convert RST text to MyST Markdown text, in an executor.
+
+    If the task is cancelled before the conversion starts, it is not run
+    (a conversion that has already started runs to completion in the executor).
+
+    :param text: The input RST text
+    :param executor: A thread or process pool executor to convert in,
+        otherwise the default executor of the event loop
+    :param profile: Record the time taken by each stage, in ``output.timings``
+    :param memprofile: Record the memory allocated by each stage, in ``output.memory``
+    :param options: Keyword arguments for ``Converter``
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor, partial(_convert, text, options, profile, memprofile)
+    )
+
+
+async def _aiter(
+    items: Union[Iterable[tuple[K, str]], AsyncIterable[tuple[K, str]]],
+) -> AsyncIterator[tuple[K, str]]:
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def convert_many(
+    items: Union[Iterable[tuple[K, str]], AsyncIterable[tuple[K, str]]],
+    *,
+    executor: Optional[Executor] = None,
+    concurrency: int = 4,
+    return_exceptions: bool = False,
+    profile: bool = False,
+    memprofile: bool = False,
+    **options: Any,
+) -> AsyncIterator[tuple[K, Union[ConvertedOutput, BaseException]]]:
+    """Convert ``(key, text)`` items, yielding ``(key, output)`` as they complete.
+
+    Items are consumed lazily (from an iterable or async iterable),
+    with at most ``concurrency`` conversions in flight,
+    so that a slow consumer holds up the reading of further items.
+    If the iteration is stopped (e.g. the task is cancelled, or the generator closed),
+    the pending conversions are cancelled.
+
+    :param executor: A thread or process pool executor to convert in,
+        otherwise the default executor of the event loop
+    :param concurrency: The maximum number of conversions in flight
+    :param return_exceptions: Yield the exception of a failed conversion
+        as its output, otherwise it is raised
+    :param profile: Record the time taken by each stage, in ``output.timings``
+    :param memprofile: Record the memory allocated by each stage, in ``output.memory``
+    :param options: Keyword arguments for ``Converter``
+    """
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1: {concurrency}")
+    loop = asyncio.get_running_loop()
+    iterator = _aiter(items)
+    keys: dict[asyncio.Future, K] = {}
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(keys) < concurrency:
+                try:
+                    key, text = await iterator.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                future = loop.run_in_executor(
+                    executor, partial(_convert, text, options, profile, memprofile)
+                )
+                keys[future] = key
+            if not keys:
+                return
+            done, _ = await asyncio.wait(keys, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                key = keys.pop(future)
+                exception = future.exception()
+                if exception is None:
+                    yield key, future.result()
+                elif return_exceptions:
+                    yield key, exception
+                else:
+                    raise exception
+    finally:
+        for future in keys:
+            future.cancel()
@@ -0,0 +1,112 @@
+"""Batch conversion of newline-delimited JSON (NDJSON) documents."""
+
+from collections import deque
+from collections.abc import Iterable, Iterator, Mapping
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from functools import partial
+import json
+from typing import IO, Any, Callable, Optional, TypeVar
+
+from .options import CLI_DEFAULTS, conversion_options
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def bounded_map(
+    executor: Executor,
+    func: Callable[[T], R],
+    items: Iterable[T],
+    *,
+    window: int,
+    ordered: bool = True,
+) -> Iterator[R]:
+    """Lazily map a function over items with an executor, yielding the results.
+
+    Unlike ``Executor.map``, items are consumed lazily,
+    with at most ``window`` pending at any time (providing backpressure).
+
+    :param ordered: Yield results in the order of the items,
+        otherwise yield results as they complete
+    """
+    pending: deque[Future] = deque()
+    for item in items:
+        pending.append(executor.submit(func, item))
+        if len(pending) < window:
+            continue
+        if ordered:
+            yield pending.popleft().result()
+        else:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.remove(future)
+                yield future.result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def convert_record(line: str, defaults: Mapping[str, Any]) -> dict[str, Any]:
+    """Convert a single NDJSON record ``{id, text, options?}``.
+
+    :param line: The JSON line
+    :param defaults: Default CLI / configuration options,
+        which are overridden by the record's ``options``
+    :returns: ``{id, text, extensions, warnings}`` or ``{id, error}``
+    """
+    from .server import run_request
+
+    record_id = None
+    try:
+        record = json.loads(line)
+        if not isinstance(record, dict):
+            raise TypeError("record is not an object")
+        record_id = record.get("id")
+        if not isinstance(record.get("text"), str):
+            raise TypeError("record 'text' is not a string")
+        options = record.get("options") or {}
+        if not isinstance(options, dict):
+            raise TypeError("record 'options' is not an object")
+        unknown = set(options).difference(CLI_DEFAULTS)
+        if unknown:
+            raise KeyError(f"Unknown options: {sorted(unknown)}")
+        result = run_request(
+            "convert",
+            record["text"],
+            conversion_options(**{**CLI_DEFAULTS, **defaults, **options}),
+        )
+    except Exception as exc:
+        return {"id": record_id, "error": f"{type(exc).__name__}: {exc}"}
+    return {"id": record_id, **result}
+
+
+def convert_ndjson(
+    instream: IO[str],
+    outstream: IO[str],
+    defaults: Mapping[str, Any],
+    *,
+    executor: Optional[Executor] = None,
+    window: int = 1,
+    ordered: bool = True,
+) -> None:
+    """Convert NDJSON records from an input stream, writing results to an output.
+
+    :param defaults: Default CLI / configuration options for all records
+    :param executor: Convert records in parallel with this executor,
+        otherwise convert them sequentially in this thread
+    :param window: The maximum number of records pending in the executor
+    :param ordered: Write results in the order of the input,
+        otherwise as they complete (use the ``id`` to match them)
+    """
+    lines = (line for line in instream if line.strip())
+    if executor is None:
+        results = (convert_record(line, defaults) for line in lines)
+    else:
+        results = bounded_map(
+            executor,
+            partial(convert_record, defaults=dict(defaults)),
+            lines,
+            window=window,
+            ordered=ordered,
+        )
+    for result in results:
+        outstream.write(json.dumps(result) + "\n")
@@ -0,0 +1,230 @@
+"""Content-hash caches of conversions:
+of files (to skip unchanged files), and of results in memory."""
+
+from collections import OrderedDict
+from collections.abc import Mapping
+import hashlib
+import json
+import os
+from pathlib import Path
+import pickle
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Optional, Union
+
+from .files import atomic_write
+
+if TYPE_CHECKING:
+    from .diagnostics import DiagnosticCollector
+    from .mdformat_render import ConvertedOutput
+
+
+def hash_bytes(data: bytes) -> str:
+    """Return the hex digest of some bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def options_digest(options: Mapping[str, Any]) -> str:
+    """Return a digest of the conversion options and package version.
+
+    Any change to the options (including the Sphinx extensions loaded,
+    which determine the namespace of directives/roles) invalidates cached entries.
+    """
+    from . import __version__
+
+    data = json.dumps(
+        {"version": __version__, "options": options}, sort_keys=True, default=str
+    )
+    return hash_bytes(data.encode("utf8"))
+
+
+class ConversionCache:
+    """A manifest of previous conversions, stored in a cache directory.
+
+    Each entry is keyed on the input file path,
+    and records a key combining the input content hash and the options digest.
+    """
+
+    manifest_name = "manifest.json"
+
+    def __init__(self, directory: Union[str, Path], options: Mapping[str, Any]):
+        """Initialise the cache, loading any existing manifest.
+
+        :param directory: The cache directory (created on save)
+        :param options: The conversion options
+        """
+        self.directory = Path(directory)
+        self.digest = options_digest(options)
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict[str, dict[str, Any]] = {}
+        try:
+            with self.directory.joinpath(self.manifest_name).open(
+                encoding="utf8"
+            ) as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            data = {}
+        if isinstance(data, dict) and isinstance(data.get("entries"), dict):
+            self._entries = data["entries"]
+
+    def key(self, content: bytes) -> str:
+        """Return the cache key for some input content."""
+        return hash_bytes(content + self.digest.encode("utf8"))
+
+    def lookup(
+        self,
+        path: Union[str, Path],
+        key: str,
+        output_path: Optional[Union[str, Path]] = None,
+    ) -> Optional[dict[str, Any]]:
+        """Return the entry for a path, if its key matches, and record a hit/miss.
+
+        :param output_path: The output of the conversion,
+            which must exist for a hit (otherwise the file must be converted again)
+        """
+        entry = self._entries.get(os.path.abspath(path))  # noqa: PTH100
+        if (
+            entry is not None
+            and entry.get("key") == key
+            and (output_path is None or os.path.exists(output_path))  # noqa: PTH110
+        ):
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
+
+    def get(self, path: Union[str, Path]) -> Optional[dict[str, Any]]:
+        """Return the entry for a path, regardless of its key (and not a hit/miss)."""
+        return self._entries.get(os.path.abspath(path))  # noqa: PTH100
+
+    def store(self, path: Union[str, Path], key: str, **data: Any) -> None:
+        """Store an entry for a path."""
+        self._entries[os.path.abspath(path)] = {"key": key, **data}  # noqa: PTH100
+
+    def save(self) -> None:
+        """Write the manifest to the cache directory."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        atomic_write(
+            self.directory.joinpath(self.manifest_name),
+            json.dumps({"entries": self._entries}).encode("utf8"),
+        )
+
+
+class ResultCache:
+    """A bounded, in-memory LRU cache of conversion outputs.
+
+    Entries are keyed on a hash of the text and the (full) conversion options,
+    and the least recently used entries are evicted
+    to keep within a maximum number of entries and total size in bytes.
+    Outputs are stored pickled, so that each hit returns a new copy,
+    and callers cannot modify the cached tokens/env.
+    The cache is thread-safe, and can be shared by converters with different options.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024**2):
+        """Initialise the cache.
+
+        :param max_entries: The maximum number of cached outputs
+        :param max_bytes: The maximum total size of the cached (pickled) outputs;
+            outputs larger than this are not cached
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        """The total size of the cached outputs."""
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(entries={len(self)}, bytes={self.bytes}, "
+            f"hits={self.hits}, misses={self.misses})"
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(self, text: str, options: Mapping[str, Any]) -> str:
+        """Return the cache key for a text and the conversion options."""
+        return hash_bytes(text.encode("utf8") + options_digest(options).encode("utf8"))
+
+    def get(self, key: str) -> Optional["ConvertedOutput"]:
+        """Return a copy of the cached output, and record a hit/miss."""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return pickle.loads(data)
+
+    def put(self, key: str, output: "ConvertedOutput") -> None:
+        """Cache (a copy of) an output, evicting the least recently used entries."""
+        data = pickle.dumps(
+            output._replace(warning_stream=None, diagnostics=tuple(output.diagnostics)),
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= len(old)
+            self._entries[key] = data
+            self.bytes += len(data)
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= len(evicted)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries (the statistics are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        """Return the hit/miss/eviction counts, and the number and size of entries."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self),
+            "bytes": self.bytes,
+        }
+
+    def convert(
+        self,
+        text: str,
+        options: Mapping[str, Any],
+        diagnostics: "DiagnosticCollector",
+        convert: Callable[[], "ConvertedOutput"],
+    ) -> "ConvertedOutput":
+        """Return the cached output for the text and options,
+        otherwise convert the text (adding warnings to ``diagnostics``) and cache it.
+
+        On a hit, the cached warnings are added to ``diagnostics``,
+        as they would be by the conversion.
+        Failed conversions (e.g. with ``raise_on_warning``) are not cached.
+
+        :param options: The conversion options
+        :param diagnostics: The collector of the warnings
+        :param convert: Convert the text, adding warnings to ``diagnostics``
+        """
+        # the collected warnings depend on the level of the collector
+        key = self.key(text, {**options, "diagnostics_level": diagnostics.level})
+        output = self.get(key)
+        if output is not None:
+            for diagnostic in output.diagnostics:
+                diagnostics.add(diagnostic)
+            return output._replace(
+                warning_stream=diagnostics.stream, diagnostics=diagnostics.records
+            )
+        start = len(diagnostics.records)
+        output = convert()
+        self.put(key, output._replace(diagnostics=diagnostics.records[start:]))
+        return output
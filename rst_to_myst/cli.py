@@ -1,13 +1,25 @@
 from collections.abc import Mapping
+from contextlib import suppress
 from io import TextIOWrapper
+import os
 from pathlib import Path
-from typing import Optional
+import time
+from typing import TYPE_CHECKING, Optional
 
 import click
-import yaml
 
-from . import compile_namespace, rst_to_myst, to_docutils_ast
-from .utils import yaml_dump
+from .cache import ConversionCache, hash_bytes, options_digest
+from .files import iter_files, write_if_changed
+from .options import conversion_options
+from .profiling import CostCounter, TimingsSummary
+from .report import ReportWriter
+from .schedule import SCHEDULES
+
+if TYPE_CHECKING:
+    from .converter import Converter
+
+# Note: docutils, mdformat, PyYAML, etc are imported within the commands that use
+# them, so that e.g. ``--help`` is fast (see tests/test_imports.py)
 
 
 @click.group(context_settings={"help_option_names": ["-h", "--help"]})
@@ -19,6 +31,8 @@ def main():
 def read_config(ctx, param, value):
     if not value:
         return
+    import yaml
+
     try:
         with open(value, encoding="utf8") as handle:  # noqa: PTH123
             data = yaml.safe_load(handle)
@@ -62,6 +76,25 @@ ARG_PATHS = click.argument(
     nargs=-1,
 )
 
+OPT_INCLUDE = click.option(
+    "--include",
+    multiple=True,
+    default=("*.rst",),
+    show_default=True,
+    help="Glob of files to convert, when walking directories (repeatable)",
+)
+OPT_EXCLUDE = click.option(
+    "--exclude",
+    multiple=True,
+    help="Glob of files/directories to skip (repeatable)",
+)
+OPT_GITIGNORE = click.option(
+    "--gitignore/--no-gitignore",
+    default=False,
+    show_default=True,
+    help="Skip files/directories ignored by .gitignore files",
+)
+
 OPT_ENCODING = click.option(
     "--encoding", default="utf8", show_default=True, help="Encoding for read/write"
 )
@@ -79,6 +112,8 @@ def read_conversions(ctx, param, value):
             raise click.BadOptionUsage(
                 "--conversions", f"Path does not exist: {value}", ctx
             )
+        import yaml
+
         try:
             with path.open("r") as handle:
                 data = yaml.safe_load(handle)
@@ -162,6 +197,17 @@ OPT_CITE_PREFIX = click.option(
 OPT_RAISE_ON_WARNING = click.option(
     "--raise-on-warning", "-W", is_flag=True, help="Raise exception on parsing warning"
 )
+OPT_PROFILE = click.option(
+    "--profile",
+    is_flag=True,
+    help="Print the wall/CPU time of each conversion stage (to stderr)",
+)
+OPT_MEMPROFILE = click.option(
+    "--memprofile",
+    is_flag=True,
+    help="Print the peak/retained memory of each conversion stage, "
+    "and the top allocation sites (to stderr)",
+)
 OPT_CONSECUTIVE_NUMBERING = click.option(
     "--consecutive-numbering/--no-consecutive-numbering",
     default=True,
@@ -182,6 +228,28 @@ OPT_DOLLAR_MATH = click.option(
 )
 
 
+def read_shard(ctx, param, value):
+    if not value:
+        return None
+    from .shard import parse_shard
+
+    try:
+        return parse_shard(value)
+    except ValueError as exc:
+        raise click.BadParameter(str(exc)) from exc
+
+
+def load_converter(options: dict) -> "Converter":
+    """Create a converter, compiling the namespace of directives/roles."""
+    from .converter import get_converter
+
+    try:
+        # cached, so that forked worker processes inherit the warm converter
+        return get_converter(**options)
+    except Exception as exc:
+        raise click.ClickException(f"Error loading extensions: {exc}") from exc
+
+
 @main.command("ast")
 @ARG_STREAM
 @OPT_LANGUAGE
@@ -191,6 +259,8 @@ OPT_DOLLAR_MATH = click.option(
 @OPT_CONFIG
 def ast(stream: TextIOWrapper, language: str, sphinx: bool, extensions, conversions):
     """Parse file / stdin (-) and print RST Abstract Syntax Tree."""
+    from .parser import to_docutils_ast
+
     text = stream.read()
     document, _ = to_docutils_ast(
         text,
@@ -229,6 +299,9 @@ def tokens(
     conversions,
 ):
     """Parse file / stdin (-) and print Markdown-It tokens."""
+    from .mdformat_render import rst_to_myst
+    from .utils import yaml_dump
+
     text = stream.read()
     output = rst_to_myst(
         text,
@@ -258,6 +331,28 @@ def tokens(
 @OPT_COLON_FENCES
 @OPT_DOLLAR_MATH
 @OPT_CONVERSIONS
+@OPT_PROFILE
+@OPT_MEMPROFILE
+@click.option(
+    "--ndjson",
+    is_flag=True,
+    help="Read a JSON object per line {id, text, options?}, "
+    "and write a JSON object per line {id, text, extensions, warnings}",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of worker processes, for --ndjson",
+)
+@click.option(
+    "--ordered/--unordered",
+    default=True,
+    show_default=True,
+    help="Write --ndjson results in input order, or as they complete",
+)
 @OPT_CONFIG
 def stream(
     stream: TextIOWrapper,
@@ -271,8 +366,49 @@ def stream(
     colon_fences: bool,
     dollar_math: bool,
     conversions,
+    profile: bool,
+    memprofile: bool,
+    ndjson: bool,
+    jobs: int,
+    ordered: bool,
 ):
     """Parse file / stdin (-) and print Markdown text."""
+    if ndjson:
+        from .batch import convert_ndjson
+        from .options import CLI_DEFAULTS, conversion_options
+        from .pool import forked_executor
+
+        defaults = {
+            "language": language,
+            "sphinx": sphinx,
+            "extensions": extensions,
+            "default_domain": default_domain,
+            "default_role": default_role,
+            "cite_prefix": cite_prefix,
+            "consecutive_numbering": consecutive_numbering,
+            "colon_fences": colon_fences,
+            "dollar_math": dollar_math,
+            "conversions": conversions,
+        }
+        outstream = click.get_text_stream("stdout")
+        if jobs == 1:
+            convert_ndjson(stream, outstream, defaults)
+        else:
+            # workers are forked from this process, warmed for the default options
+            with forked_executor(
+                jobs, conversion_options(**{**CLI_DEFAULTS, **defaults})
+            ) as executor:
+                convert_ndjson(
+                    stream,
+                    outstream,
+                    defaults,
+                    executor=executor,
+                    window=jobs * 4,
+                    ordered=ordered,
+                )
+        return
+    from .mdformat_render import rst_to_myst
+
     text = stream.read()
     output = rst_to_myst(
         text,
@@ -287,8 +423,14 @@ def stream(
         consecutive_numbering=consecutive_numbering,
         colon_fences=colon_fences,
         dollar_math=dollar_math,
+        profile=profile,
+        memprofile=memprofile,
     )
     click.echo(output.text)
+    if output.timings is not None:
+        click.echo(output.timings.format(), err=True)
+    if output.memory is not None:
+        click.echo(output.memory.format(), err=True)
 
 
 @main.command("convert")
@@ -296,6 +438,9 @@ def stream(
 @click.option("--dry-run", "-d", is_flag=True, help="Do not write/remove any files")
 @click.option("--replace-files", "-R", is_flag=True, help="Remove parsed files")
 @click.option("--stop-on-fail", "-S", is_flag=True, help="Stop on first failure")
+@OPT_INCLUDE
+@OPT_EXCLUDE
+@OPT_GITIGNORE
 @OPT_RAISE_ON_WARNING
 @OPT_LANGUAGE
 @OPT_SPHINX
@@ -308,6 +453,81 @@ def stream(
 @OPT_DOLLAR_MATH
 @OPT_CONVERSIONS
 @OPT_ENCODING
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, dir_okay=True),
+    default=None,
+    help="Directory to cache conversions in, to skip unchanged files",
+)
+@OPT_PROFILE
+@OPT_MEMPROFILE
+@click.option(
+    "--report",
+    type=click.Path(file_okay=True, dir_okay=False, writable=True),
+    default=None,
+    help="Write a JSON line per file, with statistics of its conversion",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of worker processes",
+)
+@click.option(
+    "--timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    help="Maximum seconds to convert a single file, "
+    "after which its worker process is killed and replaced",
+)
+@click.option(
+    "--max-tasks-per-worker",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Replace each worker process after converting this many files",
+)
+@click.option(
+    "--max-worker-rss",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    metavar="MB",
+    help="Replace a worker process once its resident memory exceeds this",
+)
+@click.option(
+    "--shard",
+    callback=read_shard,
+    metavar="K/N",
+    help="Only convert the K-th of N (deterministic) shards of the files",
+)
+@click.option(
+    "--shard-manifest",
+    type=click.Path(exists=True, file_okay=True, dir_okay=False),
+    default=None,
+    help="Balance shards by the file sizes in a previous --report "
+    "(or a JSON object of path -> weight)",
+)
+@click.option(
+    "--schedule",
+    type=click.Choice(SCHEDULES),
+    default="fifo",
+    show_default=True,
+    help="Order to convert files in: as found (fifo), "
+    "or longest (by previous duration or size) first (lpt)",
+)
+@click.option(
+    "--journal",
+    type=click.Path(file_okay=True, dir_okay=False, writable=True),
+    default=None,
+    help="Append a JSON line per completed file to this checkpoint journal",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Skip files recorded as converted in the --journal, "
+    "if their content is unchanged",
+)
 @OPT_CONFIG
 def convert(
     paths: list[str],
@@ -315,6 +535,9 @@ def convert(
     replace_files: bool,
     raise_on_warning: bool,
     stop_on_fail: bool,
+    include: tuple[str, ...],
+    exclude: tuple[str, ...],
+    gitignore: bool,
     language: str,
     sphinx: bool,
     extensions: list[str],
@@ -326,47 +549,561 @@ def convert(
     dollar_math: bool,
     conversions,
     encoding: str,
+    cache_dir: Optional[str],
+    profile: bool,
+    memprofile: bool,
+    report: Optional[str],
+    jobs: int,
+    timeout: Optional[float],
+    max_tasks_per_worker: Optional[int],
+    max_worker_rss: Optional[float],
+    shard: Optional[tuple[int, int]],
+    shard_manifest: Optional[str],
+    schedule: str,
+    journal: Optional[str],
+    resume: bool,
 ):
-    """Convert one or more files."""
+    """Convert one or more files, or directories of files."""
+    from .diagnostics import count_diagnostics
+    from .journal import Journal, journal_record
+    from .pool import ConversionPool, ConversionResult, run_task
+    from .schedule import estimate_costs, lpt_order, parallel_efficiency
+    from .shard import Sharder, load_manifest
+
+    options = conversion_options(
+        raise_on_warning=raise_on_warning,
+        language=language,
+        sphinx=sphinx,
+        extensions=extensions,
+        default_domain=default_domain,
+        default_role=default_role,
+        cite_prefix=cite_prefix,
+        consecutive_numbering=consecutive_numbering,
+        colon_fences=colon_fences,
+        dollar_math=dollar_math,
+        conversions=conversions,
+    )
+    if resume and not journal:
+        raise click.BadOptionUsage("--resume", "--resume requires --journal")
+    converter = load_converter(options)
+    digest = options_digest({**options, "encoding": encoding})
+    completed = Journal.load(journal, digest) if resume else {}
+    journal_writer = Journal(journal, digest) if journal and not dry_run else None
+    cache = (
+        ConversionCache(cache_dir, {**options, "encoding": encoding})
+        if cache_dir
+        else None
+    )
+    summary = TimingsSummary() if profile else None
+    costs = CostCounter() if profile else None
+    report_writer = ReportWriter(report) if report else None
+    # with a timeout or worker limits,
+    # conversions are isolated in (replaceable) worker processes
+    pool = (
+        ConversionPool(
+            options,
+            workers=jobs,
+            timeout=timeout,
+            max_tasks_per_worker=max_tasks_per_worker,
+            max_worker_rss=(
+                None if max_worker_rss is None else int(max_worker_rss * 1024**2)
+            ),
+        )
+        if jobs > 1
+        or timeout is not None
+        or max_tasks_per_worker is not None
+        or max_worker_rss is not None
+        else None
+    )
+    sharder = (
+        Sharder(*shard, load_manifest(shard_manifest) if shard_manifest else None)
+        if shard
+        else None
+    )
     myst_extensions = set()
-    for path in paths:
-        path = Path(path)  # noqa: PLW2901
-        output_path = path.parent / (path.stem + ".md")
-        click.secho(f"{path} -> {output_path}", fg="blue")
-        input_text = path.read_text(encoding)
-        try:
-            output = rst_to_myst(
-                input_text,
-                warning_stream=click.get_text_stream("stderr"),
-                raise_on_warning=raise_on_warning,
-                language_code=language,
-                use_sphinx=sphinx,
-                extensions=extensions,
-                conversions=conversions,
-                default_domain=default_domain,
-                default_role=default_role,
-                cite_prefix=cite_prefix + "_",
-                consecutive_numbering=consecutive_numbering,
-                colon_fences=colon_fences,
-                dollar_math=dollar_math,
+    written = unchanged = resumed = 0
+    # (peak bytes, path) of the conversion with the highest peak memory
+    max_memory: Optional[tuple[int, Path]] = None
+
+    def _read_files():
+        """Yield (task, text), with a text of None if there is nothing to convert."""
+        files = iter_files(
+            paths, include=include, exclude=exclude, use_gitignore=gitignore
+        )
+        if sharder is not None:
+            files = sharder.select(files)
+        if schedule == "lpt":
+            files = list(files)
+            durations = {}
+            if cache is not None:
+                for path in files:
+                    entry = cache.get(path)
+                    if entry is not None and "duration" in entry:
+                        durations[path] = entry["duration"]
+            files = lpt_order(estimate_costs(files, durations))
+        for path in files:
+            input_bytes = path.read_bytes()
+            task = {
+                "path": path,
+                "output_path": path.parent / (path.stem + ".md"),
+                "record": {
+                    "input": str(path),
+                    "output": str(path.parent / (path.stem + ".md")),
+                    "input_bytes": len(input_bytes),
+                    "input_lines": input_bytes.count(b"\n"),
+                },
+                "input_hash": hash_bytes(input_bytes) if journal else None,
+                "resumed": False,
+                "cache_key": None,
+                "cached": None,
+                "result": None,
+            }
+            previous = completed.get(os.path.abspath(path))  # noqa: PTH100
+            if (
+                previous is not None
+                and previous["status"] in ("converted", "cached")
+                and previous["input_hash"] == task["input_hash"]
+                and task["output_path"].exists()
+            ):
+                task["resumed"] = True
+                yield task, None
+                continue
+            if cache is not None:
+                task["cache_key"] = cache.key(input_bytes)
+                entry = cache.lookup(path, task["cache_key"], task["output_path"])
+                if entry is not None:
+                    task["cached"] = entry
+                    yield task, None
+                    continue
+            try:
+                text = input_bytes.decode(encoding)
+            except UnicodeDecodeError as exc:
+                task["result"] = ConversionResult(
+                    "failed", error_type=type(exc).__name__, error=str(exc)
+                )
+                yield task, None
+                continue
+            yield task, text
+
+    want_timings = profile or report_writer is not None
+    if pool is None:
+        results = (
+            (
+                task,
+                None
+                if text is None
+                else run_task(converter, text, want_timings, memprofile),
             )
-        except Exception as exc:
-            click.secho(f"FAILED:\n{exc}", fg="red")
-            if stop_on_fail:
-                raise SystemExit(1) from exc
-            continue
-
-        click.secho(f"CONVERTED (extensions: {list(output.extensions)!r})", fg="green")
-        myst_extensions.update(output.extensions)
-        if dry_run:
-            continue
-        output_path.write_text(output.text, encoding=encoding)
-        if replace_files and output_path != path:
-            path.unlink()
+            for task, text in _read_files()
+        )
+    else:
+        results = pool.imap(
+            _read_files(),
+            profile=want_timings,
+            memprofile=memprofile,
+            ordered=schedule == "fifo",
+        )
+
+    start = time.perf_counter()
+    busy = 0.0
+    try:
+        for task, outcome in results:
+            path, output_path, record = (
+                task["path"],
+                task["output_path"],
+                task["record"],
+            )
+            click.secho(f"{path} -> {output_path}", fg="blue")
+
+            if task["resumed"]:
+                click.secho("RESUMED (converted in a previous run)", fg="green")
+                resumed += 1
+                if report_writer is not None:
+                    record.update(status="resumed")
+                    report_writer.write(record)
+                continue
+
+            if task["cached"] is not None:
+                entry = task["cached"]
+                click.secho(f"CACHED (extensions: {entry['extensions']!r})", fg="green")
+                myst_extensions.update(entry["extensions"])
+                if report_writer is not None:
+                    record.update(status="cached", extensions=entry["extensions"])
+                    report_writer.write(record)
+                if journal_writer is not None:
+                    journal_writer.write(
+                        journal_record(path, "cached", task["input_hash"])
+                    )
+                continue
+
+            result = outcome or task["result"]
+            busy += result.duration
+            stderr = click.get_text_stream("stderr")
+            for diagnostic in result.diagnostics:
+                stderr.write(diagnostic.format())
+            warnings = count_diagnostics(result.diagnostics)
+
+            if result.status != "converted":
+                if result.status == "timeout":
+                    click.secho(f"TIMEOUT (exceeded {timeout}s)", fg="red")
+                else:
+                    click.secho(f"FAILED:\n{result.error}", fg="red")
+                if report_writer is not None:
+                    record.update(
+                        status=result.status,
+                        error=f"{result.error_type}: {result.error}",
+                        warnings=warnings,
+                    )
+                    report_writer.write(record)
+                if journal_writer is not None:
+                    journal_writer.write(
+                        journal_record(path, result.status, task["input_hash"])
+                    )
+                if stop_on_fail:
+                    raise SystemExit(1)
+                continue
+
+            click.secho(
+                f"CONVERTED (extensions: {list(result.extensions)!r})", fg="green"
+            )
+            if summary is not None:
+                click.echo(result.timings.format(), err=True)
+                summary.add(result.timings)
+                costs.update(result.costs)
+            if result.memory is not None:
+                click.echo(result.memory.format(), err=True)
+                if max_memory is None or result.memory.peak > max_memory[0]:
+                    max_memory = (result.memory.peak, path)
+            myst_extensions.update(result.extensions)
+            if report_writer is not None:
+                record.update(
+                    status="converted",
+                    output_bytes=len(result.text.encode(encoding)),
+                    output_lines=result.text.count("\n"),
+                    duration=result.timings.wall,
+                    stages=result.timings.as_dict(),
+                    costs=result.costs.as_dict(),
+                    warnings=warnings,
+                    extensions=list(result.extensions),
+                    eval_rst=result.eval_rst,
+                )
+                if result.memory is not None:
+                    record["memory"] = result.memory.as_dict()
+            if not dry_run:
+                if write_if_changed(output_path, result.text, encoding=encoding):
+                    written += 1
+                else:
+                    unchanged += 1
+                if cache is not None:
+                    cache.store(
+                        path,
+                        task["cache_key"],
+                        extensions=list(result.extensions),
+                        duration=result.duration,
+                    )
+                if replace_files and output_path != path:
+                    path.unlink()
+                if journal_writer is not None:
+                    journal_writer.write(
+                        journal_record(
+                            path,
+                            "converted",
+                            task["input_hash"],
+                            hash_bytes(result.text.encode(encoding)),
+                        )
+                    )
+            if report_writer is not None:
+                report_writer.write(record)
+    finally:
+        elapsed = time.perf_counter() - start
+        if pool is not None:
+            pool.close()
+        if cache is not None and not dry_run:
+            cache.save()
+        if report_writer is not None:
+            report_writer.close()
+        if journal_writer is not None:
+            journal_writer.close()
     click.echo("")
+    if summary is not None:
+        click.echo(summary.format(), err=True)
+        click.echo(costs.format(), err=True)
+    if max_memory is not None:
+        click.echo(
+            f"MEMPROFILE SUMMARY: highest peak {max_memory[0] / 1024:.1f} KiB "
+            f"({max_memory[1]})",
+            err=True,
+        )
+    if not dry_run:
+        click.secho(f"FILES: {written} written, {unchanged} unchanged", fg="blue")
+    if cache is not None:
+        click.secho(f"CACHE: {cache.hits} hits, {cache.misses} misses", fg="blue")
+    if resume:
+        click.secho(f"JOURNAL: {resumed} resumed", fg="blue")
+    if sharder is not None:
+        click.secho(f"SHARD: {sharder.index}/{sharder.count}", fg="blue")
+    if pool is not None:
+        efficiency = parallel_efficiency(busy, elapsed, jobs)
+        click.secho(
+            f"WORKERS: {jobs} workers, {pool.restarts} restarts, "
+            f"{efficiency:.0%} parallel efficiency",
+            fg="blue",
+        )
     click.secho(f"FINISHED ALL! (extensions: {list(myst_extensions)!r})", fg="green")
 
 
+@main.command("watch")
+@ARG_PATHS
+@OPT_INCLUDE
+@OPT_EXCLUDE
+@OPT_GITIGNORE
+@OPT_RAISE_ON_WARNING
+@OPT_LANGUAGE
+@OPT_SPHINX
+@OPT_EXTENSIONS
+@OPT_DEFAULT_DOMAIN
+@OPT_DEFAULT_ROLE
+@OPT_CITE_PREFIX
+@OPT_CONSECUTIVE_NUMBERING
+@OPT_COLON_FENCES
+@OPT_DOLLAR_MATH
+@OPT_CONVERSIONS
+@OPT_ENCODING
+@click.option(
+    "--debounce",
+    type=float,
+    default=0.2,
+    show_default=True,
+    help="Seconds to wait for further changes, before converting",
+)
+@click.option(
+    "--polling", is_flag=True, help="Poll for changes, rather than using inotify"
+)
+@OPT_CONFIG
+def watch(
+    paths: list[str],
+    include: tuple[str, ...],
+    exclude: tuple[str, ...],
+    gitignore: bool,
+    raise_on_warning: bool,
+    language: str,
+    sphinx: bool,
+    extensions: list[str],
+    default_domain: str,
+    default_role: Optional[str],
+    cite_prefix: str,
+    consecutive_numbering: bool,
+    colon_fences: bool,
+    dollar_math: bool,
+    conversions,
+    encoding: str,
+    debounce: float,
+    polling: bool,
+):
+    """Watch files / directories, and convert files in-place when they change."""
+    from .watch import get_watcher
+
+    converter = load_converter(
+        conversion_options(
+            raise_on_warning=raise_on_warning,
+            language=language,
+            sphinx=sphinx,
+            extensions=extensions,
+            default_domain=default_domain,
+            default_role=default_role,
+            cite_prefix=cite_prefix,
+            consecutive_numbering=consecutive_numbering,
+            colon_fences=colon_fences,
+            dollar_math=dollar_math,
+            conversions=conversions,
+        )
+    )
+    with get_watcher(
+        paths,
+        polling=polling,
+        include=include,
+        exclude=exclude,
+        use_gitignore=gitignore,
+    ) as watcher:
+        click.secho(
+            f"Watching for changes with {type(watcher).__name__} (Ctrl+C to stop)",
+            fg="blue",
+        )
+        try:
+            while True:
+                for path in sorted(watcher.wait(debounce=debounce)):
+                    output_path = path.parent / (path.stem + ".md")
+                    click.secho(f"{path} -> {output_path}", fg="blue")
+                    try:
+                        output = converter.convert(
+                            path.read_text(encoding),
+                            warning_stream=click.get_text_stream("stderr"),
+                        )
+                    except Exception as exc:
+                        click.secho(f"FAILED:\n{exc}", fg="red")
+                        continue
+                    if write_if_changed(output_path, output.text, encoding=encoding):
+                        status = "CONVERTED"
+                    else:
+                        status = "UNCHANGED"
+                    click.secho(
+                        f"{status} (extensions: {list(output.extensions)!r})",
+                        fg="green",
+                    )
+        except KeyboardInterrupt:
+            click.secho("Stopped watching", fg="blue")
+
+
+@main.command("serve")
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(file_okay=True, dir_okay=False),
+    default=None,
+    help="Listen on a Unix socket, rather than stdin/stdout",
+)
+@click.option(
+    "--workers",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of worker processes (1 handles requests in-process)",
+)
+@OPT_RAISE_ON_WARNING
+@OPT_LANGUAGE
+@OPT_SPHINX
+@OPT_EXTENSIONS
+@OPT_DEFAULT_DOMAIN
+@OPT_DEFAULT_ROLE
+@OPT_CITE_PREFIX
+@OPT_CONSECUTIVE_NUMBERING
+@OPT_COLON_FENCES
+@OPT_DOLLAR_MATH
+@OPT_CONVERSIONS
+@OPT_CONFIG
+def serve(socket_path: Optional[str], workers: int, **defaults):
+    """Serve newline-delimited JSON-RPC requests (convert, ast, tokens).
+
+    The CLI options are the defaults for requests,
+    which can be overridden by the request params.
+    """
+    from .server import Server
+
+    with Server(defaults, workers=workers) as server:
+        if socket_path:
+            try:
+                with suppress(KeyboardInterrupt):
+                    server.serve_unix(
+                        socket_path,
+                        ready=lambda: click.secho(
+                            f"Listening on {socket_path}", fg="blue", err=True
+                        ),
+                    )
+            except OSError as error:
+                raise click.ClickException(str(error)) from error
+        else:
+            server.serve_stream(
+                click.get_text_stream("stdin"), click.get_text_stream("stdout")
+            )
+
+
+@main.command("merge-reports")
+@click.argument(
+    "reports",
+    type=click.Path(exists=True, file_okay=True, dir_okay=False),
+    nargs=-1,
+    required=True,
+)
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(file_okay=True, dir_okay=False, writable=True),
+    default=None,
+    help="Also write all the records to a single report",
+)
+def merge_reports(reports: list[str], output: Optional[str]):
+    """Merge the --report files of convert runs (e.g. shards) into a summary.
+
+    The summary (YAML) includes counts by status and warning category,
+    the union of MyST extensions required, and the inputs that failed.
+    """
+    from .report import read_reports, summarize_reports
+    from .utils import yaml_dump
+
+    if output:
+        with ReportWriter(output) as writer:
+            for record in read_reports(reports):
+                writer.write(record)
+    click.echo(yaml_dump(summarize_reports(read_reports(reports)), sort_keys=False))
+
+
+# (name, default, help) of the counts for generated documents
+CORPUS_COUNTS = (
+    ("sections", 3, "Number of sections"),
+    ("section-depth", 2, "Maximum depth of nested sections"),
+    ("paragraphs", 2, "Paragraphs per section"),
+    ("list-items", 3, "Items per list (at each level of nesting)"),
+    ("list-depth", 2, "Depth of nested lists"),
+    ("tables", 1, "Grid and simple tables per section"),
+    ("table-rows", 3, "Rows per table"),
+    ("footnotes", 1, "Footnotes per section"),
+    ("citations", 1, "Citations per section"),
+    ("substitutions", 1, "Substitutions per section"),
+    ("links", 1, "Anonymous hyperlinks per section"),
+    ("directives", 1, "Directives (with options) per section"),
+    ("roles", 2, "Inline roles per paragraph"),
+)
+
+
+def corpus_options(func):
+    for name, default, help_text in reversed(CORPUS_COUNTS):
+        func = click.option(
+            f"--{name}",
+            type=click.IntRange(min=0),
+            default=default,
+            show_default=True,
+            help=help_text,
+        )(func)
+    return func
+
+
+@main.command("gen-corpus")
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(file_okay=False, dir_okay=True, writable=True),
+    default=None,
+    help="Directory to write files to, otherwise print a single document",
+)
+@click.option(
+    "--files",
+    "-n",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of files to write to the --output directory",
+)
+@click.option("--seed", type=int, default=0, show_default=True, help="Random seed")
+@corpus_options
+def gen_corpus(output: Optional[str], files: int, seed: int, **counts):
+    """Generate synthetic RST documents, for benchmarking and stress testing.
+
+    Each file is generated with the seed incremented by its index.
+    """
+    from .corpus import generate_document
+
+    if output is None:
+        click.echo(generate_document(seed=seed, **counts), nl=False)
+        return
+    directory = Path(output)
+    directory.mkdir(parents=True, exist_ok=True)
+    for index in range(files):
+        path = directory / f"doc_{index:0{len(str(files - 1))}d}.rst"
+        path.write_text(generate_document(seed=seed + index, **counts), "utf8")
+    click.secho(f"Generated {files} files in {directory}", fg="green")
+
+
 @main.group("directives")
 def directives():
     """Commands for showing available directives."""
@@ -377,6 +1114,8 @@ def directives():
 @OPT_EXTENSIONS
 def directives_list(sphinx, extensions):
     """List available directives."""
+    from .namespace import compile_namespace
+
     namespace = compile_namespace(extensions=extensions, use_sphinx=sphinx)
     click.echo(" ".join(namespace.list_directives()))
 
@@ -388,6 +1127,9 @@ def directives_list(sphinx, extensions):
 @OPT_LANGUAGE
 def directives_show(name, sphinx, extensions, language):
     """Show information about a single role."""
+    from .namespace import compile_namespace
+    from .utils import yaml_dump
+
     namespace = compile_namespace(
         extensions=extensions, use_sphinx=sphinx, language_code=language
     )
@@ -408,6 +1150,8 @@ def roles():
 @OPT_EXTENSIONS
 def roles_list(sphinx, extensions):
     """List available roles."""
+    from .namespace import compile_namespace
+
     namespace = compile_namespace(extensions=extensions, use_sphinx=sphinx)
     click.echo(" ".join(namespace.list_roles()))
 
@@ -419,6 +1163,9 @@ def roles_list(sphinx, extensions):
 @OPT_LANGUAGE
 def roles_show(name, sphinx, extensions, language):
     """Show information about a single role."""
+    from .namespace import compile_namespace
+    from .utils import yaml_dump
+
     namespace = compile_namespace(
         extensions=extensions, use_sphinx=sphinx, language_code=language
     )
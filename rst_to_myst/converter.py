@@ -0,0 +1,112 @@
+"""A reusable converter, with fixed options."""
+
+from collections.abc import Iterable
+from functools import lru_cache
+import json
+from typing import IO, Any, Optional
+
+from .cache import ResultCache
+from .diagnostics import DiagnosticCollector
+from .mdformat_render import ConvertedOutput, rst_to_myst
+from .namespace import compile_namespace
+from .profiling import stage
+
+
+class Converter:
+    """Convert RST text to MyST Markdown, with fixed options.
+
+    The namespace of directives/roles (which may require importing Sphinx and
+    its extensions) is compiled once on initialisation,
+    then reused for every conversion.
+    Outputs can also be cached (in a ``ResultCache``),
+    for texts that are converted repeatedly.
+    """
+
+    def __init__(
+        self,
+        *,
+        language_code="en",
+        use_sphinx: bool = True,
+        extensions: Iterable[str] = (),
+        conversions: Optional[dict[str, str]] = None,
+        default_domain: str = "py",
+        default_role: Optional[str] = None,
+        raise_on_warning: bool = False,
+        cite_prefix: str = "cite_",
+        consecutive_numbering: bool = True,
+        colon_fences: bool = True,
+        dollar_math: bool = True,
+        cache: Optional[ResultCache] = None,
+    ):
+        """Initialise the converter, see ``rst_to_myst`` for the options.
+
+        :param cache: Cache the outputs of conversions
+        """
+        self.cache = cache
+        self.options: dict[str, Any] = {
+            "language_code": language_code,
+            "use_sphinx": use_sphinx,
+            "extensions": list(extensions),
+            "conversions": conversions,
+            "default_domain": default_domain,
+            "default_role": default_role,
+            "raise_on_warning": raise_on_warning,
+            "cite_prefix": cite_prefix,
+            "consecutive_numbering": consecutive_numbering,
+            "colon_fences": colon_fences,
+            "dollar_math": dollar_math,
+        }
+        with stage(None, "namespace"):
+            self.namespace = compile_namespace(
+                extensions=self.options["extensions"],
+                use_sphinx=use_sphinx,
+                default_domain=default_domain,
+                language_code=language_code,
+            )
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(**{self.options!r})"
+
+    def convert(
+        self,
+        text: str,
+        *,
+        warning_stream: Optional[IO] = None,
+        profile: bool = False,
+        memprofile: bool = False,
+        diagnostics: Optional[DiagnosticCollector] = None,
+    ) -> ConvertedOutput:
+        """Convert RST text to MyST Markdown text.
+
+        :param text: The input RST text
+        :param warning_stream: The warning IO to write to
+        :param profile: Record the time taken by each stage, in ``output.timings``
+        :param memprofile: Record the memory allocated by each stage,
+            in ``output.memory``
+        :param diagnostics: Collect the warnings at or above its level
+            (instead of writing them to the warning stream)
+        """
+        return rst_to_myst(
+            text,
+            warning_stream=warning_stream,
+            namespace=self.namespace,
+            profile=profile,
+            memprofile=memprofile,
+            diagnostics=diagnostics,
+            cache=self.cache,
+            **self.options,
+        )
+
+
+@lru_cache(maxsize=16)
+def _cached_converter(key: str) -> Converter:
+    return Converter(**json.loads(key))
+
+
+def get_converter(**options: Any) -> Converter:
+    """Return a converter for the options,
+    reusing one previously created (in this process) for the same options.
+
+    :param options: Keyword arguments for ``Converter``
+    """
+    return _cached_converter(json.dumps(options, sort_keys=True))
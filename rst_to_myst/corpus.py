@@ -0,0 +1,181 @@
+"""Generate synthetic (seeded) RST documents, for scaling and stress tests."""
+
+from itertools import count
+import random
+
+WORDS = (
+    "alpha beta gamma delta epsilon zeta theta kappa lambda sigma omega "
+    "document section content markup parser render token table list item"
+).split()
+
+SECTION_CHARS = "=-~^\"'+"
+
+ROLES = (
+    ":code:`{words}`",
+    ":math:`x^{number}`",
+    ":abbr:`RST (reStructuredText)`",
+    ":ref:`label-{number}`",
+    ":py:func:`module.func_{number}`",
+    ":doc:`page_{number}`",
+)
+
+DIRECTIVES = (
+    ".. note::\n   :class: tip\n\n   {words}\n",
+    ".. warning::\n   :name: warning-{number}\n\n   {words}\n",
+    ".. code-block:: python\n   :linenos:\n   :caption: {words}\n\n   x = {number}\n",
+    ".. image:: image_{number}.png\n   :alt: {words}\n   :width: 100px\n",
+    ".. toctree::\n   :maxdepth: 2\n   :caption: {words}\n\n   page_{number}\n",
+    ".. admonition:: {words}\n   :class: note\n\n   {words}\n",
+)
+
+
+class _Generator:
+    def __init__(self, seed: int):
+        self.random = random.Random(seed)
+        self.counter = count(1)
+        # definitions, to add at the end of the document
+        self.footnotes: list[str] = []
+        self.citations: list[str] = []
+        self.substitutions: list[str] = []
+        self.links: list[str] = []
+
+    def words(self, number: int = 4) -> str:
+        return " ".join(self.random.choice(WORDS) for _ in range(number))
+
+    def role(self) -> str:
+        return self.random.choice(ROLES).format(
+            words=self.words(2), number=next(self.counter)
+        )
+
+    def paragraph(
+        self, roles: int, footnotes: int, citations: int, substitutions: int, links: int
+    ) -> str:
+        parts = [self.words(8).capitalize()]
+        parts.extend(self.role() for _ in range(roles))
+        for _ in range(footnotes):
+            name = f"f{next(self.counter)}"
+            parts.append(f"[#{name}]_")
+            self.footnotes.append(f".. [#{name}] {self.words()}\n")
+        for _ in range(citations):
+            name = f"CIT{next(self.counter)}"
+            parts.append(f"[{name}]_")
+            self.citations.append(f".. [{name}] {self.words()}\n")
+        for _ in range(substitutions):
+            name = f"sub{next(self.counter)}"
+            parts.append(f"|{name}|")
+            self.substitutions.append(f".. |{name}| replace:: {self.words(2)}\n")
+        for _ in range(links):
+            parts.append(f"`{self.words(2)}`__")
+            self.links.append(f"__ https://example.com/{next(self.counter)}\n")
+        return " ".join(parts) + ".\n"
+
+    def bullet_list(self, items: int, depth: int, level: int = 0) -> str:
+        indent = "  " * level
+        lines = []
+        for _ in range(items):
+            lines.append(f"{indent}- {self.words()}\n")
+            if level + 1 < depth:
+                lines.append("\n" + self.bullet_list(items, depth, level + 1))
+        return "".join(lines)
+
+    def enumerated_list(self, items: int, depth: int, level: int = 0) -> str:
+        indent = "   " * level
+        lines = []
+        for _ in range(items):
+            lines.append(f"{indent}#. {self.words()}\n")
+            if level + 1 < depth:
+                lines.append("\n" + self.enumerated_list(items, depth, level + 1))
+        return "".join(lines)
+
+    def grid_table(self, rows: int) -> str:
+        border = "+" + "+".join("-" * 12 for _ in range(3)) + "+\n"
+        header = "+" + "+".join("=" * 12 for _ in range(3)) + "+\n"
+        lines = [border, "|" + "|".join(f" {'head':<10} " for _ in range(3)) + "|\n"]
+        lines.append(header)
+        for _ in range(rows):
+            cells = [f" {self.random.choice(WORDS):<10} " for _ in range(3)]
+            lines.extend(["|" + "|".join(cells) + "|\n", border])
+        return "".join(lines)
+
+    def simple_table(self, rows: int) -> str:
+        border = "  ".join("=" * 10 for _ in range(3)) + "\n"
+        lines = [border, "  ".join(f"{'head':<10}" for _ in range(3)).rstrip() + "\n"]
+        lines.append(border)
+        for _ in range(rows):
+            cells = [f"{self.random.choice(WORDS):<10}" for _ in range(3)]
+            lines.append("  ".join(cells).rstrip() + "\n")
+        lines.append(border)
+        return "".join(lines)
+
+    def directive(self) -> str:
+        return self.random.choice(DIRECTIVES).format(
+            words=self.words(3), number=next(self.counter)
+        )
+
+
+def generate_document(
+    *,
+    seed: int = 0,
+    sections: int = 3,
+    section_depth: int = 2,
+    paragraphs: int = 2,
+    list_items: int = 3,
+    list_depth: int = 2,
+    tables: int = 1,
+    table_rows: int = 3,
+    footnotes: int = 1,
+    citations: int = 1,
+    substitutions: int = 1,
+    links: int = 1,
+    directives: int = 1,
+    roles: int = 2,
+) -> str:
+    """Generate an RST document.
+
+    All counts, except ``sections`` and the depths, are per section,
+    so that the size of the document scales linearly with ``sections``.
+
+    :param seed: Seed for the random choice of words, roles and directives
+    :param sections: The number of sections
+    :param section_depth: The maximum depth of nested sections
+    :param paragraphs: The number of paragraphs
+    :param list_items: The number of items in each bullet and enumerated list
+        (at each level of nesting)
+    :param list_depth: The depth of nested lists
+    :param tables: The number of grid and simple tables
+    :param table_rows: The number of rows in each table
+    :param footnotes: The number of (auto-numbered) footnote references
+    :param citations: The number of citation references
+    :param substitutions: The number of substitution references
+    :param links: The number of anonymous hyperlinks
+    :param directives: The number of directives (with options)
+    :param roles: The number of inline roles per paragraph
+    """
+    gen = _Generator(seed)
+    blocks = []
+    for index in range(max(sections, 1)):
+        if sections:
+            title = gen.words(3).title()
+            char = SECTION_CHARS[index % max(section_depth, 1) % len(SECTION_CHARS)]
+            blocks.append(f"{title}\n{char * len(title)}\n")
+        # spread the references over the paragraphs of the section
+        totals = (footnotes, citations, substitutions, links)
+        blocks.extend(
+            gen.paragraph(
+                roles,
+                *(
+                    total // paragraphs + (number < total % paragraphs)
+                    for total in totals
+                ),
+            )
+            for number in range(paragraphs)
+        )
+        if list_items and list_depth:
+            blocks.append(gen.bullet_list(list_items, list_depth))
+            blocks.append(gen.enumerated_list(list_items, list_depth))
+        for _ in range(tables):
+            blocks.append(gen.grid_table(table_rows))
+            blocks.append(gen.simple_table(table_rows))
+        blocks.extend(gen.directive() for _ in range(directives))
+    blocks.extend(gen.footnotes + gen.citations + gen.substitutions + gen.links)
+    return "\n".join(blocks)
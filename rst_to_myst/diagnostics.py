@@ -0,0 +1,171 @@
+"""Structured diagnostics (warnings and errors) of a conversion."""
+
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+import logging
+from typing import IO, NamedTuple, Optional
+
+from docutils import nodes
+
+# the docutils system message levels
+DEBUG, INFO, WARNING, ERROR, SEVERE = range(5)
+LEVEL_NAMES = ("DEBUG", "INFO", "WARNING", "ERROR", "SEVERE")
+
+
+def level_from_logging(level: int) -> int:
+    """Convert a ``logging`` level to a diagnostic level."""
+    return min(max(level // 10 - 1, DEBUG), SEVERE)
+
+
+class Diagnostic(NamedTuple):
+    """A single warning or error of a conversion."""
+
+    stage: str
+    """``parse`` (from docutils), ``render`` (to tokens) or ``mdformat``."""
+    level: int
+    """The level, from ``DEBUG`` (0) to ``SEVERE`` (4)."""
+    line: Optional[int]
+    """The line number in the source text, if known."""
+    code: Optional[str]
+    """An identifier of the type of diagnostic, if available."""
+    message: str
+    source: Optional[str] = None
+    """The source (URI) of the document, for docutils messages."""
+
+    @property
+    def level_name(self) -> str:
+        return LEVEL_NAMES[self.level]
+
+    @property
+    def category(self) -> str:
+        """The category counted in reports:
+        the level name of docutils messages, ``RENDER`` or ``OTHER`` (mdformat)."""
+        if self.stage == "parse":
+            return self.level_name
+        if self.stage == "render":
+            return "RENDER"
+        return "OTHER"
+
+    def format(self) -> str:
+        """Format as a line (or lines) of text, as written to a warning stream."""
+        if self.stage == "parse":
+            line = "" if self.line is None else self.line
+            return (
+                f"{self.source}:{line}: "
+                f"({self.level_name}/{self.level}) {self.message}\n"
+            )
+        if self.stage == "render":
+            if self.line is None:
+                return f"RENDER WARNING: {self.message}\n"
+            return f"RENDER WARNING:{self.line}: {self.message}\n"
+        return f"{self.message}\n"
+
+
+def count_diagnostics(diagnostics: Iterable[Diagnostic]) -> dict[str, int]:
+    """Count diagnostics by category."""
+    return dict(Counter(diagnostic.category for diagnostic in diagnostics))
+
+
+class DiagnosticCollector:
+    """Collect the diagnostics of a conversion, at or above a level.
+
+    Diagnostics below the level are discarded before their message is formatted.
+    If a stream is given, each diagnostic is also written to it as text,
+    in the format of the (legacy) ``warning_stream``.
+    """
+
+    def __init__(self, level: int = WARNING, stream: Optional[IO] = None):
+        """Initialise the collector.
+
+        :param level: The minimum level of diagnostics to collect
+        :param stream: A text stream to also write diagnostics to
+        """
+        self.level = level
+        self.stream = stream
+        self.records: list[Diagnostic] = []
+
+    def __repr__(self) -> str:
+        return f"DiagnosticCollector(level={self.level}, records={len(self.records)})"
+
+    def add(self, diagnostic: Diagnostic) -> None:
+        """Add a diagnostic, if at or above the level."""
+        if diagnostic.level < self.level:
+            return
+        self.records.append(diagnostic)
+        if self.stream is not None:
+            self.stream.write(diagnostic.format())
+
+    def add_system_message(self, message: nodes.system_message) -> None:
+        """Add a docutils ``system_message`` node (an observer of the reporter)."""
+        level = message["level"]
+        if level < self.level:
+            return
+        # the text of the message and its children (e.g. a literal block)
+        text = nodes.Element.astext(message)
+        self.add(
+            Diagnostic(
+                "parse", level, message.get("line"), None, text, message.get("source")
+            )
+        )
+
+    def counts(self) -> dict[str, int]:
+        """Count the diagnostics by category."""
+        return count_diagnostics(self.records)
+
+
+def diagnostic_from_record(record: logging.LogRecord, stage: str) -> Diagnostic:
+    """Create a diagnostic from a log record."""
+    return Diagnostic(
+        stage, level_from_logging(record.levelno), None, None, record.getMessage()
+    )
+
+
+class ContextDiagnosticHandler(logging.Handler):
+    """A logging handler that adds records to the collector of the current context.
+
+    A single handler can be attached (once) to a shared logger,
+    then used by concurrent conversions (in threads or asyncio tasks),
+    each collecting only its own records, see ``collecting``.
+    Records outside of ``collecting`` are handled as if the handler were not
+    attached, i.e. by ``logging.lastResort`` if no other handler would handle them.
+    """
+
+    def __init__(self, stage: str = "mdformat"):
+        super().__init__()
+        self.stage = stage
+        self._collector: ContextVar[Optional[DiagnosticCollector]] = ContextVar(
+            f"{stage}_collector", default=None
+        )
+
+    @contextmanager
+    def collecting(self, collector: DiagnosticCollector) -> Iterator[None]:
+        """Add records to the collector, within the current context."""
+        token = self._collector.set(collector)
+        try:
+            yield
+        finally:
+            self._collector.reset(token)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        collector = self._collector.get()
+        if collector is None:
+            self._fallback(record)
+            return
+        # records below the level of the collector are not formatted
+        if level_from_logging(record.levelno) < collector.level:
+            return
+        collector.add(diagnostic_from_record(record, self.stage))
+
+    def _fallback(self, record: logging.LogRecord) -> None:
+        """Pass the record to ``logging.lastResort``,
+        if there are no other handlers for the logger (or its ancestors)."""
+        logger: Optional[logging.Logger] = logging.getLogger(record.name)
+        while logger is not None:
+            if any(handler is not self for handler in logger.handlers):
+                return
+            logger = logger.parent if logger.propagate else None
+        last_resort = logging.lastResort
+        if last_resort is not None and record.levelno >= last_resort.level:
+            last_resort.handle(record)
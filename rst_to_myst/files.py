@@ -0,0 +1,215 @@
+"""Discovery of the files to convert, and writing of converted files."""
+
+from collections.abc import Iterable, Iterator, Sequence
+from contextlib import suppress
+from fnmatch import fnmatch
+import os
+from pathlib import Path
+import stat
+from typing import Optional
+import uuid
+
+from .profiling import stage
+
+
+def _match_any(relpath: str, patterns: Iterable[str]) -> bool:
+    """Match a POSIX relative path against glob patterns.
+
+    Patterns without a ``/`` are also matched against the basename only.
+    """
+    name = relpath.rsplit("/", 1)[-1]
+    return any(
+        fnmatch(relpath, pattern) or ("/" not in pattern and fnmatch(name, pattern))
+        for pattern in patterns
+    )
+
+
+class GitIgnore:
+    """A minimal matcher for the patterns of a single ``.gitignore`` file.
+
+    Supports comments, negation (``!``), directory-only patterns (trailing ``/``)
+    and anchored patterns (containing a ``/``), matched with ``fnmatch``.
+    """
+
+    def __init__(self, base: str, lines: Iterable[str]):
+        self.base = base
+        # [(pattern, negate, dir_only, anchored), ...]
+        self.rules: list[tuple[str, bool, bool, bool]] = []
+        for line in lines:
+            pattern = line.strip()
+            if not pattern or pattern.startswith("#"):
+                continue
+            negate = pattern.startswith("!")
+            if negate:
+                pattern = pattern[1:]
+            dir_only = pattern.endswith("/")
+            pattern = pattern.rstrip("/")
+            if pattern.startswith("**/"):
+                pattern = pattern[3:]
+            anchored = "/" in pattern
+            self.rules.append((pattern.lstrip("/"), negate, dir_only, anchored))
+
+    @classmethod
+    def from_directory(cls, directory: str) -> Optional["GitIgnore"]:
+        """Read the ``.gitignore`` in a directory, if present."""
+        try:
+            with open(  # noqa: PTH123
+                os.path.join(directory, ".gitignore"),  # noqa: PTH118
+                encoding="utf8",
+            ) as handle:
+                return cls(directory, handle.readlines())
+        except OSError:
+            return None
+
+    def match(self, path: str, is_dir: bool) -> Optional[bool]:
+        """Return whether the path is ignored, or ``None`` if no rule applies.
+
+        :param path: The path, which must be inside the ``.gitignore`` directory
+        :param is_dir: Whether the path is a directory
+        """
+        relpath = os.path.relpath(path, self.base).replace(os.sep, "/")
+        name = relpath.rsplit("/", 1)[-1]
+        ignored = None
+        for pattern, negate, dir_only, anchored in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if fnmatch(relpath if anchored else name, pattern):
+                ignored = not negate
+        return ignored
+
+
+def _is_ignored(ignores: Sequence[GitIgnore], path: str, is_dir: bool) -> bool:
+    # the deepest .gitignore with a matching rule takes precedence
+    for ignore in reversed(ignores):
+        result = ignore.match(path, is_dir)
+        if result is not None:
+            return result
+    return False
+
+
+def iter_files(
+    paths: Iterable[str],
+    *,
+    include: Sequence[str] = ("*.rst",),
+    exclude: Sequence[str] = (),
+    use_gitignore: bool = False,
+) -> Iterator[Path]:
+    """Lazily yield the files to convert.
+
+    Files given directly are always yielded (unless excluded),
+    directories are walked recursively with ``os.scandir``,
+    without first collecting the full list of files.
+
+    :param paths: File and/or directory paths
+    :param include: Glob patterns of files to yield, when walking directories
+    :param exclude: Glob patterns of files and directories to skip
+    :param use_gitignore: Skip files and directories ignored by ``.gitignore`` files
+    """
+    for path in paths:
+        if not os.path.isdir(path):  # noqa: PTH112
+            if not _match_any(Path(path).as_posix(), exclude):
+                yield Path(path)
+            continue
+
+        # depth-first walk, holding only the directories still to visit
+        stack: list[tuple[str, tuple[GitIgnore, ...]]] = [(path, ())]
+        while stack:
+            directory, ignores = stack.pop()
+            if use_gitignore:
+                ignore = GitIgnore.from_directory(directory)
+                if ignore is not None:
+                    ignores = (*ignores, ignore)
+            try:
+                with os.scandir(directory) as iterator:
+                    entries = sorted(iterator, key=lambda entry: entry.name)
+            except OSError:
+                continue
+            subdirs = []
+            for entry in entries:
+                relpath = os.path.relpath(entry.path, path).replace(os.sep, "/")
+                # symlinked directories are not followed (which could loop)
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if (is_dir and entry.name == ".git") or (not is_dir and entry.is_dir()):
+                    continue
+                if _match_any(relpath, exclude):
+                    continue
+                if use_gitignore and _is_ignored(ignores, entry.path, is_dir):
+                    continue
+                if is_dir:
+                    subdirs.append((entry.path, ignores))
+                elif _match_any(relpath, include):
+                    yield Path(entry.path)
+            stack.extend(reversed(subdirs))
+
+
+def match_file(
+    path: str,
+    root: str,
+    *,
+    include: Sequence[str] = ("*.rst",),
+    exclude: Sequence[str] = (),
+    use_gitignore: bool = False,
+) -> bool:
+    """Return whether a file, in a root directory, would be yielded by `iter_files`.
+
+    :param path: The file path
+    :param root: The directory being walked
+    """
+    relpath = os.path.relpath(path, root).replace(os.sep, "/")
+    parts = relpath.split("/")
+    if parts[0] == "..":
+        return False
+    directory = root
+    ignores: tuple[GitIgnore, ...] = ()
+    for index, part in enumerate(parts):
+        is_dir = index < len(parts) - 1
+        if is_dir and part == ".git":
+            return False
+        if _match_any("/".join(parts[: index + 1]), exclude):
+            return False
+        if use_gitignore:
+            ignore = GitIgnore.from_directory(directory)
+            if ignore is not None:
+                ignores = (*ignores, ignore)
+            directory = os.path.join(directory, part)  # noqa: PTH118
+            if _is_ignored(ignores, directory, is_dir):
+                return False
+    return _match_any(relpath, include)
+
+
+def atomic_write(path: Path, data: bytes) -> None:
+    """Write bytes to a temporary file, then atomically rename it to the path.
+
+    This ensures a crash mid-write never leaves a truncated file.
+    The mode of any existing file is preserved.
+    """
+    temp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with temp_path.open("xb") as handle:
+            handle.write(data)
+        with suppress(FileNotFoundError):
+            temp_path.chmod(stat.S_IMODE(path.stat().st_mode))
+        temp_path.replace(path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+
+def write_if_changed(path: Path, text: str, encoding: str = "utf8") -> bool:
+    """Atomically write text to a file, only if its content would change.
+
+    Leaving unchanged files untouched preserves their modification time,
+    so downstream incremental builds are not invalidated.
+
+    :return: Whether the file was written
+    """
+    if os.linesep != "\n":
+        # replicate the newline translation of text mode
+        text = text.replace("\n", os.linesep)
+    data = text.encode(encoding)
+    with stage(None, "write", path=str(path), bytes=len(data)):
+        with suppress(OSError):
+            if path.stat().st_size == len(data) and path.read_bytes() == data:
+                return False
+        atomic_write(path, data)
+    return True
@@ -45,6 +45,7 @@ embedded uri    `uri <a.org>`_
 import contextlib
 import re
 from re import Match, Pattern
+import time
 from typing import Any, Callable
 
 from docutils import ApplicationError, nodes
@@ -829,11 +830,14 @@ class InlinerMyst(Inliner):
         then used to create the requisite nodes and messages.
 
         """
-        return [
-            RoleNode(
-                rawsource, role=role, text=unescape(text, restore_backslashes=True)
-            )
-        ], []
+        costs = getattr(self.document.settings, "costs", None)
+        start = time.perf_counter() if costs is not None else 0.0
+        node = RoleNode(
+            rawsource, role=role, text=unescape(text, restore_backslashes=True)
+        )
+        if costs is not None:
+            costs.add("role", role or "(default)", "parse", time.perf_counter() - start)
+        return [node], []
 
     def phrase_ref(
         self, before: str, after: str, rawsource: str, escaped: str, text: str
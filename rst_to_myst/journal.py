@@ -0,0 +1,123 @@
+"""A checkpoint journal of converted files, so that interrupted runs can resume."""
+
+import json
+import os
+from pathlib import Path
+import time
+from typing import Any, Optional, Union
+
+
+class Journal:
+    """Append a JSON line per completed file, with buffered, periodic syncing.
+
+    Records are written to the OS (and fsync-ed) in batches,
+    so that the journal does not become a bottleneck of the conversion.
+    On an abrupt exit, only the records of the last batch can be lost,
+    and those files are simply converted again on resume.
+
+    Each run starts with a header line, recording the digest of the options,
+    so that only records of runs with the same options are resumed from.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        digest: str,
+        *,
+        batch_size: int = 64,
+        interval: float = 1.0,
+    ):
+        """Open the journal for appending.
+
+        :param path: The journal file
+        :param digest: The digest of the conversion options
+        :param batch_size: Sync after this many records
+        :param interval: Sync when this many seconds have passed since the last sync
+        """
+        self.path = Path(path)
+        self.digest = digest
+        self.batch_size = batch_size
+        self.interval = interval
+        self._buffer: list[str] = []
+        self._last_sync = time.monotonic()
+        self._handle = self.path.open("a", encoding="utf8")
+        if not self._ends_with_newline():
+            # terminate a truncated final record (e.g. from a killed run)
+            self._buffer.append("\n")
+        self._buffer.append(json.dumps({"journal": 1, "options": digest}) + "\n")
+
+    def __enter__(self) -> "Journal":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def _ends_with_newline(self) -> bool:
+        """Return whether the file is empty or ends with a newline."""
+        with self.path.open("rb") as handle:
+            if handle.seek(0, os.SEEK_END) == 0:
+                return True
+            handle.seek(-1, os.SEEK_END)
+            return handle.read(1) == b"\n"
+
+    @staticmethod
+    def load(path: Union[str, Path], digest: str) -> dict[str, dict[str, Any]]:
+        """Load the latest record per input, from runs with the same options.
+
+        A truncated final line (e.g. from a killed run) is ignored.
+        """
+        records: dict[str, dict[str, Any]] = {}
+        current = None
+        try:
+            handle = Path(path).open(encoding="utf8")  # noqa: SIM115
+        except FileNotFoundError:
+            return records
+        with handle:
+            for line in handle:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if "journal" in record:
+                    current = record.get("options")
+                elif current == digest:
+                    records[record["input"]] = record
+        return records
+
+    def write(self, record: dict[str, Any]) -> None:
+        """Add a record, syncing if the batch is full or the interval has passed."""
+        self._buffer.append(json.dumps(record) + "\n")
+        if (
+            len(self._buffer) >= self.batch_size
+            or time.monotonic() - self._last_sync >= self.interval
+        ):
+            self.sync()
+
+    def sync(self) -> None:
+        """Write any buffered records, and sync them to disk."""
+        if self._buffer:
+            self._handle.write("".join(self._buffer))
+            self._buffer = []
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        if not self._handle.closed:
+            self.sync()
+            self._handle.close()
+
+
+def journal_record(
+    path: Union[str, Path],
+    status: str,
+    input_hash: str,
+    output_hash: Optional[str] = None,
+) -> dict[str, Any]:
+    """Create a journal record for a completed file."""
+    return {
+        "input": os.path.abspath(path),  # noqa: PTH100
+        "status": status,
+        "input_hash": input_hash,
+        "output_hash": output_hash,
+    }
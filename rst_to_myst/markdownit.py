@@ -2,12 +2,18 @@
 
 from io import StringIO
 from textwrap import indent
-from typing import IO, Any, NamedTuple, Optional
+import time
+from typing import IO, TYPE_CHECKING, Any, NamedTuple, Optional
 
 from docutils import nodes
 from markdown_it.token import Token
 from mdit_py_plugins import __version__ as mdit_plug_version
 
+from .diagnostics import WARNING, Diagnostic, DiagnosticCollector
+
+if TYPE_CHECKING:
+    from .profiling import CostCounter
+
 
 class RenderOutput(NamedTuple):
     tokens: list[Token]
@@ -27,9 +33,16 @@ class MarkdownItRenderer(nodes.GenericNodeVisitor):
         default_role: Optional[str] = None,
         colon_fences: bool = True,
         dollar_math: bool = True,
+        costs: Optional["CostCounter"] = None,
+        diagnostics: Optional[DiagnosticCollector] = None,
     ):
         self._document = document
-        self._warning_stream = warning_stream or StringIO()
+        # warnings are collected, and written to the warning stream (if any)
+        self.diagnostics = (
+            DiagnosticCollector(stream=warning_stream or StringIO())
+            if diagnostics is None
+            else diagnostics
+        )
         self.raise_on_warning = raise_on_warning
         # prefix added to citation labels
         self.cite_prefix = cite_prefix
@@ -37,6 +50,8 @@ class MarkdownItRenderer(nodes.GenericNodeVisitor):
         self.default_role = default_role
         self.colon_fences = colon_fences
         self.dollar_math = dollar_math
+        # record the time spent rendering each directive/role
+        self.costs = costs
 
         self.reset_state()
 
@@ -49,16 +64,15 @@ class MarkdownItRenderer(nodes.GenericNodeVisitor):
         # [(key path, tokens), ...]
         self._front_matter_tokens: list[tuple[list[str], list[Token]]] = []
         self._tight_list = True
+        # start times of the directives being rendered, if recording costs
+        self._directive_starts: list[float] = []
 
     @property
     def document(self) -> nodes.document:
         return self._document
 
-    def warning(self, message: str, line: Optional[int]):
-        if line is not None:
-            self._warning_stream.write(f"RENDER WARNING:{line}: {message}\n")
-        else:
-            self._warning_stream.write(f"RENDER WARNING: {message}\n")
+    def warning(self, message: str, line: Optional[int], code: Optional[str] = None):
+        self.diagnostics.add(Diagnostic("render", WARNING, line, code, message))
 
     def to_tokens(self) -> RenderOutput:
         """Reset tokens and convert full document."""
@@ -83,11 +97,12 @@ class MarkdownItRenderer(nodes.GenericNodeVisitor):
     def nested_parse(self, nodes: list[nodes.Element]) -> list[Token]:
         new_inst = MarkdownItRenderer(
             document=self._document,
-            warning_stream=self._warning_stream,
+            diagnostics=self.diagnostics,
             cite_prefix=self.cite_prefix,
             default_role=self.default_role,
             colon_fences=self.colon_fences,
             dollar_math=self.dollar_math,
+            costs=self.costs,
         )
         for node in nodes:
             node.walkabout(new_inst)
@@ -135,13 +150,13 @@ class MarkdownItRenderer(nodes.GenericNodeVisitor):
 
     def unknown_visit(self, node):
         message = f"no visit method for: {node.__class__}"
-        self.warning(message, node.line)
+        self.warning(message, node.line, "unknown-visit")
         if self.raise_on_warning:
             raise NotImplementedError(message)
 
     def unknown_departure(self, node):
         message = f"no depart method for: {node.__class__}"
-        self.warning(message, node.line)
+        self.warning(message, node.line, "unknown-depart")
         if self.raise_on_warning:
             raise NotImplementedError(message)
 
@@ -264,7 +279,9 @@ class MarkdownItRenderer(nodes.GenericNodeVisitor):
     def visit_doctest_block(self, node):
         # https://docutils.sourceforge.io/docs/ref/rst/restructuredtext.html#doctest-blocks
         # https://pygments.org/docs/lexers/#pygments.lexers.python.PythonConsoleLexer
-        self.warning("Treating doctest block as pycon literal block", node.line)
+        self.warning(
+            "Treating doctest block as pycon literal block", node.line, "doctest-block"
+        )
         text = node.astext()
         if not text.endswith("\n"):
             text += "\n"
@@ -333,7 +350,7 @@ class MarkdownItRenderer(nodes.GenericNodeVisitor):
             self.add_token("link_close", "a", -1)
         else:
             message = f"unknown reference type: {node.rawsource}"
-            self.warning(message, node.line)
+            self.warning(message, node.line, "unknown-reference")
             if self.raise_on_warning:
                 raise NotImplementedError(message)
 
@@ -343,7 +360,7 @@ class MarkdownItRenderer(nodes.GenericNodeVisitor):
         if node.get("inline"):
             # TODO inline targets
             message = f"inline targets not implemented: {node.rawsource}"
-            self.warning(message, node.line)
+            self.warning(message, node.line, "inline-target")
             if self.raise_on_warning:
                 raise NotImplementedError(message)
             self.add_token(
@@ -502,7 +519,7 @@ class MarkdownItRenderer(nodes.GenericNodeVisitor):
             refname = node["refid"]
         else:
             message = f"unknown footnote reference type: {node.rawsource}"
-            self.warning(message, node.line)
+            self.warning(message, node.line, "unknown-footnote-reference")
             if self.raise_on_warning:
                 raise NotImplementedError(message)
 
@@ -570,6 +587,7 @@ class MarkdownItRenderer(nodes.GenericNodeVisitor):
     # MyST Markdown specific
 
     def visit_RoleNode(self, node):
+        start = time.perf_counter() if self.costs is not None else 0.0
         # TODO nested parse of specific roles
         role = node["role"] or self.default_role
         if role:
@@ -577,12 +595,23 @@ class MarkdownItRenderer(nodes.GenericNodeVisitor):
                 self.add_token(
                     "math_inline", "math", 0, markup="$", content=node["text"].strip()
                 )
+                conversion = "dollarmath"
             else:
                 self.add_token(
                     "myst_role", "", 0, meta={"name": role}, content=node["text"]
                 )
+                conversion = "direct"
         else:
             self.add_token("code_inline", "code", 0, markup="`", content=node["text"])
+            conversion = "literal"
+        if self.costs is not None:
+            self.costs.add(
+                "role",
+                node["role"] or "(default)",
+                "render",
+                time.perf_counter() - start,
+                conversion,
+            )
         raise nodes.SkipNode
 
     def visit_comment(self, node):
@@ -618,6 +647,20 @@ class MarkdownItRenderer(nodes.GenericNodeVisitor):
         raise nodes.SkipNode
 
     def visit_DirectiveNode(self, node):
+        if self.costs is None:
+            return self._visit_directive(node)
+        start = time.perf_counter()
+        try:
+            self._visit_directive(node)
+        except nodes.SkipNode:
+            # rendered without visiting its children
+            self.costs.add(
+                "directive", node["name"], "render", time.perf_counter() - start
+            )
+            raise
+        self._directive_starts.append(start)
+
+    def _visit_directive(self, node):
         markup = "`"
         if self.colon_fences and node["conversion"] in (
             "parse_content",
@@ -690,6 +733,13 @@ class MarkdownItRenderer(nodes.GenericNodeVisitor):
 
     def depart_DirectiveNode(self, node):
         self.add_token("directive_close", "", -1)
+        if self.costs is not None:
+            self.costs.add(
+                "directive",
+                node["name"],
+                "render",
+                time.perf_counter() - self._directive_starts.pop(),
+            )
 
     def visit_ArgumentNode(self, node):
         # TODO might be a better construct to have this as children of inline
@@ -1,17 +1,36 @@
-from collections.abc import Iterable
-import logging
+from collections.abc import Iterable, Sequence
+from io import StringIO
 from textwrap import indent
-from typing import IO, Any, NamedTuple, Optional
+from typing import IO, TYPE_CHECKING, Any, NamedTuple, Optional
 
 from markdown_it.token import Token
 from mdformat.plugins import PARSER_EXTENSIONS
 from mdformat.renderer import LOGGER, MDRenderer, RenderContext, RenderTreeNode
 from mdformat.renderer._util import longest_consecutive_sequence
 
+from .diagnostics import ContextDiagnosticHandler, Diagnostic, DiagnosticCollector
 from .markdownit import MarkdownItRenderer, RenderOutput
+from .namespace import ApplicationNamespace
 from .parser import to_docutils_ast
+from .profiling import (
+    CostCounter,
+    MemoryProfile,
+    Timings,
+    memory_stage,
+    memory_tracing,
+    stage,
+)
 from .utils import yaml_dump
 
+if TYPE_CHECKING:
+    from .cache import ResultCache
+
+# a single handler on the (global) mdformat logger,
+# collecting warnings for the conversion in the current context,
+# so that conversions in concurrent threads do not add/remove handlers
+_MDFORMAT_HANDLER = ContextDiagnosticHandler()
+LOGGER.addHandler(_MDFORMAT_HANDLER)
+
 
 def _unprocessed_render(node: RenderTreeNode, context: RenderContext) -> str:
     """Text that should not be processed in any way (e.g. escaping characters)."""
@@ -114,8 +133,13 @@ def from_tokens(
     *,
     consecutive_numbering: bool = True,
     warning_stream: Optional[IO] = None,
+    diagnostics: Optional[DiagnosticCollector] = None,
 ) -> str:
-    """Convert markdown-it tokens to text."""
+    """Convert markdown-it tokens to text.
+
+    :param warning_stream: The warning IO to write mdformat warnings to
+    :param diagnostics: Collect mdformat warnings (instead of the warning stream)
+    """
     md_renderer = MDRenderer()
     # TODO option for consecutive numbering consecutive_numbering, etc
     options = {
@@ -127,13 +151,10 @@ def from_tokens(
         "mdformat": {"number": consecutive_numbering},
     }
 
-    # temporarily redirect mdformat logging
-    warning_handler = None
-    if warning_stream:
-        warning_handler = logging.StreamHandler(warning_stream)
-        warning_handler.setLevel(logging.WARNING)
-        LOGGER.addHandler(warning_handler)
-    try:
+    # redirect mdformat logging, in the current context
+    if diagnostics is None:
+        diagnostics = DiagnosticCollector(stream=warning_stream)
+    with _MDFORMAT_HANDLER.collecting(diagnostics):
         # mdformat outputs only used reference definitions during 'finalize'
         # instead we want to output all parsed reference definitions
         text = md_renderer.render(output.tokens, options, output.env, finalize=False)
@@ -142,9 +163,6 @@ def from_tokens(
                 text += "\n\n"
             output.env["used_refs"] = set(output.env["references"])
             text += md_renderer._write_references(output.env)
-    finally:
-        if warning_handler:
-            LOGGER.removeHandler(warning_handler)
     if text:
         text += "\n"
     return text
@@ -175,8 +193,13 @@ class ConvertedOutput(NamedTuple):
     text: str
     tokens: list[Token]
     env: dict[str, Any]
-    warning_stream: IO
+    warning_stream: Optional[IO]
     extensions: set[str]
+    timings: Optional[Timings] = None
+    memory: Optional[MemoryProfile] = None
+    costs: Optional[CostCounter] = None
+    diagnostics: Sequence[Diagnostic] = ()
+    """The warnings (and errors) of the conversion."""
 
 
 def rst_to_myst(
@@ -194,12 +217,18 @@ def rst_to_myst(
     consecutive_numbering: bool = True,
     colon_fences: bool = True,
     dollar_math: bool = True,
+    namespace: Optional[ApplicationNamespace] = None,
+    profile: bool = False,
+    memprofile: bool = False,
+    diagnostics: Optional[DiagnosticCollector] = None,
+    cache: Optional["ResultCache"] = None,
 ) -> ConvertedOutput:
     """Convert RST text to MyST Markdown text.
 
     :param text: The input RST text
 
     :param warning_stream: The warning IO to write to
+        (ignored if ``diagnostics`` is given)
     :param language_code: the language module to use,
         for directive/role name translation
     :param use_sphinx: Whether to load sphinx roles, directives and extensions
@@ -215,32 +244,102 @@ def rst_to_myst(
     :param colon_fences: Use colon fences for directives with parsed content
     :param dollar_math: Convert math (where possible) to dollar-delimited math
 
+    :param namespace: A pre-computed namespace of directives/roles to use,
+        otherwise one is compiled from the language/sphinx/extension options
+    :param profile: Record the time taken by each stage, in ``output.timings``,
+        and by each directive/role, in ``output.costs``
+    :param memprofile: Record the memory allocated by each stage
+        (with ``tracemalloc``), in ``output.memory``
+    :param diagnostics: Collect the warnings at or above its level,
+        otherwise warnings are written to the ``warning_stream`` (or a new one).
+        In both cases, the warnings are available as ``output.diagnostics``
+    :param cache: Return a copy of the output of a previous conversion,
+        of the same text with the same options, if cached
+        (not used when profiling, or with a ``namespace``
+        not compiled from the options)
+
     """
-    document, warning_stream = to_docutils_ast(
-        text,
-        warning_stream=warning_stream,
-        language_code=language_code,
-        use_sphinx=use_sphinx,
-        extensions=extensions,
-        default_domain=default_domain,
-        conversions=conversions,
-    )
-    token_renderer = MarkdownItRenderer(
-        document,
-        warning_stream=warning_stream,
-        cite_prefix=cite_prefix,
-        raise_on_warning=raise_on_warning,
-        default_role=default_role,
-        colon_fences=colon_fences,
-        dollar_math=dollar_math,
-    )
-    output = token_renderer.to_tokens()
-    myst_extension = get_myst_extensions(output.tokens)
-    output_text = from_tokens(
-        output,
-        consecutive_numbering=consecutive_numbering,
-        warning_stream=warning_stream,
-    )
+    if diagnostics is None:
+        diagnostics = DiagnosticCollector(
+            stream=StringIO() if warning_stream is None else warning_stream
+        )
+    extensions = list(extensions)
+    # a namespace given directly is only cached (by the options) if compiled from them
+    if (
+        cache is not None
+        and not (profile or memprofile)
+        and (
+            namespace is None
+            or namespace.compiled_from
+            == (tuple(extensions), use_sphinx, default_domain, language_code)
+        )
+    ):
+        options = {
+            "language_code": language_code,
+            "use_sphinx": use_sphinx,
+            "extensions": extensions,
+            "conversions": conversions,
+            "default_domain": default_domain,
+            "default_role": default_role,
+            "raise_on_warning": raise_on_warning,
+            "cite_prefix": cite_prefix,
+            "consecutive_numbering": consecutive_numbering,
+            "colon_fences": colon_fences,
+            "dollar_math": dollar_math,
+        }
+        return cache.convert(
+            text,
+            options,
+            diagnostics,
+            lambda: rst_to_myst(
+                text, namespace=namespace, diagnostics=diagnostics, **options
+            ),
+        )
+    timings = Timings() if profile else None
+    costs = CostCounter() if profile else None
+    memory = MemoryProfile() if memprofile else None
+    with memory_tracing(memory):
+        with memory_stage(memory, "to_docutils_ast"):
+            document, warning_stream = to_docutils_ast(
+                text,
+                language_code=language_code,
+                use_sphinx=use_sphinx,
+                extensions=extensions,
+                default_domain=default_domain,
+                conversions=conversions,
+                namespace=namespace,
+                timings=timings,
+                costs=costs,
+                diagnostics=diagnostics,
+            )
+        token_renderer = MarkdownItRenderer(
+            document,
+            cite_prefix=cite_prefix,
+            raise_on_warning=raise_on_warning,
+            default_role=default_role,
+            colon_fences=colon_fences,
+            dollar_math=dollar_math,
+            costs=costs,
+            diagnostics=diagnostics,
+        )
+        with memory_stage(memory, "to_tokens"), stage(timings, "tokens"):
+            output = token_renderer.to_tokens()
+        myst_extension = get_myst_extensions(output.tokens)
+        render_stage = stage(timings, "render", tokens=len(output.tokens))
+        with memory_stage(memory, "from_tokens"), render_stage:
+            output_text = from_tokens(
+                output,
+                consecutive_numbering=consecutive_numbering,
+                diagnostics=diagnostics,
+            )
     return ConvertedOutput(
-        output_text, output.tokens, output.env, warning_stream, myst_extension
+        output_text,
+        output.tokens,
+        output.env,
+        warning_stream,
+        myst_extension,
+        timings,
+        memory,
+        costs,
+        diagnostics.records,
     )
@@ -1,6 +1,7 @@
 from collections.abc import Iterable
 import contextlib
 import copy
+from functools import lru_cache
 from importlib import import_module
 from inspect import getdoc
 from itertools import chain
@@ -42,6 +43,9 @@ class ApplicationNamespace:
         self.domains: dict[str, DomainMock] = {}
         # the default domain will be tried even without the domain prefix
         self.default_domain = default_domain
+        # (extensions, use_sphinx, default_domain, language_code),
+        # if compiled by ``compile_namespace``
+        self.compiled_from: Optional[tuple] = None
 
         self.language_module: Optional[ModuleType] = languages.get_language(
             language_code
@@ -175,6 +179,83 @@ class ApplicationNamespace:
         }
 
 
+class _RecordingDict(dict):
+    """A registry dict, recording items set on it as calls of an app method."""
+
+    def __init__(self, calls: list, method: str, initial: dict):
+        super().__init__(initial)
+        self.calls = calls
+        self.method = method
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.calls.append((self.method, (key, value), {}))
+
+
+class _SetupRecorder:
+    """A mock ``sphinx.application.Sphinx``,
+    recording the registrations of an extension ``setup``,
+    to replay them on an ``ApplicationNamespace``."""
+
+    _RECORDED = (
+        "add_directive",
+        "add_role",
+        "add_domain",
+        "add_directive_to_domain",
+        "add_role_to_domain",
+    )
+
+    def __init__(self):
+        self.calls: list[tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name: str):
+        if name in self._RECORDED:
+            return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+        return Mock()
+
+
+@lru_cache
+def _record_extension(extname: str) -> tuple[ModuleType, dict, tuple]:
+    """Import an extension and run its ``setup``, recording the registrations.
+
+    This is done once per process (per extension), with the docutils registries
+    (to which some extensions register directly) temporarily replaced under the lock,
+    so that compiling a namespace never mutates global state.
+
+    :returns: The module, the extension metadata, and the recorded calls
+    """
+    from sphinx.errors import ExtensionError
+
+    try:
+        mod = import_module(extname)
+    except ImportError as err:
+        raise ImportError(f"Could not import extension {extname}", err) from err
+
+    setup = getattr(mod, "setup", None)
+    if setup is None:
+        raise ExtensionError(
+            "extension %r has no setup() function; is it really "
+            "a Sphinx extension module?",
+            extname,
+        )
+
+    recorder = _SetupRecorder()
+    with LOCK:
+        old_directives, old_roles = directives._directives, roles._roles
+        directives._directives = _RecordingDict(
+            recorder.calls, "add_directive", old_directives
+        )
+        roles._roles = _RecordingDict(recorder.calls, "add_role", old_roles)
+        try:
+            metadata = setup(recorder) or {}
+        finally:
+            directives._directives, roles._roles = old_directives, old_roles
+
+    if not isinstance(metadata, dict):
+        metadata = {}
+    return mod, metadata, tuple(recorder.calls)
+
+
 def compile_namespace(
     extensions: Iterable[str] = (),
     use_sphinx: bool = True,
@@ -183,14 +264,19 @@ def compile_namespace(
 ) -> ApplicationNamespace:
     """Gather all available directives and roles.
 
+    This is thread-safe: the registrations of each Sphinx extension are recorded
+    once per process, then replayed on the new namespace.
+
     :param extensions: list of extensions to load
     :param use_sphinx: whether to load sphinx extensions
     :param default_domain: default domain to use
     :param language_code: language code to use for translation
     """
+    extensions = tuple(extensions)
     app = ApplicationNamespace(
         default_domain=default_domain, language_code=language_code
     )
+    app.compiled_from = (extensions, use_sphinx, default_domain, language_code)
 
     for key, (modulename, classname) in directives._directive_registry.items():
         if key not in app.directives:
@@ -200,54 +286,25 @@ def compile_namespace(
             except (AttributeError, ModuleNotFoundError):
                 pass
 
-    old_directives = directives._directives
-
-    app.roles.update(roles._role_registry)
-    app.roles.update(roles._roles)
-
-    old_roles = roles._roles
+    # the registry may be temporarily replaced by ``_record_extension``
+    with LOCK:
+        app.roles.update(roles._role_registry)
+        app.roles.update(roles._roles)
 
     if not use_sphinx:
         return app
 
     from sphinx.application import builtin_extensions
-    from sphinx.errors import ExtensionError
     from sphinx.extension import Extension
     from sphinx.registry import EXTENSION_BLACKLIST
 
-    LOCK.acquire()
-    try:
-        directives._directives = app.directives
-        roles._roles = app.roles
-
-        for extname in chain(builtin_extensions, extensions):
-            if extname in app.extensions or extname in EXTENSION_BLACKLIST:
-                continue
-
-            try:
-                mod = import_module(extname)
-            except ImportError as err:
-                raise ImportError(f"Could not import extension {extname}", err) from err
-
-            setup = getattr(mod, "setup", None)
-            if setup is None:
-                raise ExtensionError(
-                    "extension %r has no setup() function; is it really "
-                    "a Sphinx extension module?",
-                    extname,
-                )
-
-            metadata = setup(app) or {}
-
-            if not isinstance(metadata, dict):
-                metadata = {}
-
-            app.extensions[extname] = Extension(extname, mod, **metadata)
-
-    finally:
-        directives._directives = old_directives
-        roles._roles = old_roles
-        LOCK.release()
+    for extname in chain(builtin_extensions, extensions):
+        if extname in app.extensions or extname in EXTENSION_BLACKLIST:
+            continue
+        mod, metadata, calls = _record_extension(extname)
+        for method, args, kwargs in calls:
+            getattr(app, method)(*args, **kwargs)
+        app.extensions[extname] = Extension(extname, mod, **metadata)
 
     return app
 
@@ -0,0 +1,79 @@
+"""Mapping of CLI / configuration options to conversion options."""
+
+from collections.abc import Mapping
+from typing import Any, Optional
+
+# defaults of the CLI options, also used for configuration files and server requests
+CLI_DEFAULTS: dict[str, Any] = {
+    "raise_on_warning": False,
+    "language": "en",
+    "sphinx": True,
+    "extensions": [],
+    "default_domain": "py",
+    "default_role": None,
+    "cite_prefix": "cite",
+    "consecutive_numbering": True,
+    "colon_fences": True,
+    "dollar_math": True,
+    "conversions": {},
+}
+
+# the types of the option values (for options of requests / configuration)
+OPTION_TYPES: dict[str, Any] = {
+    "raise_on_warning": bool,
+    "language": str,
+    "sphinx": bool,
+    "extensions": list,
+    "default_domain": str,
+    "default_role": (str, type(None)),
+    "cite_prefix": str,
+    "consecutive_numbering": bool,
+    "colon_fences": bool,
+    "dollar_math": bool,
+    "conversions": dict,
+}
+
+
+def check_option_types(options: Mapping[str, Any]) -> None:
+    """Check the types of option values (e.g. from a JSON request).
+
+    :raises TypeError: if a value has the wrong type
+    """
+    for name, value in options.items():
+        if name in OPTION_TYPES and not isinstance(value, OPTION_TYPES[name]):
+            raise TypeError(f"{name!r} has the wrong type: {type(value).__name__}")
+    if not all(isinstance(item, str) for item in options.get("extensions", [])):
+        raise TypeError("'extensions' must be a list of strings")
+    conversions = options.get("conversions") or {}
+    if not all(isinstance(item, str) for item in conversions.values()):
+        raise TypeError("'conversions' must be a mapping of strings")
+
+
+def conversion_options(
+    *,
+    raise_on_warning: bool,
+    language: str,
+    sphinx: bool,
+    extensions: list[str],
+    default_domain: str,
+    default_role: Optional[str],
+    cite_prefix: str,
+    consecutive_numbering: bool,
+    colon_fences: bool,
+    dollar_math: bool,
+    conversions,
+) -> dict[str, Any]:
+    """Map CLI options to ``rst_to_myst`` keyword arguments."""
+    return {
+        "raise_on_warning": raise_on_warning,
+        "language_code": language,
+        "use_sphinx": sphinx,
+        "extensions": extensions,
+        "conversions": conversions,
+        "default_domain": default_domain,
+        "default_role": default_role,
+        "cite_prefix": cite_prefix + "_",
+        "consecutive_numbering": consecutive_numbering,
+        "colon_fences": colon_fences,
+        "dollar_math": dollar_math,
+    }
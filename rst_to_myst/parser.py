@@ -1,7 +1,7 @@
 from collections.abc import Iterable
 from functools import lru_cache
 from io import StringIO
-from typing import Any, Optional
+from typing import IO, Any, Optional
 
 from docutils import nodes
 from docutils.frontend import OptionParser
@@ -12,7 +12,7 @@ from docutils.transforms.references import (
     Footnotes,
     PropagateTargets,
 )
-from docutils.utils import new_document, roman
+from docutils.utils import Reporter, SystemMessage, new_document, roman
 import yaml
 
 try:
@@ -21,10 +21,12 @@ except ImportError:
     from importlib_resources import files
 
 from . import data as package_data
+from .diagnostics import DiagnosticCollector
 from .inliner import InlinerMyst
 from .namespace import ApplicationNamespace, compile_namespace
 from .nodes import FrontMatterNode
-from .states import get_state_classes
+from .profiling import CostCounter, Timings, stage
+from .states import NESTED_SM_CACHE, get_state_classes
 
 
 class LosslessRSTParser(Parser):
@@ -36,9 +38,8 @@ class LosslessRSTParser(Parser):
     def __init__(self):
         self.initial_state = "Body"
         self.state_classes = get_state_classes()
-        for state_class in self.state_classes:
-            # flush any cached states from the last parse
-            state_class.nested_sm_cache = []
+        # flush any cached states from the last parse (in this thread)
+        NESTED_SM_CACHE.clear()
         self.inliner = InlinerMyst()
 
 
@@ -149,7 +150,10 @@ def to_docutils_ast(
     conversions: Optional[dict] = None,
     front_matter: bool = True,
     namespace: Optional[ApplicationNamespace] = None,
-) -> tuple[nodes.document, StringIO]:
+    timings: Optional[Timings] = None,
+    costs: Optional[CostCounter] = None,
+    diagnostics: Optional[DiagnosticCollector] = None,
+) -> tuple[nodes.document, Optional[IO]]:
     """Convert a string of text to a docutils AST.
 
     :param text: The text to convert.
@@ -164,10 +168,20 @@ def to_docutils_ast(
     :param conversions: A dictionary of conversion functions.
     :param front_matter: Whether to treat initial field list as front matter.
     :param namespace: A pre-computed docutils namespace to use.
+    :param timings: Record the time taken by each stage.
+    :param costs: Record the time taken by each directive and role.
+    :param diagnostics: Collect structured warnings, at or above its level
+        (otherwise they are collected at the ``report_level``,
+        and written to the ``warning_stream``).
+
+    :returns: The document, and the warning stream (of the diagnostics)
     """
+    if diagnostics is None:
+        diagnostics = DiagnosticCollector(
+            report_level, StringIO() if warning_stream is None else warning_stream
+        )
     settings = OptionParser(components=(LosslessRSTParser,)).get_default_values()
-    warning_stream = StringIO() if warning_stream is None else warning_stream
-    settings.warning_stream = warning_stream
+    settings.warning_stream = diagnostics.stream
     settings.report_level = report_level  # 2=warning
     settings.halt_level = halt_level  # 4=severe
     # The level at or above which `SystemMessage` exceptions
@@ -176,17 +190,26 @@ def to_docutils_ast(
 
     document = new_document(uri, settings=settings)
 
+    # messages are collected (and written) by the diagnostics observer,
+    # which is also responsible for halting (after collecting the message)
+    def _observe(message: nodes.system_message) -> None:
+        diagnostics.add_system_message(message)
+        if message["level"] >= halt_level:
+            raise SystemMessage(message, message["level"])
+
+    document.reporter.stream = None
+    document.reporter.halt_level = Reporter.SEVERE_LEVEL + 1
+    document.reporter.attach_observer(_observe)
+
     # compile lookup for directives/roles
-    namespace = (
-        compile_namespace(
-            language_code=language_code,
-            use_sphinx=use_sphinx,
-            extensions=extensions,
-            default_domain=default_domain,
-        )
-        if namespace is None
-        else namespace
-    )
+    if namespace is None:
+        with stage(timings, "namespace"):
+            namespace = compile_namespace(
+                language_code=language_code,
+                use_sphinx=use_sphinx,
+                extensions=extensions,
+                default_domain=default_domain,
+            )
     document.settings.namespace = namespace
 
     # get conversion lookup for directives
@@ -198,21 +221,27 @@ def to_docutils_ast(
     # whether to treat initial field list as front matter
     document.settings.front_matter = front_matter
 
-    parser = LosslessRSTParser()
-    parser.parse(text, document)
+    # record the cost of each directive/role (if not None)
+    document.settings.costs = costs
+
+    with stage(timings, "parse", chars=len(text)):
+        parser = LosslessRSTParser()
+        parser.parse(text, document)
 
     # these three transforms are required for converting targets correctly
-    for transform_cls in [
-        PropagateTargets,  # Propagate empty internal targets to the next element. (260)
-        FrontMatter,  # convert initial field list (DocInfo=340)
-        AnonymousHyperlinks,  # Link anonymous references to targets. (440)
-        # IndirectHyperlinks,  # "refuri" migrated back to all indirect targets (460)
-        Footnotes,  # Assign numbers to autonumbered footnotes (620)
-        # bespoke transforms
-        StripFootnoteLabel,
-        ResolveListItems,
-    ]:
-        transform = transform_cls(document)
-        transform.apply()
-
-    return document, warning_stream
+    with stage(timings, "transforms"):
+        for transform_cls in [
+            PropagateTargets,  # Propagate empty internal targets to next element (260)
+            FrontMatter,  # convert initial field list (DocInfo=340)
+            AnonymousHyperlinks,  # Link anonymous references to targets. (440)
+            # IndirectHyperlinks,  # "refuri" migrated back to all indirect targets (460)
+            Footnotes,  # Assign numbers to autonumbered footnotes (620)
+            # bespoke transforms
+            StripFootnoteLabel,
+            ResolveListItems,
+        ]:
+            with stage(None, "transform", transform=transform_cls.__name__):
+                transform = transform_cls(document)
+                transform.apply()
+
+    return document, diagnostics.stream
@@ -0,0 +1,479 @@
+"""Run conversions in supervised worker processes, with per-conversion timeouts,
+and recycling of workers after a number of tasks or above a memory ceiling."""
+
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import suppress
+import gc
+import multiprocessing
+from multiprocessing.connection import Connection, wait
+import os
+import signal
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING, Any, NamedTuple, Optional, TypeVar
+
+from .diagnostics import Diagnostic, DiagnosticCollector
+from .profiling import CostCounter, MemoryProfile, Timings
+from .report import count_eval_rst
+
+if TYPE_CHECKING:
+    from .converter import Converter
+
+K = TypeVar("K")
+
+# a short text, exercising the main constructs (without warnings),
+# to warm a converter (loading directive data, compiling regexes, etc)
+WARM_TEXT = """\
+Title
+=====
+
+A *paragraph* with ``literal``, :math:`x^2`, a link_, a [#f]_ footnote,
+a [CIT]_ citation, a |sub| and a :ref:`target`.
+
+- item
+- item
+
+  1. nested
+  2. nested
+
+.. note::
+   :class: tip
+
+   Content
+
+.. code:: python
+
+   x = 1
+
++-----+-----+
+| a   | b   |
++=====+=====+
+| c   | d   |
++-----+-----+
+
+.. _link: https://example.com
+.. [#f] Footnote
+.. [CIT] Citation
+.. |sub| replace:: text
+"""
+
+
+def fork_context() -> Any:
+    """Return the ``fork`` multiprocessing context, where it is available,
+    otherwise the default context.
+
+    On macOS, forking is unsafe (with system frameworks), so the default is used.
+    """
+    if sys.platform != "darwin" and "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def warm(options: dict[str, Any]) -> None:
+    """Prepare this process to fork workers, which then share its state.
+
+    The converter for the options is created (importing Sphinx and its extensions,
+    and compiling the namespace of directives/roles), and used to convert a text
+    (importing the remaining modules, loading the directive data,
+    and compiling regexes), so that forked workers start warm.
+
+    :param options: Keyword arguments for ``Converter``
+    """
+    from .converter import get_converter
+
+    get_converter(**options).convert(WARM_TEXT)
+
+
+class _Freezer:
+    """Count the holders of a freeze of the garbage collector (see ``freeze``),
+    so that objects are only unfrozen once all have released it,
+    and never if they were already frozen (e.g. by the application)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._holders = 0
+        self._unfreeze = False
+
+    def freeze(self) -> None:
+        with self._lock:
+            if self._holders == 0:
+                self._unfreeze = gc.get_freeze_count() == 0
+            self._holders += 1
+            gc.collect()
+            gc.freeze()
+
+    def release(self) -> None:
+        with self._lock:
+            self._holders -= 1
+            if self._holders == 0 and self._unfreeze:
+                gc.unfreeze()
+
+
+_FREEZER = _Freezer()
+
+
+def freeze() -> None:
+    """Move all objects to the permanent generation of the garbage collector.
+
+    Forked workers share the memory pages of the parent process copy-on-write,
+    and garbage collections in a worker would otherwise write to (and so copy)
+    every page holding a tracked object.
+    Each call must be paired with a call to ``unfreeze``.
+    """
+    _FREEZER.freeze()
+
+
+def unfreeze() -> None:
+    """Release a ``freeze``.
+
+    Objects are unfrozen once every freeze has been released,
+    unless they were already frozen before the first.
+    """
+    _FREEZER.release()
+
+
+class _ForkedExecutor(ProcessPoolExecutor):
+    """A process pool executor, releasing its freeze on shutdown."""
+
+    def __init__(self, workers: int, options: dict[str, Any]):
+        context = fork_context()
+        self._frozen = context.get_start_method() == "fork"
+        if self._frozen:
+            warm(options)
+            freeze()
+        super().__init__(max_workers=workers, mp_context=context)
+
+    def shutdown(self, *args: Any, **kwargs: Any) -> None:
+        super().shutdown(*args, **kwargs)
+        if self._frozen:
+            self._frozen = False
+            unfreeze()
+
+
+def forked_executor(workers: int, options: dict[str, Any]) -> ProcessPoolExecutor:
+    """Create a process pool executor, with workers forked from this process,
+    once warmed for the options (where ``fork`` is available).
+
+    The workers are started immediately,
+    so that they are forked before any other threads are started.
+    Objects are frozen (see ``freeze``) until the executor is shut down.
+
+    :param workers: Number of worker processes
+    :param options: Keyword arguments for ``Converter``
+    """
+    executor = _ForkedExecutor(workers, options)
+    executor.submit(int).result()
+    return executor
+
+
+class ConversionResult(NamedTuple):
+    """The (picklable) outcome of a single conversion."""
+
+    status: str
+    """One of ``converted``, ``failed`` or ``timeout``."""
+    text: str = ""
+    extensions: tuple[str, ...] = ()
+    eval_rst: int = 0
+    """The number of RST blocks wrapped in an ``eval-rst`` directive."""
+    timings: Optional[Timings] = None
+    memory: Optional[MemoryProfile] = None
+    costs: Optional[CostCounter] = None
+    """The time spent on each directive/role (if profiling)."""
+    duration: float = 0.0
+    """The wall time of the conversion, in seconds."""
+    diagnostics: tuple[Diagnostic, ...] = ()
+    """The warnings of the conversion."""
+    error_type: Optional[str] = None
+    error: Optional[str] = None
+
+
+def run_task(
+    converter: "Converter", text: str, profile: bool = False, memprofile: bool = False
+) -> ConversionResult:
+    """Convert a text, capturing any warnings or exception in the result."""
+    diagnostics = DiagnosticCollector()
+    start = time.perf_counter()
+    try:
+        output = converter.convert(
+            text, profile=profile, memprofile=memprofile, diagnostics=diagnostics
+        )
+    except Exception as exc:
+        return ConversionResult(
+            "failed",
+            duration=time.perf_counter() - start,
+            diagnostics=tuple(diagnostics.records),
+            error_type=type(exc).__name__,
+            error=str(exc),
+        )
+    return ConversionResult(
+        "converted",
+        text=output.text,
+        extensions=tuple(sorted(output.extensions)),
+        eval_rst=count_eval_rst(output.tokens),
+        timings=output.timings,
+        memory=output.memory,
+        costs=output.costs,
+        duration=time.perf_counter() - start,
+        diagnostics=tuple(diagnostics.records),
+    )
+
+
+def rss_bytes() -> Optional[int]:
+    """Return the resident memory of this process, if available (Linux only)."""
+    try:
+        with open("/proc/self/statm", "rb") as handle:  # noqa: PTH123
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _worker_main(
+    conn: Connection,
+    options: dict[str, Any],
+    max_tasks: Optional[int] = None,
+    max_rss: Optional[int] = None,
+) -> None:
+    """Convert ``(text, profile, memprofile)`` tasks received on the connection,
+    until it is closed or ``None`` is received.
+
+    Each result is sent as ``(result, retire)``,
+    where ``retire`` indicates that the worker has reached a limit and exited.
+    """
+    from .converter import get_converter
+
+    # interrupts are handled by the parent process, which stops the workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # with fork, the converter was already warmed in the parent process
+    converter = get_converter(**options)
+    tasks = 0
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        result = run_task(converter, *task)
+        tasks += 1
+        retire = (max_tasks is not None and tasks >= max_tasks) or (
+            max_rss is not None and (rss_bytes() or 0) > max_rss
+        )
+        conn.send((result, retire))
+        if retire:
+            return
+
+
+class _Worker:
+    """A worker process, and the task it is currently running."""
+
+    def __init__(self, context: Any, *args: Any):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child_conn, *args), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.slot: Optional[list] = None
+        self.deadline: Optional[float] = None
+
+    def submit(self, slot: list, task: tuple, timeout: Optional[float]) -> None:
+        self.conn.send(task)
+        self.slot = slot
+        self.deadline = None if timeout is None else time.monotonic() + timeout
+
+    def stop(self, timeout: float = 1.0) -> None:
+        with suppress(OSError):
+            self.conn.send(None)
+        self.process.join(timeout)
+        self.kill()
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class ConversionPool:
+    """A pool of worker processes, each with a warm converter.
+
+    Where available, workers are forked from this process,
+    after it has been warmed (see ``warm``) and its objects frozen (see ``freeze``),
+    so that workers start immediately, sharing its memory copy-on-write,
+    rather than each importing Sphinx and compiling its own converter.
+    The freeze is released when the pool is closed (see ``unfreeze``).
+
+    Each conversion is supervised: if it exceeds the timeout,
+    or the worker exits unexpectedly, the worker is killed and replaced.
+    Workers are also replaced after a number of tasks,
+    or once their resident memory exceeds a ceiling,
+    to bound the memory accumulated over long runs.
+    """
+
+    def __init__(
+        self,
+        options: dict[str, Any],
+        *,
+        workers: int = 1,
+        timeout: Optional[float] = None,
+        max_tasks_per_worker: Optional[int] = None,
+        max_worker_rss: Optional[int] = None,
+        start_method: Optional[str] = None,
+    ):
+        """Start the workers.
+
+        :param options: Keyword arguments for ``Converter``
+        :param workers: Number of worker processes
+        :param timeout: Maximum seconds for a single conversion
+        :param max_tasks_per_worker: Replace a worker after this many conversions
+        :param max_worker_rss: Replace a worker after a conversion,
+            if its resident memory exceeds this many bytes
+        :param start_method: The multiprocessing start method,
+            by default ``fork`` where available (see ``fork_context``)
+        """
+        self.options = options
+        self.timeout = timeout
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.max_worker_rss = max_worker_rss
+        self.restarts = 0
+        """The number of workers replaced."""
+        self._context = (
+            fork_context()
+            if start_method is None
+            else multiprocessing.get_context(start_method)
+        )
+        self._frozen = False
+        if self._context.get_start_method() == "fork":
+            # warm once, so that (re)started workers inherit the state
+            warm(options)
+            freeze()
+            self._frozen = True
+        self._workers = [self._start_worker() for _ in range(workers)]
+
+    def __enter__(self) -> "ConversionPool":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def _start_worker(self) -> _Worker:
+        return _Worker(
+            self._context,
+            self.options,
+            self.max_tasks_per_worker,
+            self.max_worker_rss,
+        )
+
+    def close(self) -> None:
+        """Stop the workers."""
+        for worker in self._workers:
+            worker.stop()
+        self._workers = []
+        if self._frozen:
+            self._frozen = False
+            unfreeze()
+
+    def imap(
+        self,
+        items: Iterable[tuple[K, Optional[str]]],
+        *,
+        profile: bool = False,
+        memprofile: bool = False,
+        ordered: bool = True,
+    ) -> Iterator[tuple[K, Optional[ConversionResult]]]:
+        """Convert ``(key, text)`` items, yielding ``(key, result)``.
+
+        Items are consumed lazily, with a bounded number in flight.
+        Items with a text of ``None`` are passed through with a result of ``None``.
+
+        :param profile: Record the timings of each conversion
+        :param memprofile: Record the memory profile of each conversion
+        :param ordered: Yield results in the order of the items,
+            otherwise yield results as they complete
+            (so that a slow item does not hold up dispatching the following ones)
+        """
+        items = iter(items)
+        window = len(self._workers) * 4
+        # slots of [key, result, done], in the order of the items
+        pending: deque[list] = deque()
+        idle = list(self._workers)
+        busy: list[_Worker] = []
+        exhausted = False
+        while True:
+            while not exhausted and idle and len(pending) < window:
+                try:
+                    key, text = next(items)
+                except StopIteration:
+                    exhausted = True
+                    break
+                slot = [key, None, text is None]
+                pending.append(slot)
+                if text is not None:
+                    worker = idle.pop()
+                    if worker.conn.closed:
+                        # replace a worker that was killed or retired,
+                        # only once there is more work for it
+                        worker = self._replace_worker(worker)
+                    worker.submit(slot, (text, profile, memprofile), self.timeout)
+                    busy.append(worker)
+            while pending and pending[0][2]:
+                key, result, _ = pending.popleft()
+                yield key, result
+            if not ordered:
+                for slot in [slot for slot in pending if slot[2]]:
+                    pending.remove(slot)
+                    yield slot[0], slot[1]
+            if exhausted and not pending:
+                return
+            if not busy:
+                continue
+            for worker in self._wait(busy):
+                busy.remove(worker)
+                idle.append(worker)
+
+    def _replace_worker(self, worker: _Worker) -> _Worker:
+        self.restarts += 1
+        self._workers.remove(worker)
+        replacement = self._start_worker()
+        self._workers.append(replacement)
+        return replacement
+
+    def _wait(self, busy: list[_Worker]) -> list[_Worker]:
+        """Wait for busy workers to finish (or time out), returning them."""
+        deadlines = [worker.deadline for worker in busy if worker.deadline is not None]
+        timeout = max(min(deadlines) - time.monotonic(), 0) if deadlines else None
+        ready = set(wait([worker.conn for worker in busy], timeout))
+        finished = []
+        now = time.monotonic()
+        for worker in busy:
+            slot = worker.slot
+            assert slot is not None
+            if worker.conn in ready:
+                try:
+                    slot[1], retire = worker.conn.recv()
+                    if retire:
+                        worker.stop()
+                except (EOFError, OSError):
+                    worker.kill()
+                    slot[1] = ConversionResult(
+                        "failed",
+                        error_type="WorkerError",
+                        error=f"Worker exited with code {worker.process.exitcode}",
+                    )
+            elif worker.deadline is not None and now >= worker.deadline:
+                worker.kill()
+                slot[1] = ConversionResult(
+                    "timeout",
+                    duration=self.timeout or 0.0,
+                    error_type="TimeoutError",
+                    error=f"Conversion exceeded {self.timeout}s",
+                )
+            else:
+                continue
+            slot[2] = True
+            worker.slot = worker.deadline = None
+            finished.append(worker)
+        return finished
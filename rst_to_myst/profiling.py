@@ -0,0 +1,463 @@
+"""Opt-in instrumentation of the conversion stages."""
+
+from collections.abc import Callable
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+import math
+from threading import Lock
+import time
+import tracemalloc
+from typing import Any, NamedTuple, Optional, Union
+
+_NULL_CONTEXT = nullcontext()
+
+
+class StageEvent(NamedTuple):
+    """An event fired to hooks, before and after each stage of a conversion."""
+
+    name: str
+    """The stage: ``namespace``, ``parse``, ``transforms``,
+    ``transform`` (for each transform), ``tokens``, ``render`` or ``write``."""
+    phase: str
+    """``before`` or ``after``."""
+    info: dict[str, Any]
+    """The payload of the stage, e.g. ``chars`` of the input text."""
+    wall: float = 0.0
+    """The wall time of the stage, in seconds (after only)."""
+    cpu: float = 0.0
+    """The CPU time of the stage (for the current thread), in seconds (after only)."""
+
+
+Hook = Callable[[StageEvent], None]
+
+# a tuple, replaced (not mutated) on change,
+# so that it can be iterated while hooks are added/removed in other threads
+_HOOKS: tuple[Hook, ...] = ()
+
+
+def add_hook(hook: Hook) -> Hook:
+    """Register a hook, to be called with a ``StageEvent`` before and after
+    each stage of every conversion (in this process).
+
+    Hooks are called synchronously, in the order they were added,
+    and any exception they raise propagates to the conversion.
+    Worker processes only inherit hooks registered before they are forked.
+
+    :returns: The hook, so that this can be used as a decorator
+    """
+    global _HOOKS  # noqa: PLW0603
+    _HOOKS = (*_HOOKS, hook)
+    return hook
+
+
+def remove_hook(hook: Hook) -> None:
+    """Unregister a hook (if registered)."""
+    global _HOOKS  # noqa: PLW0603
+    _HOOKS = tuple(item for item in _HOOKS if item != hook)
+
+
+class StageTiming(NamedTuple):
+    """The timing of a single conversion stage, in seconds."""
+
+    name: str
+    wall: float
+    cpu: float
+
+
+class Timings:
+    """Record the wall and CPU time of each stage of a conversion.
+
+    CPU time is measured for the current thread only.
+    """
+
+    def __init__(self):
+        self.stages: list[StageTiming] = []
+
+    def __repr__(self) -> str:
+        return f"Timings(wall={self.wall:.6f}, cpu={self.cpu:.6f})"
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the stage run within the context."""
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            self.stages.append(
+                StageTiming(name, time.perf_counter() - wall, time.thread_time() - cpu)
+            )
+
+    @property
+    def wall(self) -> float:
+        """Total wall time of all stages."""
+        return sum(stage.wall for stage in self.stages)
+
+    @property
+    def cpu(self) -> float:
+        """Total CPU time of all stages."""
+        return sum(stage.cpu for stage in self.stages)
+
+    def as_dict(self) -> dict[str, dict[str, float]]:
+        """Return a mapping of stage name -> wall/cpu seconds."""
+        data: dict[str, dict[str, float]] = {}
+        for stage in self.stages:
+            item = data.setdefault(stage.name, {"wall": 0.0, "cpu": 0.0})
+            item["wall"] += stage.wall
+            item["cpu"] += stage.cpu
+        return data
+
+    def format(self) -> str:
+        """Format as a single line, of wall/cpu milliseconds per stage."""
+        items = [
+            f"{name} {data['wall'] * 1000:.1f}/{data['cpu'] * 1000:.1f}"
+            for name, data in self.as_dict().items()
+        ]
+        items.append(f"total {self.wall * 1000:.1f}/{self.cpu * 1000:.1f}")
+        return "PROFILE (wall/cpu ms): " + ", ".join(items)
+
+
+@contextmanager
+def _hooked_stage(timings: Optional[Timings], name: str, info: dict[str, Any]):
+    hooks = _HOOKS
+    for hook in hooks:
+        hook(StageEvent(name, "before", info))
+    wall, cpu = time.perf_counter(), time.thread_time()
+    try:
+        yield
+    finally:
+        wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+        if timings is not None:
+            timings.stages.append(StageTiming(name, wall, cpu))
+        for hook in hooks:
+            hook(StageEvent(name, "after", info, wall, cpu))
+
+
+def stage(timings: Optional[Timings], name: str, **info: Any) -> AbstractContextManager:
+    """Return a context to time a stage and fire any hooks before and after it,
+    or a no-op context if not profiling and no hooks are registered.
+
+    :param timings: Record the time taken by the stage
+    :param name: The name of the stage
+    :param info: The payload of the stage events
+    """
+    if not _HOOKS:
+        if timings is None:
+            return _NULL_CONTEXT
+        return timings.stage(name)
+    return _hooked_stage(timings, name, info)
+
+
+# the number of memory profiles currently tracing (in any thread),
+# and whether the first started ``tracemalloc`` (so the last should stop it)
+_TRACING_LOCK = Lock()
+_TRACING_COUNT = 0
+_TRACING_STARTED = False
+
+
+def _start_tracing() -> None:
+    global _TRACING_COUNT, _TRACING_STARTED  # noqa: PLW0603
+    with _TRACING_LOCK:
+        if _TRACING_COUNT == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _TRACING_STARTED = True
+        _TRACING_COUNT += 1
+
+
+def _stop_tracing() -> None:
+    global _TRACING_COUNT, _TRACING_STARTED  # noqa: PLW0603
+    with _TRACING_LOCK:
+        _TRACING_COUNT -= 1
+        if _TRACING_COUNT == 0 and _TRACING_STARTED:
+            tracemalloc.stop()
+            _TRACING_STARTED = False
+
+
+class MemoryStage(NamedTuple):
+    """The traced memory of a single conversion stage, in bytes,
+    relative to that at the start of the conversion."""
+
+    name: str
+    peak: int
+    """The peak traced memory during the stage."""
+    retained: int
+    """The traced memory at the end of the stage."""
+
+
+class AllocationSite(NamedTuple):
+    """A source line, and the memory allocated at it (and still retained)."""
+
+    location: str
+    size: int
+    count: int
+
+
+class MemoryProfile:
+    """Record the peak and retained memory of each stage of a conversion,
+    using ``tracemalloc``.
+
+    Only memory allocated by Python is traced,
+    and tracing slows down the conversion considerably,
+    so the profile is for diagnosis, not for routine runs.
+    Tracing is process-wide: profiles may be recorded concurrently
+    (``tracemalloc`` is stopped when the last ends),
+    but then the memory of each includes that of the others.
+    """
+
+    def __init__(self, *, top: int = 10):
+        """Initialise the profile.
+
+        :param top: The number of allocation sites to record
+        """
+        self.top = top
+        self.stages: list[MemoryStage] = []
+        self.sites: list[AllocationSite] = []
+        """The lines that allocated the most memory, retained at the end of tracing."""
+        self._start = 0
+
+    def __repr__(self) -> str:
+        return f"MemoryProfile(peak={self.peak}, retained={self.retained})"
+
+    @contextmanager
+    def tracing(self):
+        """Trace memory within the context (starting ``tracemalloc`` if required),
+        recording the top allocation sites at the end."""
+        _start_tracing()
+        try:
+            self._start = tracemalloc.get_traced_memory()[0]
+            before = tracemalloc.take_snapshot()
+            yield
+            diffs = tracemalloc.take_snapshot().compare_to(before, "lineno")
+            # (filtering the statistics is much faster than filtering the traces)
+            self.sites = [
+                AllocationSite(
+                    f"{diff.traceback[0].filename}:{diff.traceback[0].lineno}",
+                    diff.size_diff,
+                    diff.count_diff,
+                )
+                for diff in diffs
+                if diff.size_diff > 0
+                and diff.traceback[0].filename != tracemalloc.__file__
+            ][: self.top]
+        finally:
+            _stop_tracing()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Record the memory of the stage run within the context."""
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            self.stages.append(
+                MemoryStage(name, peak - self._start, current - self._start)
+            )
+
+    @property
+    def peak(self) -> int:
+        """The peak traced memory of all stages."""
+        return max((stage.peak for stage in self.stages), default=0)
+
+    @property
+    def retained(self) -> int:
+        """The traced memory at the end of the last stage."""
+        return self.stages[-1].retained if self.stages else 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a mapping of stage name -> peak/retained bytes,
+        and of ``sites`` -> allocation sites."""
+        data: dict[str, Any] = {
+            stage.name: {"peak": stage.peak, "retained": stage.retained}
+            for stage in self.stages
+        }
+        data["sites"] = [site._asdict() for site in self.sites]
+        return data
+
+    def format(self) -> str:
+        """Format as a line of peak/retained KiB per stage,
+        followed by a line per allocation site."""
+        items = [
+            f"{stage.name} {stage.peak / 1024:.1f}/{stage.retained / 1024:.1f}"
+            for stage in self.stages
+        ]
+        lines = ["MEMPROFILE (peak/retained KiB): " + ", ".join(items)]
+        lines.extend(
+            f"  {site.size / 1024:>10.1f} KiB {site.count:>8} blocks  {site.location}"
+            for site in self.sites
+        )
+        return "\n".join(lines)
+
+
+def memory_tracing(memory: Optional[MemoryProfile]) -> AbstractContextManager:
+    """Return a context to trace memory, or a no-op context if not profiling."""
+    if memory is None:
+        return _NULL_CONTEXT
+    return memory.tracing()
+
+
+def memory_stage(memory: Optional[MemoryProfile], name: str) -> AbstractContextManager:
+    """Return a context to record the memory of a stage,
+    or a no-op context if not profiling."""
+    if memory is None:
+        return _NULL_CONTEXT
+    return memory.stage(name)
+
+
+class CostCounter:
+    """Count the occurrences, conversion types and time spent,
+    per directive and role name.
+
+    Times are inclusive of any nested directives/roles,
+    and are recorded separately for the parse and render (to tokens) stages.
+    Counters of multiple conversions can be merged, to aggregate a batch.
+    """
+
+    kinds = ("directive", "role")
+
+    def __init__(self):
+        # kind -> name -> {"count", "parse", "render", "conversions"}
+        self.items: dict[str, dict[str, dict[str, Any]]] = {
+            kind: {} for kind in self.kinds
+        }
+
+    def __repr__(self) -> str:
+        counts = ", ".join(f"{kind}s={len(self.items[kind])}" for kind in self.kinds)
+        return f"CostCounter({counts})"
+
+    def _item(self, kind: str, name: str) -> dict[str, Any]:
+        item = self.items[kind].get(name)
+        if item is None:
+            item = self.items[kind][name] = {
+                "count": 0,
+                "parse": 0.0,
+                "render": 0.0,
+                "conversions": {},
+            }
+        return item
+
+    def add(
+        self,
+        kind: str,
+        name: str,
+        stage: str,
+        duration: float,
+        conversion: Optional[str] = None,
+    ) -> None:
+        """Add the time spent on an occurrence of a directive/role in a stage.
+
+        :param kind: ``directive`` or ``role``
+        :param name: The name of the directive/role
+        :param stage: ``parse`` or ``render``
+        :param duration: The time spent, in seconds
+        :param conversion: The conversion type (e.g. ``direct``, ``eval_rst``),
+            given in only one stage of each occurrence, to count it
+        """
+        item = self._item(kind, name)
+        item[stage] += duration
+        if conversion is not None:
+            item["count"] += 1
+            item["conversions"][conversion] = item["conversions"].get(conversion, 0) + 1
+
+    def update(self, other: Union["CostCounter", dict[str, Any]]) -> None:
+        """Merge the counts of another counter (or its ``as_dict``)."""
+        data = other.as_dict() if isinstance(other, CostCounter) else other
+        for kind in self.kinds:
+            for name, other_item in data.get(f"{kind}s", {}).items():
+                item = self._item(kind, name)
+                item["count"] += other_item["count"]
+                item["parse"] += other_item["parse"]
+                item["render"] += other_item["render"]
+                for conversion, count in other_item["conversions"].items():
+                    item["conversions"][conversion] = (
+                        item["conversions"].get(conversion, 0) + count
+                    )
+
+    def as_dict(self) -> dict[str, dict[str, dict[str, Any]]]:
+        """Return a mapping of ``directives``/``roles`` -> name -> counts."""
+        return {
+            f"{kind}s": {
+                name: {**item, "conversions": dict(item["conversions"])}
+                for name, item in self.items[kind].items()
+            }
+            for kind in self.kinds
+        }
+
+    def format(self, top: int = 10) -> str:
+        """Format as a table of the most costly directives/roles (ms)."""
+        rows = sorted(
+            (
+                (item["parse"] + item["render"], kind, name, item)
+                for kind in self.kinds
+                for name, item in self.items[kind].items()
+            ),
+            key=lambda row: -row[0],
+        )
+        lines = [
+            "COSTS (ms):",
+            f"{'name':<24}{'count':>8}{'parse':>10}{'render':>10}  conversions",
+        ]
+        for _, kind, name, item in rows[:top]:
+            conversions = ", ".join(
+                f"{conversion} {count}"
+                for conversion, count in sorted(item["conversions"].items())
+            )
+            lines.append(
+                f"{kind + ' ' + name:<24}{item['count']:>8}"
+                f"{item['parse'] * 1000:>10.1f}{item['render'] * 1000:>10.1f}"
+                f"  {conversions}"
+            )
+        return "\n".join(lines)
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """Return the nearest-rank percentile of sorted values."""
+    if not values:
+        return 0.0
+    rank = max(math.ceil(percent / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+class TimingsSummary:
+    """Aggregate stage timings across a batch of conversions."""
+
+    percentiles = (50, 90, 99)
+
+    def __init__(self):
+        self._walls: dict[str, list[float]] = {}
+        self._cpus: dict[str, list[float]] = {}
+        self.count = 0
+
+    def add(self, timings: Timings) -> None:
+        """Add the timings of a single conversion."""
+        self.count += 1
+        for name, data in timings.as_dict().items():
+            self._walls.setdefault(name, []).append(data["wall"])
+            self._cpus.setdefault(name, []).append(data["cpu"])
+        self._walls.setdefault("total", []).append(timings.wall)
+        self._cpus.setdefault("total", []).append(timings.cpu)
+
+    def as_dict(self) -> dict[str, dict[str, float]]:
+        """Return a mapping of stage name -> statistics (in seconds)."""
+        data = {}
+        for name, values in self._walls.items():
+            walls = sorted(values)
+            data[name] = {
+                **{f"p{p}": percentile(walls, p) for p in self.percentiles},
+                "max": walls[-1],
+                "wall": sum(walls),
+                "cpu": sum(self._cpus[name]),
+            }
+        return data
+
+    def format(self) -> str:
+        """Format as a table of wall times (ms) per stage."""
+        headers = [*(f"p{p}" for p in self.percentiles), "max", "wall", "cpu"]
+        lines = [
+            f"PROFILE SUMMARY ({self.count} files, ms):",
+            f"{'stage':<12}" + "".join(f"{header:>10}" for header in headers),
+        ]
+        for name, stats in self.as_dict().items():
+            lines.append(
+                f"{name:<12}"
+                + "".join(f"{stats[header] * 1000:>10.1f}" for header in headers)
+            )
+        return "\n".join(lines)
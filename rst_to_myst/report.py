@@ -0,0 +1,94 @@
+"""Machine-readable reports of file conversions."""
+
+from collections import Counter
+from collections.abc import Iterable, Iterator
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Union
+
+from .profiling import CostCounter
+
+if TYPE_CHECKING:
+    from markdown_it.token import Token
+
+
+def count_eval_rst(tokens: Iterable["Token"]) -> int:
+    """Count the RST blocks which could not be converted, and so are wrapped
+    in an ``eval-rst`` directive."""
+    return sum(
+        1 for token in tokens if token.type == "fence" and token.info == "{eval-rst}"
+    )
+
+
+class ReportWriter:
+    """Write per-file conversion records as JSON lines.
+
+    Each record is written (and flushed) as soon as it is received,
+    so that memory use is bounded for large runs.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self._handle = Path(path).open("w", encoding="utf8")  # noqa: SIM115
+
+    def __enter__(self) -> "ReportWriter":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def write(self, record: dict[str, Any]) -> None:
+        self._handle.write(json.dumps(record, default=str) + "\n")
+        self._handle.flush()
+
+    def close(self) -> None:
+        self._handle.close()
+
+
+def read_reports(paths: Iterable[Union[str, Path]]) -> Iterator[dict[str, Any]]:
+    """Yield the records of one or more reports."""
+    for path in paths:
+        with Path(path).open(encoding="utf8") as handle:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def summarize_reports(records: Iterable[dict[str, Any]]) -> dict[str, Any]:
+    """Combine report records (e.g. from several shards) into a single summary.
+
+    If an input appears in more than one record, only the last is counted.
+    """
+    latest: dict[str, dict[str, Any]] = {}
+    duplicates = 0
+    for record in records:
+        if record["input"] in latest:
+            duplicates += 1
+        latest[record["input"]] = record
+    statuses: Counter[str] = Counter()
+    warnings: Counter[str] = Counter()
+    extensions: set[str] = set()
+    totals = dict.fromkeys(("input_bytes", "output_bytes", "eval_rst"), 0)
+    duration = 0.0
+    failed = []
+    costs = CostCounter()
+    for path, record in sorted(latest.items()):
+        statuses[record["status"]] += 1
+        warnings.update(record.get("warnings", {}))
+        extensions.update(record.get("extensions", []))
+        for key in totals:
+            totals[key] += record.get(key, 0)
+        duration += record.get("duration", 0.0)
+        costs.update(record.get("costs", {}))
+        if record["status"] in ("failed", "timeout"):
+            failed.append(path)
+    return {
+        "files": len(latest),
+        "duplicates": duplicates,
+        "status": dict(sorted(statuses.items())),
+        "extensions": sorted(extensions),
+        "warnings": dict(sorted(warnings.items())),
+        **totals,
+        "duration": round(duration, 6),
+        "failed": failed,
+        "costs": costs.as_dict(),
+    }
@@ -0,0 +1,49 @@
+"""Ordering of files for conversion, to reduce the wall time of parallel runs."""
+
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+
+SCHEDULES = ("fifo", "lpt")
+
+
+def _size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+def estimate_costs(
+    paths: Iterable[Path], durations: Mapping[Path, float]
+) -> dict[Path, float]:
+    """Estimate the cost (seconds) of converting each file.
+
+    Previous durations are used where available, otherwise the file size,
+    scaled by the seconds per byte of the files with previous durations.
+
+    :param durations: Previous conversion durations, e.g. from the cache
+    """
+    sizes = {path: _size(path) for path in paths}
+    known_bytes = sum(sizes[path] for path in sizes if path in durations)
+    known_seconds = sum(durations[path] for path in sizes if path in durations)
+    rate = known_seconds / known_bytes if known_bytes and known_seconds else 1.0
+    return {
+        path: durations[path] if path in durations else size * rate
+        for path, size in sizes.items()
+    }
+
+
+def lpt_order(costs: Mapping[Path, float]) -> list[Path]:
+    """Order files longest processing time (LPT) first.
+
+    Dispatching the longest conversions first, with the shortest at the end
+    filling in idle workers, avoids one large file dominating the tail of a run.
+    """
+    return sorted(costs, key=lambda path: (-costs[path], str(path)))
+
+
+def parallel_efficiency(busy: float, wall: float, workers: int) -> float:
+    """Return the fraction of the workers' available time spent converting."""
+    if wall <= 0 or workers <= 0:
+        return 0.0
+    return min(busy / (wall * workers), 1.0)
@@ -0,0 +1,317 @@
+"""A long-running conversion server, speaking newline-delimited JSON-RPC 2.0.
+
+Requests are JSON objects, one per line, e.g.::
+
+    {"jsonrpc": "2.0", "id": 1, "method": "convert", "params": {"text": "*a*"}}
+
+Methods are ``convert``, ``ast`` and ``tokens``.
+Besides ``text``, params may contain any of the CLI / configuration options
+(e.g. ``extensions``, ``colon_fences``), which override the server defaults.
+Responses are written one per line, as they complete, so may be out of order.
+"""
+
+from collections.abc import Mapping
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from contextlib import suppress
+from io import StringIO
+import json
+import os
+from pathlib import Path
+import socket
+import socketserver
+import stat
+import threading
+from typing import IO, Any, Callable, Optional
+
+from .options import CLI_DEFAULTS, check_option_types, conversion_options
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+CONVERSION_ERROR = -32000
+
+METHODS = ("convert", "ast", "tokens")
+
+
+def run_request(method: str, text: str, options: dict[str, Any]) -> dict[str, Any]:
+    """Run a single request (in a worker), returning the JSON-able result.
+
+    :param method: One of ``METHODS``
+    :param text: The RST text
+    :param options: Keyword arguments for ``Converter``
+    """
+    from .converter import get_converter
+    from .parser import to_docutils_ast
+
+    # the converter (and its namespace) is reused for requests with the same options
+    converter = get_converter(**options)
+    warning_stream = StringIO()
+    if method == "ast":
+        document, _ = to_docutils_ast(
+            text,
+            warning_stream=warning_stream,
+            language_code=options["language_code"],
+            conversions=options["conversions"],
+            namespace=converter.namespace,
+        )
+        result: dict[str, Any] = {"ast": document.pformat()}
+    else:
+        output = converter.convert(text, warning_stream=warning_stream)
+        if method == "tokens":
+            result = {"tokens": [token.as_dict() for token in output.tokens]}
+        else:
+            result = {"text": output.text, "extensions": sorted(output.extensions)}
+    result["warnings"] = warning_stream.getvalue().splitlines()
+    return result
+
+
+class RequestError(Exception):
+    """An error in the format of a request."""
+
+    def __init__(self, code: int, message: str, request_id: Any = None):
+        super().__init__(message)
+        self.code = code
+        self.request_id = request_id
+
+
+class Server:
+    """Handle JSON-RPC requests concurrently, with a pool of workers.
+
+    With a single worker, requests are handled in a thread of this process,
+    otherwise by a pool of processes.
+    In both cases, each worker keeps a warm converter per set of options
+    (worker processes are forked from this process, warmed for the default options).
+    """
+
+    def __init__(
+        self,
+        defaults: Optional[Mapping[str, Any]] = None,
+        *,
+        workers: int = 1,
+        max_pending: Optional[int] = None,
+    ):
+        """Initialise the server.
+
+        :param defaults: Default CLI / configuration options for requests
+        :param workers: Number of workers
+        :param max_pending: The maximum number of requests in flight
+            (by default four per worker), after which reading requests blocks
+        """
+        from .pool import forked_executor
+
+        self._slots = threading.BoundedSemaphore(max_pending or max(workers, 1) * 4)
+
+        self.defaults = {**CLI_DEFAULTS, **(defaults or {})}
+        self.executor: Executor = (
+            ThreadPoolExecutor(max_workers=1)
+            if workers <= 1
+            else forked_executor(workers, conversion_options(**self.defaults))
+        )
+
+    def __enter__(self) -> "Server":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Wait for pending requests, then shut down the workers."""
+        self.executor.shutdown(wait=True)
+
+    def parse_request(self, line: str) -> tuple[Any, str, str, dict[str, Any]]:
+        """Parse and validate a request line.
+
+        :returns: (id, method, text, options)
+        :raises RequestError: if the request is invalid
+        """
+        try:
+            request = json.loads(line)
+        except ValueError as exc:
+            raise RequestError(PARSE_ERROR, f"Parse error: {exc}") from exc
+        if not isinstance(request, dict):
+            raise RequestError(INVALID_REQUEST, "Invalid request")
+        request_id = request.get("id")
+        method = request.get("method")
+        if not isinstance(method, str):
+            raise RequestError(INVALID_REQUEST, "Invalid request", request_id)
+        if method not in METHODS:
+            raise RequestError(
+                METHOD_NOT_FOUND, f"Method not found: {method!r}", request_id
+            )
+        params = request.get("params", {})
+        if not isinstance(params, dict) or not isinstance(params.get("text"), str):
+            raise RequestError(
+                INVALID_PARAMS, "params must contain a 'text' string", request_id
+            )
+        params = dict(params)
+        text = params.pop("text")
+        unknown = set(params).difference(self.defaults)
+        if unknown:
+            raise RequestError(
+                INVALID_PARAMS, f"Unknown params: {sorted(unknown)}", request_id
+            )
+        try:
+            check_option_types(params)
+        except TypeError as exc:
+            raise RequestError(INVALID_PARAMS, str(exc), request_id) from exc
+        options = conversion_options(**{**self.defaults, **params})
+        return request_id, method, text, options
+
+    def handle_line(self, line: str, respond: Callable[[dict[str, Any]], None]):
+        """Handle a single request line, calling ``respond`` once complete.
+
+        Blocks while the maximum number of requests are in flight.
+        """
+        if not line.strip():
+            return
+        try:
+            request_id, method, text, options = self.parse_request(line)
+        except RequestError as exc:
+            respond(error_response(exc.request_id, exc.code, str(exc)))
+            return
+        except Exception as exc:
+            respond(
+                error_response(
+                    _request_id(line),
+                    INTERNAL_ERROR,
+                    f"Internal error: {type(exc).__name__}: {exc}",
+                )
+            )
+            return
+
+        def _callback(future: Future) -> None:
+            self._slots.release()
+            try:
+                result = future.result()
+            except Exception as exc:
+                respond(
+                    error_response(
+                        request_id, CONVERSION_ERROR, f"{type(exc).__name__}: {exc}"
+                    )
+                )
+            else:
+                respond({"jsonrpc": "2.0", "id": request_id, "result": result})
+
+        self._slots.acquire()
+        try:
+            future = self.executor.submit(run_request, method, text, options)
+        except Exception as exc:
+            self._slots.release()
+            respond(
+                error_response(
+                    request_id,
+                    INTERNAL_ERROR,
+                    f"Internal error: {type(exc).__name__}: {exc}",
+                )
+            )
+            return
+        future.add_done_callback(_callback)
+
+    def serve_stream(self, instream: IO[str], outstream: IO[str]) -> None:
+        """Serve requests from an input stream until EOF, e.g. stdin/stdout."""
+        write_lock = threading.Lock()
+
+        def _respond(response: dict[str, Any]) -> None:
+            with write_lock:
+                outstream.write(json.dumps(response) + "\n")
+                outstream.flush()
+
+        for line in instream:
+            self.handle_line(line, _respond)
+        self.close()
+
+    def serve_unix(self, path: str, ready: Optional[Callable[[], None]] = None) -> None:
+        """Serve requests on a Unix socket (each connection in its own thread).
+
+        A stale socket at the path (of a server no longer running) is replaced,
+        and the socket is removed once the server stops.
+
+        :param path: The path of the socket
+        :param ready: Called once the socket is bound, e.g. to announce it
+        :raises FileExistsError: if the path exists, and is not a stale socket
+        """
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                server.serve_connection(self.rfile, self.wfile)
+
+        _remove_stale_socket(path)
+        unix_server = socketserver.ThreadingUnixStreamServer(path, Handler)
+        try:
+            with unix_server:
+                if ready is not None:
+                    ready()
+                unix_server.serve_forever()
+        finally:
+            Path(path).unlink(missing_ok=True)
+
+    def serve_connection(self, rfile: IO[bytes], wfile: IO[bytes]) -> None:
+        """Serve requests from a socket connection, until it is closed."""
+        write_lock = threading.Lock()
+        pending: list[threading.Event] = []
+
+        def _respond(response: dict[str, Any]) -> None:
+            # the response is dropped if the client has disconnected
+            with write_lock, suppress(OSError):
+                wfile.write((json.dumps(response) + "\n").encode("utf8"))
+                wfile.flush()
+
+        for line in rfile:
+            if not line.strip():
+                continue
+            done = threading.Event()
+            pending.append(done)
+
+            def _respond_and_set(response: dict[str, Any], done=done) -> None:
+                try:
+                    _respond(response)
+                finally:
+                    done.set()
+
+            self.handle_line(line.decode("utf8"), _respond_and_set)
+            pending = [event for event in pending if not event.is_set()]
+        # wait for responses, before the connection is closed
+        for event in pending:
+            event.wait()
+
+
+def _remove_stale_socket(path: str) -> None:
+    """Remove a socket at the path, if no server is listening on it.
+
+    :raises FileExistsError: if the path is not a socket, or a server is listening
+    """
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"Path exists and is not a socket: {path}")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+        except ConnectionRefusedError:
+            Path(path).unlink(missing_ok=True)
+            return
+        except FileNotFoundError:
+            return
+    raise FileExistsError(f"Socket is in use by another server: {path}")
+
+
+def _request_id(line: str) -> Any:
+    """Return the id of a request line, if it can be parsed."""
+    try:
+        request = json.loads(line)
+    except ValueError:
+        return None
+    return request.get("id") if isinstance(request, dict) else None
+
+
+def error_response(request_id: Any, code: int, message: str) -> dict[str, Any]:
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "error": {"code": code, "message": message},
+    }
@@ -0,0 +1,109 @@
+"""Deterministic assignment of files to shards, e.g. across CI nodes."""
+
+from collections.abc import Iterable, Iterator, Mapping
+import hashlib
+import heapq
+import json
+import os
+from pathlib import Path
+from typing import Optional, Union
+
+
+def parse_shard(text: str) -> tuple[int, int]:
+    """Parse a ``K/N`` shard specification, with ``1 <= K <= N``.
+
+    :returns: (K, N)
+    :raises ValueError: if the specification is invalid
+    """
+    index, sep, count = text.partition("/")
+    if not sep or not index.strip().isdigit() or not count.strip().isdigit():
+        raise ValueError(f"shard must be of the form K/N: {text!r}")
+    if not 1 <= int(index) <= int(count):
+        raise ValueError(f"shard index must be between 1 and {int(count)}: {text!r}")
+    return int(index), int(count)
+
+
+def shard_key(path: Union[str, Path]) -> str:
+    """Return the key of a file, used to assign it to a shard.
+
+    This is the POSIX path relative to the current working directory
+    (if possible), so is stable across machines with the same checkout layout.
+    """
+    try:
+        relpath = os.path.relpath(path)
+    except ValueError:  # e.g. a different drive on Windows
+        relpath = str(path)
+    return Path(relpath).as_posix()
+
+
+def hash_shard(key: str, count: int) -> int:
+    """Return the (1-based) shard of a key, from a stable hash."""
+    digest = hashlib.sha256(key.encode("utf8")).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+
+def load_manifest(path: Union[str, Path]) -> dict[str, float]:
+    """Load the weights of files, for balancing shards.
+
+    The manifest is either a JSON object mapping file paths to weights
+    (e.g. sizes or durations), or a previous ``--report`` (JSON lines),
+    in which case the ``input_bytes`` of each record are used.
+    """
+    text = Path(path).read_text("utf8")
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = None
+    if isinstance(data, dict) and "input" not in data:
+        return {shard_key(key): float(value) for key, value in data.items()}
+    weights = {}
+    for line in text.splitlines():
+        if line.strip():
+            record = json.loads(line)
+            weights[shard_key(record["input"])] = float(record["input_bytes"])
+    return weights
+
+
+def balance(weights: Mapping[str, float], count: int) -> dict[str, int]:
+    """Partition weighted keys into shards of near-equal total weight.
+
+    Keys are assigned heaviest first, each to the (1-based) shard with the
+    least total weight so far, which is deterministic for the same weights.
+    """
+    # heap of (total weight, shard)
+    totals = [(0.0, shard) for shard in range(1, count + 1)]
+    shards = {}
+    for key, weight in sorted(weights.items(), key=lambda item: (-item[1], item[0])):
+        total, shard = heapq.heappop(totals)
+        shards[key] = shard
+        heapq.heappush(totals, (total + weight, shard))
+    return shards
+
+
+class Sharder:
+    """Select the files that belong to a single shard."""
+
+    def __init__(
+        self, index: int, count: int, manifest: Optional[Mapping[str, float]] = None
+    ):
+        """Initialise the sharder.
+
+        :param index: The (1-based) shard to select
+        :param count: The total number of shards
+        :param manifest: Weights of files, to balance the shards by
+            (files not in the manifest are assigned by a hash of their path)
+        """
+        self.index = index
+        self.count = count
+        self._balanced = balance(manifest, count) if manifest else {}
+
+    def shard_of(self, path: Union[str, Path]) -> int:
+        """Return the (1-based) shard of a file."""
+        key = shard_key(path)
+        if key in self._balanced:
+            return self._balanced[key]
+        return hash_shard(key, self.count)
+
+    def select(self, paths: Iterable[Path]) -> Iterator[Path]:
+        """Yield only the paths that belong to this shard."""
+        return (path for path in paths if self.shard_of(path) == self.index)
@@ -1,6 +1,8 @@
 """docutils states."""
 
 import re
+import threading
+import time
 from typing import Optional
 
 from docutils import nodes
@@ -25,6 +27,31 @@ from .nodes import (
 SIMPLENAME_RE = r"(?:(?!_)\w)+(?:[-._+:](?:(?!_)\w)+)*"
 
 
+class NestedStateMachineCache:
+    """A per-thread cache of nested state machines, shared by the state classes.
+
+    docutils caches them in a list on the (shared) state classes,
+    which is not safe when documents are parsed concurrently in several threads.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def __get__(self, instance, owner) -> list:
+        try:
+            return self._local.cache
+        except AttributeError:
+            self._local.cache = []
+            return self._local.cache
+
+    def clear(self) -> None:
+        """Flush the cache of the current thread."""
+        self._local.cache = []
+
+
+NESTED_SM_CACHE = NestedStateMachineCache()
+
+
 def get_state_classes():
     # state classes are parsed to the StateMachine class
     # and convert to a dict, with keys denoted by the class names
@@ -34,10 +61,10 @@ def get_state_classes():
         BulletList,
         DefinitionList,
         EnumeratedList,
-        states.FieldList,
-        states.OptionList,
-        states.LineBlock,
-        states.ExtensionOptions,
+        FieldList,
+        OptionList,
+        LineBlock,
+        ExtensionOptions,
         Explicit,
         Text,
         Definition,
@@ -107,6 +134,22 @@ class ExplicitMixin:
 
     def directive(self, match, **option_presets):
         """Returns a 2-tuple: list of nodes, and a "blank finish" boolean."""
+        costs = getattr(self.document.settings, "costs", None)
+        if costs is None:
+            return self._directive(match)
+        start = time.perf_counter()
+        nodelist, blank_finish = self._directive(match)
+        node = nodelist[0]
+        costs.add(
+            "directive",
+            match.group(1),
+            "parse",
+            time.perf_counter() - start,
+            "eval_rst" if isinstance(node, EvalRstNode) else node["conversion"],
+        )
+        return nodelist, blank_finish
+
+    def _directive(self, match):
         type_name = match.group(1)
 
         (
@@ -505,3 +548,45 @@ class EnumeratedList(ExplicitMixin, states.EnumeratedList):
             "state_classes": get_state_classes(),
             "initial_state": "Body",
         }
+
+
+class FieldList(states.FieldList):
+    def __init__(self, state_machine, debug=False):
+        super().__init__(state_machine, debug=debug)
+        self.nested_sm_kwargs = {
+            "state_classes": get_state_classes(),
+            "initial_state": "Body",
+        }
+
+
+class OptionList(states.OptionList):
+    def __init__(self, state_machine, debug=False):
+        super().__init__(state_machine, debug=debug)
+        self.nested_sm_kwargs = {
+            "state_classes": get_state_classes(),
+            "initial_state": "Body",
+        }
+
+
+class LineBlock(states.LineBlock):
+    def __init__(self, state_machine, debug=False):
+        super().__init__(state_machine, debug=debug)
+        self.nested_sm_kwargs = {
+            "state_classes": get_state_classes(),
+            "initial_state": "Body",
+        }
+
+
+class ExtensionOptions(states.ExtensionOptions):
+    def __init__(self, state_machine, debug=False):
+        super().__init__(state_machine, debug=debug)
+        self.nested_sm_kwargs = {
+            "state_classes": get_state_classes(),
+            "initial_state": "Body",
+        }
+
+
+# cache nested state machines per thread, rather than on the (shared) classes
+# (all of which are subclasses defined here, so docutils' own are unaffected)
+for _state_class in get_state_classes():
+    _state_class.nested_sm_cache = NESTED_SM_CACHE
@@ -0,0 +1,247 @@
+"""Watch files for changes, using inotify on Linux or polling otherwise."""
+
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from contextlib import suppress
+import ctypes
+import ctypes.util
+import os
+from pathlib import Path
+import select
+import struct
+import sys
+import time
+from typing import Optional
+
+from .files import iter_files, match_file
+
+# inotify event masks, from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class Watcher(ABC):
+    """Base class for watching the files that `iter_files` would yield."""
+
+    def __init__(
+        self,
+        paths: Sequence[str],
+        *,
+        include: Sequence[str] = ("*.rst",),
+        exclude: Sequence[str] = (),
+        use_gitignore: bool = False,
+    ):
+        self.paths = [str(path) for path in paths]
+        self.include = include
+        self.exclude = exclude
+        self.use_gitignore = use_gitignore
+
+    def __enter__(self) -> "Watcher":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def iter_files(self):
+        return iter_files(
+            self.paths,
+            include=self.include,
+            exclude=self.exclude,
+            use_gitignore=self.use_gitignore,
+        )
+
+    def wait(self, timeout: Optional[float] = None, debounce: float = 0.2) -> set[Path]:
+        """Wait for files to change, and return the changed files.
+
+        Once a change is detected,
+        further changes are collected until none occur for ``debounce`` seconds.
+
+        :param timeout: Maximum seconds to wait for a first change,
+            after which an empty set is returned (``None`` waits indefinitely)
+        :param debounce: Seconds of quiet to wait for, after a change
+        """
+        changed = self._poll(timeout)
+        while changed:
+            more = self._poll(debounce)
+            if not more:
+                break
+            changed |= more
+        return changed
+
+    @abstractmethod
+    def _poll(self, timeout: Optional[float]) -> set[Path]:
+        """Wait up to ``timeout`` seconds for any changes."""
+
+    def close(self) -> None:  # noqa: B027
+        """Release any resources."""
+
+
+class PollingWatcher(Watcher):
+    """Watch for changes, by comparing modification times at intervals."""
+
+    def __init__(self, paths: Sequence[str], *, interval: float = 0.5, **kwargs):
+        super().__init__(paths, **kwargs)
+        self.interval = interval
+        self._mtimes = self._scan()
+
+    def _scan(self) -> dict[Path, tuple[int, int]]:
+        mtimes = {}
+        for path in self.iter_files():
+            with suppress(OSError):
+                stat = path.stat()
+                mtimes[path] = (stat.st_mtime_ns, stat.st_size)
+        return mtimes
+
+    def _poll(self, timeout: Optional[float]) -> set[Path]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            mtimes = self._scan()
+            changed = {
+                path
+                for path, mtime in mtimes.items()
+                if self._mtimes.get(path) != mtime
+            }
+            self._mtimes = mtimes
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            delay = self.interval
+            if deadline is not None:
+                delay = min(delay, max(deadline - time.monotonic(), 0))
+            time.sleep(delay)
+
+
+class InotifyWatcher(Watcher):
+    """Watch for changes, using the Linux inotify API (via ctypes)."""
+
+    mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+    def __init__(self, paths: Sequence[str], **kwargs):
+        super().__init__(paths, **kwargs)
+        self._libc = ctypes.CDLL(
+            ctypes.util.find_library("c") or "libc.so.6", use_errno=True
+        )
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        # watch descriptor -> (directory, root directory or None for a single file)
+        self._watches: dict[int, tuple[str, Optional[str]]] = {}
+        # files given directly, rather than found in a directory
+        self._files: set[str] = set()
+        for path in self.paths:
+            if os.path.isdir(path):  # noqa: PTH112
+                self._add_tree(path, path)
+            else:
+                self._files.add(os.path.abspath(path))  # noqa: PTH100
+                self._add_watch(os.path.dirname(path) or ".", None)  # noqa: PTH120
+
+    def _add_watch(self, directory: str, root: Optional[str]) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self.mask)
+        if wd >= 0 and (wd not in self._watches or root is not None):
+            self._watches[wd] = (directory, root)
+
+    def _add_tree(self, directory: str, root: str) -> None:
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            self._add_watch(current, root)
+            try:
+                with os.scandir(current) as iterator:
+                    stack.extend(
+                        entry.path
+                        for entry in iterator
+                        # (not following symlinks, which may loop)
+                        if entry.is_dir(follow_symlinks=False)
+                        and self._match_dir(entry.path, root)
+                    )
+            except OSError:
+                continue
+
+    def _match_dir(self, directory: str, root: str) -> bool:
+        # check a (notional) file in the directory, to see if it is excluded/ignored
+        return match_file(
+            os.path.join(directory, "_"),  # noqa: PTH118
+            root,
+            include=("*",),
+            exclude=self.exclude,
+            use_gitignore=self.use_gitignore,
+        )
+
+    def _match(self, path: str, root: Optional[str]) -> bool:
+        if root is None:
+            return os.path.abspath(path) in self._files  # noqa: PTH100
+        return match_file(
+            path,
+            root,
+            include=self.include,
+            exclude=self.exclude,
+            use_gitignore=self.use_gitignore,
+        )
+
+    def _poll(self, timeout: Optional[float]) -> set[Path]:
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+        changed: set[Path] = set()
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    # events were dropped, so report all files
+                    changed.update(self.iter_files())
+                    continue
+                if wd not in self._watches or not name:
+                    continue
+                directory, root = self._watches[wd]
+                path = os.path.join(directory, name)  # noqa: PTH118
+                if mask & IN_ISDIR:
+                    # watch any new directory, and report any files within it
+                    if (
+                        root is not None
+                        and mask & (IN_CREATE | IN_MOVED_TO)
+                        and self._match_dir(path, root)
+                    ):
+                        self._add_tree(path, root)
+                        changed.update(
+                            new_path
+                            for new_path in iter_files([path], include=("*",))
+                            if self._match(str(new_path), root)
+                        )
+                elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO) and self._match(path, root):
+                    changed.add(Path(path))
+        return changed
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def get_watcher(
+    paths: Sequence[str], *, polling: bool = False, interval: float = 0.5, **kwargs
+) -> Watcher:
+    """Return an inotify watcher on Linux, falling back to polling.
+
+    :param polling: Always use polling
+    :param interval: Seconds between polls
+    :param kwargs: Filters for the files to watch, as for `iter_files`
+    """
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(paths, **kwargs)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(paths, interval=interval, **kwargs)
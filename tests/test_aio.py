@@ -0,0 +1,102 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import threading
+
+import pytest
+
+from rst_to_myst import aio, rst_to_myst_async
+from rst_to_myst.aio import convert_many
+
+
+def test_rst_to_myst_async():
+    output = asyncio.run(rst_to_myst_async(":name:`content`", use_sphinx=False))
+    assert output.text == "{name}`content`\n"
+
+
+@pytest.mark.parametrize("executor_cls", [ThreadPoolExecutor, ProcessPoolExecutor])
+def test_convert_many(executor_cls):
+    async def run():
+        with executor_cls(max_workers=2) as executor:
+            return [
+                (key, output.text)
+                async for key, output in convert_many(
+                    ((index, f"*{index}*") for index in range(6)),
+                    executor=executor,
+                    use_sphinx=False,
+                )
+            ]
+
+    results = asyncio.run(run())
+    assert sorted(results) == [(index, f"*{index}*\n") for index in range(6)]
+
+
+def test_convert_many_exceptions():
+    async def run(return_exceptions):
+        items = [("a", "*a*"), ("b", "_`b`")]
+        return {
+            key: output
+            async for key, output in convert_many(
+                items,
+                use_sphinx=False,
+                raise_on_warning=True,
+                return_exceptions=return_exceptions,
+            )
+        }
+
+    results = asyncio.run(run(True))
+    assert results["a"].text == "*a*\n"
+    assert isinstance(results["b"], Exception)
+    with pytest.raises(Exception, match="inline targets"):
+        asyncio.run(run(False))
+
+
+def test_convert_many_backpressure():
+    """Items are only consumed when there is capacity for them."""
+    consumed = []
+
+    async def items():
+        for index in range(10):
+            consumed.append(index)
+            yield index, f"*{index}*"
+
+    async def run():
+        results = convert_many(items(), concurrency=2, use_sphinx=False)
+        await results.__anext__()
+        # two in flight, then one more once the first completed
+        assert len(consumed) <= 3
+        await results.aclose()
+
+    asyncio.run(run())
+
+
+def test_convert_many_cancel(monkeypatch):
+    """Pending conversions are cancelled when the iteration is stopped."""
+    converted = []
+    monkeypatch.setattr(aio, "_convert", lambda text, *args: converted.append(text))
+    release = threading.Event()
+
+    async def run():
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # block the single worker, so that the conversions are queued
+            executor.submit(release.wait)
+            task = asyncio.ensure_future(
+                _consume(
+                    convert_many(
+                        ((index, str(index)) for index in range(10)),
+                        executor=executor,
+                        concurrency=3,
+                    )
+                )
+            )
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            release.set()
+
+    asyncio.run(run())
+    assert converted == []
+
+
+async def _consume(results):
+    return [item async for item in results]
@@ -0,0 +1,119 @@
+from io import StringIO
+
+import pytest
+
+from rst_to_myst import Converter, rst_to_myst
+from rst_to_myst.cache import ResultCache
+from rst_to_myst.diagnostics import INFO, DiagnosticCollector
+from rst_to_myst.namespace import ApplicationNamespace, compile_namespace
+
+TEXT = """\
+Title
+=====
+
+Paragraph with ``literal``, a [#f]_ and `unclosed
+
+.. [#f] Footnote
+"""
+
+
+def test_result_cache_hit():
+    cache = ResultCache()
+    first = rst_to_myst(TEXT, use_sphinx=False, cache=cache)
+    stream = StringIO()
+    second = rst_to_myst(TEXT, use_sphinx=False, cache=cache, warning_stream=stream)
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert second.text == first.text
+    assert second.tokens == first.tokens
+    assert second.extensions == first.extensions
+    # the cached warnings are replayed
+    assert second.diagnostics == first.diagnostics
+    assert "Inline interpreted text" in stream.getvalue()
+    assert second.warning_stream is stream
+
+
+def test_result_cache_copies():
+    cache = ResultCache()
+    first = rst_to_myst(TEXT, use_sphinx=False, cache=cache)
+    first.tokens[0].meta["changed"] = True
+    second = rst_to_myst(TEXT, use_sphinx=False, cache=cache)
+    second.tokens.clear()
+    third = rst_to_myst(TEXT, use_sphinx=False, cache=cache)
+    assert "changed" not in third.tokens[0].meta
+    assert third.tokens
+
+
+def test_result_cache_key():
+    """Outputs are cached per text and options, and level of the collector."""
+    cache = ResultCache()
+    rst_to_myst(TEXT, use_sphinx=False, cache=cache)
+    rst_to_myst(TEXT, use_sphinx=False, cache=cache, colon_fences=False)
+    rst_to_myst(TEXT + "\n", use_sphinx=False, cache=cache)
+    rst_to_myst(
+        TEXT, use_sphinx=False, cache=cache, diagnostics=DiagnosticCollector(INFO)
+    )
+    rst_to_myst(TEXT, use_sphinx=False, cache=cache, profile=True)
+    assert cache.stats() == {
+        "hits": 0,
+        "misses": 4,
+        "evictions": 0,
+        "entries": 4,
+        "bytes": cache.bytes,
+    }
+
+
+def test_result_cache_limits():
+    cache = ResultCache(max_entries=2)
+    converter = Converter(use_sphinx=False, cache=cache)
+    for text in ("*a*", "*b*", "*c*", "*a*"):
+        converter.convert(text)
+    assert cache.stats()["misses"] == 4
+    assert cache.stats()["evictions"] == 2
+    assert len(cache) == 2
+    size = cache.bytes
+    cache = ResultCache(max_bytes=size // 2 + 1)
+    converter = Converter(use_sphinx=False, cache=cache)
+    converter.convert("*a*")
+    converter.convert("*b*")
+    assert len(cache) == 1
+    cache = ResultCache(max_bytes=1)
+    Converter(use_sphinx=False, cache=cache).convert("*a*")
+    assert len(cache) == 0
+
+
+def test_result_cache_failure():
+    cache = ResultCache()
+    for _ in range(2):
+        with pytest.raises(NotImplementedError):
+            rst_to_myst("_`b`", use_sphinx=False, raise_on_warning=True, cache=cache)
+    assert len(cache) == 0
+    assert cache.stats()["misses"] == 2
+
+
+def test_result_cache_export():
+    from rst_to_myst import ResultCache as Exported
+
+    assert Exported is ResultCache
+
+
+def test_result_cache_namespace():
+    """Outputs are not cached for a namespace not compiled from the options."""
+    cache = ResultCache()
+    cached = rst_to_myst(".. note:: hi\n", use_sphinx=False, cache=cache)
+    output = rst_to_myst(
+        ".. note:: hi\n",
+        use_sphinx=False,
+        cache=cache,
+        namespace=ApplicationNamespace(),
+    )
+    assert output.text != cached.text
+    assert "eval-rst" in output.text
+    # but are for one compiled from the options
+    rst_to_myst(
+        ".. note:: hi\n",
+        use_sphinx=False,
+        cache=cache,
+        namespace=compile_namespace(use_sphinx=False),
+    )
+    assert cache.stats()["hits"] == 1
@@ -1,7 +1,9 @@
+import json
 from pathlib import Path
 from textwrap import dedent
 
 from click.testing import CliRunner
+import pytest
 
 from rst_to_myst import cli
 
@@ -105,3 +107,134 @@ def test_convert(tmp_path: Path, file_regression):
         encoding="utf8",
         extension=".md",
     )
+
+
+def test_convert_directory(tmp_path: Path):
+    tmp_path.joinpath("sub", "skip").mkdir(parents=True)
+    tmp_path.joinpath("a.rst").write_text("a", encoding="utf8")
+    tmp_path.joinpath("b.txt").write_text("b", encoding="utf8")
+    tmp_path.joinpath("sub", "c.rst").write_text("c", encoding="utf8")
+    tmp_path.joinpath("sub", "skip", "d.rst").write_text("d", encoding="utf8")
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.convert, ["--exclude", "skip", "--no-sphinx", str(tmp_path)]
+    )
+    assert result.exit_code == 0, result.output
+    assert tmp_path.joinpath("a.md").exists()
+    assert tmp_path.joinpath("sub", "c.md").exists()
+    assert not tmp_path.joinpath("b.md").exists()
+    assert not tmp_path.joinpath("sub", "skip", "d.md").exists()
+
+
+def test_convert_cache(tmp_path: Path):
+    tmp_path.joinpath("a.rst").write_text("a", encoding="utf8")
+    tmp_path.joinpath("b.rst").write_text("b", encoding="utf8")
+    cache_dir = str(tmp_path / "cache")
+    runner = CliRunner()
+    args = ["--no-sphinx", "--cache-dir", cache_dir, str(tmp_path)]
+    result = runner.invoke(cli.convert, args)
+    assert result.exit_code == 0, result.output
+    assert "CACHE: 0 hits, 2 misses" in result.output
+    assert "FILES: 2 written, 0 unchanged" in result.output
+
+    tmp_path.joinpath("b.rst").write_text("b changed", encoding="utf8")
+    result = runner.invoke(cli.convert, args)
+    assert result.exit_code == 0, result.output
+    assert "CACHE: 1 hits, 1 misses" in result.output
+
+    # a deleted output is converted again, so is a miss
+    tmp_path.joinpath("a.md").unlink()
+    result = runner.invoke(cli.convert, args)
+    assert result.exit_code == 0, result.output
+    assert "CACHE: 1 hits, 1 misses" in result.output
+    assert "FILES: 1 written, 0 unchanged" in result.output
+    assert tmp_path.joinpath("a.md").exists()
+
+    # changing the options invalidates the cache
+    result = runner.invoke(cli.convert, ["--no-dollar-math", *args])
+    assert result.exit_code == 0, result.output
+    assert "CACHE: 0 hits, 2 misses" in result.output
+    # but the outputs are the same, so are not re-written
+    assert "FILES: 0 written, 2 unchanged" in result.output
+
+
+def test_stream_profile():
+    runner = CliRunner()
+    result = runner.invoke(cli.stream, ["--profile", "-"], input=":name:`content`")
+    assert result.exit_code == 0, result.output
+    assert "PROFILE (wall/cpu ms): namespace" in result.output
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_convert_memprofile(tmp_path: Path, jobs):
+    tmp_path.joinpath("a.rst").write_text("- a\n- b\n", encoding="utf8")
+    tmp_path.joinpath("b.rst").write_text("*b*\n", encoding="utf8")
+    report_path = tmp_path / "report.jsonl"
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.convert,
+        [
+            *("--no-sphinx", "--memprofile", "-j", jobs),
+            *("--report", str(report_path), str(tmp_path)),
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert result.output.count("MEMPROFILE (peak/retained KiB): to_docutils_ast") == 2
+    assert "MEMPROFILE SUMMARY: highest peak" in result.output
+    records = [json.loads(line) for line in report_path.read_text("utf8").splitlines()]
+    assert [list(record["memory"]) for record in records] == 2 * [
+        ["to_docutils_ast", "to_tokens", "from_tokens", "sites"]
+    ]
+
+
+def test_convert_report(tmp_path: Path):
+    tmp_path.joinpath("a.rst").write_text(
+        "`unclosed\n\n.. unknown:: x\n", encoding="utf8"
+    )
+    report_path = tmp_path / "report.jsonl"
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.convert, ["--no-sphinx", "--report", str(report_path), str(tmp_path)]
+    )
+    assert result.exit_code == 0, result.output
+    (record,) = [
+        json.loads(line) for line in report_path.read_text("utf8").splitlines()
+    ]
+    assert record["status"] == "converted"
+    assert record["input"] == str(tmp_path / "a.rst")
+    assert record["input_bytes"] == 26
+    assert record["warnings"] == {"WARNING": 1}
+    assert record["eval_rst"] == 1
+    assert record["extensions"] == []
+    assert set(record["stages"]) == {
+        "parse",
+        "transforms",
+        "tokens",
+        "render",
+    }
+    assert record["costs"]["directives"]["unknown"]["conversions"] == {"eval_rst": 1}
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_stream_ndjson(jobs):
+    records = [
+        {"id": 1, "text": ":name:`content`"},
+        {"id": 2, "text": ":math:`x`", "options": {"dollar_math": False}},
+        {"id": 3, "text": "a", "options": {"unknown": 1}},
+    ]
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.stream,
+        ["--ndjson", "--no-sphinx", "-j", jobs, "-"],
+        input="".join(json.dumps(record) + "\n" for record in records),
+    )
+    assert result.exit_code == 0, result.output
+    outputs = [json.loads(line) for line in result.output.splitlines()]
+    assert outputs[:2] == [
+        {"id": 1, "text": "{name}`content`\n", "extensions": [], "warnings": []},
+        {"id": 2, "text": "{math}`x`\n", "extensions": [], "warnings": []},
+    ]
+    assert outputs[2] == {
+        "id": 3,
+        "error": "KeyError: \"Unknown options: ['unknown']\"",
+    }
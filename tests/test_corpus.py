@@ -0,0 +1,84 @@
+import math
+import sys
+
+from click.testing import CliRunner
+import pytest
+
+from rst_to_myst import cli, rst_to_myst
+from rst_to_myst.corpus import generate_document
+from rst_to_myst.namespace import compile_namespace
+
+
+def test_generate_document():
+    text = generate_document(seed=1)
+    assert text == generate_document(seed=1)
+    assert text != generate_document(seed=2)
+    for syntax in ("[#f", "[CIT", "|sub", "`__", ".. [", "+====", ":\n   :"):
+        assert syntax in text
+
+
+def test_generate_document_converts():
+    output = rst_to_myst(generate_document(sections=4, section_depth=3))
+    assert output.text
+    assert "{eval-rst}" not in output.text
+
+
+def test_gen_corpus(tmp_path):
+    result = CliRunner().invoke(
+        cli.gen_corpus, ["-o", str(tmp_path), "-n", "3", "--sections", "1"]
+    )
+    assert result.exit_code == 0, result.output
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "doc_0.rst",
+        "doc_1.rst",
+        "doc_2.rst",
+    ]
+
+
+def count_calls(func, *args, **kwargs) -> int:
+    """Count the (Python and builtin) function calls made by a function call.
+
+    Unlike its time, this is deterministic, and so a stable measure of the work done.
+    """
+    calls = 0
+
+    def profile(frame, event, arg):
+        nonlocal calls
+        if event in ("call", "c_call"):
+            calls += 1
+
+    sys.setprofile(profile)
+    try:
+        func(*args, **kwargs)
+    finally:
+        sys.setprofile(None)
+    return calls
+
+
+def fit_exponent(sizes: list[int], counts: list[int]) -> float:
+    """Fit ``count = a * size ** k`` by least squares (in log-log space), returning k."""
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(value) for value in counts]
+    x_mean, y_mean = sum(xs) / len(xs), sum(ys) / len(ys)
+    return sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys)) / sum(
+        (x - x_mean) ** 2 for x in xs
+    )
+
+
+@pytest.mark.parametrize(
+    "counts",
+    [{}, {"tables": 0, "table_rows": 0, "list_items": 0, "roles": 6}],
+    ids=["mixed", "inline"],
+)
+def test_complexity(counts):
+    """The work of a conversion should scale (roughly) linearly with the document size."""
+    namespace = compile_namespace()
+    # warm up, so that one-off work (e.g. imports and caches) is not counted
+    rst_to_myst(generate_document(sections=1, **counts), namespace=namespace)
+    sizes, calls = [], []
+    for sections in (4, 8, 16):
+        text = generate_document(sections=sections, **counts)
+        sizes.append(len(text))
+        calls.append(count_calls(rst_to_myst, text, namespace=namespace))
+    exponent = fit_exponent(sizes, calls)
+    assert exponent < 1.2, f"calls ~ size ** {exponent:.2f}"
@@ -0,0 +1,129 @@
+from io import StringIO
+import logging
+
+from docutils.utils import SystemMessage
+import pytest
+
+from rst_to_myst import rst_to_myst, to_docutils_ast
+from rst_to_myst.diagnostics import (
+    ERROR,
+    INFO,
+    WARNING,
+    ContextDiagnosticHandler,
+    DiagnosticCollector,
+    count_diagnostics,
+)
+
+TEXT = """\
+`unclosed
+
+>>> print(1)
+1
+
+.. unknown:: x
+"""
+
+
+def test_diagnostics():
+    output = rst_to_myst(TEXT, use_sphinx=False)
+    assert [
+        (item.stage, item.level, item.line, item.code) for item in output.diagnostics
+    ] == [
+        ("parse", WARNING, 1, None),
+        ("render", WARNING, 4, "doctest-block"),
+    ]
+    assert output.diagnostics[0].message.startswith(
+        "Inline interpreted text or phrase reference start-string without end-string."
+    )
+    assert count_diagnostics(output.diagnostics) == {"WARNING": 1, "RENDER": 1}
+
+
+def test_diagnostics_stream():
+    """The text written to the warning stream is unchanged."""
+    stream = StringIO()
+    output = rst_to_myst(TEXT, use_sphinx=False, warning_stream=stream)
+    assert output.warning_stream is stream
+    assert stream.getvalue() == (
+        "source:1: (WARNING/2) Inline interpreted text or phrase reference "
+        "start-string without end-string.\n"
+        "RENDER WARNING:4: Treating doctest block as pycon literal block\n"
+    )
+    assert stream.getvalue() == "".join(item.format() for item in output.diagnostics)
+
+
+def test_diagnostics_level():
+    collector = DiagnosticCollector(level=ERROR)
+    output = rst_to_myst(TEXT, use_sphinx=False, diagnostics=collector)
+    assert output.diagnostics == []
+    assert output.warning_stream is None
+    collector = DiagnosticCollector(level=INFO)
+    text = "Title\n=====\n\nTitle\n=====\n"
+    rst_to_myst(text, use_sphinx=False, diagnostics=collector)
+    assert [(item.level, item.line) for item in collector.records] == [(INFO, 5)]
+    collector = DiagnosticCollector()
+    rst_to_myst(text, use_sphinx=False, diagnostics=collector)
+    assert collector.records == []
+
+
+def test_diagnostics_halt():
+    collector = DiagnosticCollector()
+    with pytest.raises(SystemMessage):
+        to_docutils_ast(TEXT, halt_level=WARNING, diagnostics=collector)
+    assert [item.level for item in collector.records] == [WARNING]
+
+
+def test_context_diagnostic_handler():
+    first, second = DiagnosticCollector(), DiagnosticCollector()
+    logger = logging.getLogger("rst_to_myst.test")
+    handler = ContextDiagnosticHandler()
+    logger.addHandler(handler)
+    try:
+        logger.warning("discarded")
+        with handler.collecting(first):
+            logger.warning("first")
+            with handler.collecting(second):
+                logger.info("ignored")
+                logger.warning("second")
+            logger.error("first again")
+    finally:
+        logger.removeHandler(handler)
+    assert [item.message for item in first.records] == ["first", "first again"]
+    assert [item.message for item in second.records] == ["second"]
+
+
+@pytest.fixture
+def last_resort(monkeypatch):
+    """Capture the records passed to ``logging.lastResort``."""
+    stream = StringIO()
+    monkeypatch.setattr(logging, "lastResort", logging.StreamHandler(stream))
+    return stream
+
+
+def test_context_diagnostic_handler_fallback(last_resort, monkeypatch):
+    """Records outside of ``collecting`` are handled as without the handler."""
+    logger = logging.getLogger("rst_to_myst.test.fallback")
+    # without (pytest's) handlers on ancestor loggers
+    monkeypatch.setattr(logger, "propagate", False)
+    handler = ContextDiagnosticHandler()
+    logger.addHandler(handler)
+    try:
+        logger.warning("printed")
+        with handler.collecting(DiagnosticCollector()):
+            logger.warning("collected")
+        other = logging.StreamHandler(StringIO())
+        logger.addHandler(other)
+        logger.warning("handled by other")
+        logger.removeHandler(other)
+    finally:
+        logger.removeHandler(handler)
+    assert last_resort.getvalue() == "printed\n"
+
+
+def test_mdformat_warnings_outside_conversion(last_resort, monkeypatch):
+    from mdformat.renderer import LOGGER
+
+    import rst_to_myst.mdformat_render  # noqa: F401
+
+    monkeypatch.setattr(LOGGER, "propagate", False)
+    LOGGER.warning("outside")
+    assert last_resort.getvalue() == "outside\n"
@@ -0,0 +1,93 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+from rst_to_myst.files import iter_files, write_if_changed
+from rst_to_myst.watch import InotifyWatcher
+
+
+def test_iter_files_gitignore(tmp_path: Path):
+    tmp_path.joinpath("build").mkdir()
+    tmp_path.joinpath("docs").mkdir()
+    tmp_path.joinpath(".gitignore").write_text("build/\n*.tmp.rst\n", encoding="utf8")
+    tmp_path.joinpath("docs", ".gitignore").write_text(
+        "!keep.tmp.rst\n", encoding="utf8"
+    )
+    for path in [
+        "index.rst",
+        "other.tmp.rst",
+        "build/index.rst",
+        "docs/page.rst",
+        "docs/keep.tmp.rst",
+        "docs/conf.py",
+    ]:
+        tmp_path.joinpath(path).write_text("", encoding="utf8")
+
+    paths = iter_files([str(tmp_path)], use_gitignore=True)
+    assert [path.relative_to(tmp_path).as_posix() for path in paths] == [
+        "index.rst",
+        "docs/keep.tmp.rst",
+        "docs/page.rst",
+    ]
+
+
+def test_iter_files_include_exclude(tmp_path: Path):
+    tmp_path.joinpath("a", "b").mkdir(parents=True)
+    for path in ["x.rst", "x.txt", "a/y.txt", "a/b/z.rst"]:
+        tmp_path.joinpath(path).write_text("", encoding="utf8")
+
+    paths = iter_files(
+        [str(tmp_path), str(tmp_path / "x.txt")],
+        include=["*.rst", "a/*.txt"],
+        exclude=["a/b"],
+    )
+    assert [path.relative_to(tmp_path).as_posix() for path in paths] == [
+        "x.rst",
+        "a/y.txt",
+        "x.txt",
+    ]
+
+
+def test_write_if_changed(tmp_path: Path):
+    path = tmp_path / "a.md"
+    assert write_if_changed(path, "a\n")
+    mtime = path.stat().st_mtime_ns
+    assert not write_if_changed(path, "a\n")
+    assert path.stat().st_mtime_ns == mtime
+    assert write_if_changed(path, "b\n")
+    assert path.read_text(encoding="utf8") == "b\n"
+    # no temporary files are left behind
+    assert [p.name for p in tmp_path.iterdir()] == ["a.md"]
+
+
+def test_iter_files_symlink_loop(tmp_path: Path):
+    tmp_path.joinpath("a.rst").write_text("a")
+    tmp_path.joinpath("d").mkdir()
+    tmp_path.joinpath("d", "b.rst").write_text("b")
+    try:
+        tmp_path.joinpath("d", "up").symlink_to("..", target_is_directory=True)
+    except OSError:
+        pytest.skip("symlinks not supported")
+    paths = iter_files([str(tmp_path)])
+    assert sorted(path.relative_to(tmp_path).as_posix() for path in paths) == [
+        "a.rst",
+        "d/b.rst",
+    ]
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="requires inotify")
+def test_inotify_watcher_symlink_loop(tmp_path: Path):
+    tmp_path.joinpath("d", "e").mkdir(parents=True)
+    try:
+        tmp_path.joinpath("d", "up").symlink_to("..", target_is_directory=True)
+        tmp_path.joinpath("d", "e", "up").symlink_to("..", target_is_directory=True)
+    except OSError:
+        pytest.skip("symlinks not supported")
+    with InotifyWatcher([str(tmp_path)]) as watcher:
+        directories = {directory for directory, _ in watcher._watches.values()}
+    assert directories == {
+        str(tmp_path),
+        str(tmp_path / "d"),
+        str(tmp_path / "d" / "e"),
+    }
@@ -0,0 +1,54 @@
+"""Check that heavy dependencies are only imported when needed."""
+
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = ("docutils", "mdformat", "markdown_it", "yaml", "sphinx")
+
+
+def imported_modules(statement: str) -> set[str]:
+    """Run a statement in a fresh interpreter,
+    returning the names of the modules imported by the end."""
+    process = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"{statement}\nimport sys; print('\\n'.join(sys.modules))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(process.stdout.splitlines())
+
+
+@pytest.mark.parametrize(
+    "statement",
+    [
+        "import rst_to_myst",
+        "import rst_to_myst.cli",
+        "from rst_to_myst.cli import main; main(['--help'], standalone_mode=False)",
+    ],
+)
+def test_no_heavy_imports(statement):
+    modules = imported_modules(statement)
+    assert "rst_to_myst" in modules
+    assert not [name for name in modules if name.split(".")[0] in HEAVY_MODULES]
+
+
+def test_heavy_imports_on_access():
+    """The converter (and its dependencies) are imported on first access."""
+    modules = imported_modules("import rst_to_myst; rst_to_myst.rst_to_myst")
+    assert "rst_to_myst.mdformat_render" in modules
+    assert "docutils" in modules
+
+
+def test_lazy_attributes():
+    import rst_to_myst
+
+    assert callable(rst_to_myst.rst_to_myst)
+    assert "Converter" in dir(rst_to_myst)
+    with pytest.raises(AttributeError, match="no_such_name"):
+        rst_to_myst.no_such_name  # noqa: B018
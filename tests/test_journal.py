@@ -0,0 +1,87 @@
+import json
+
+from click.testing import CliRunner
+
+from rst_to_myst import cli
+from rst_to_myst.journal import Journal, journal_record
+
+
+def test_journal_batching(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = Journal(path, "digest", batch_size=3, interval=3600)
+    journal.write(journal_record("a.rst", "converted", "x", "y"))
+    # buffered, until the batch is full
+    assert path.read_text("utf8") == ""
+    journal.write(journal_record("b.rst", "failed", "z"))
+    assert len(path.read_text("utf8").splitlines()) == 3
+    journal.write(journal_record("c.rst", "converted", "w", "v"))
+    journal.close()
+    assert len(path.read_text("utf8").splitlines()) == 4
+
+
+def test_journal_load(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "journal.jsonl"
+    with Journal(path, "digest") as journal:
+        journal.write(journal_record("a.rst", "converted", "x", "y"))
+        journal.write(journal_record("b.rst", "converted", "x", "y"))
+    with Journal(path, "other") as journal:
+        journal.write(journal_record("b.rst", "failed", "x"))
+    # a truncated final line, from a killed run
+    with path.open("a", encoding="utf8") as handle:
+        handle.write('{"input": "c.rst", "sta')
+    records = Journal.load(path, "digest")
+    assert sorted(records) == [str(tmp_path / name) for name in ("a.rst", "b.rst")]
+    assert Journal.load(path, "other")[str(tmp_path / "b.rst")]["status"] == "failed"
+    assert Journal.load(tmp_path / "missing.jsonl", "digest") == {}
+
+
+def test_journal_append_after_truncation(tmp_path, monkeypatch):
+    """A new run does not append its header onto a truncated final record."""
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "journal.jsonl"
+    with Journal(path, "A") as journal:
+        journal.write(journal_record("a.rst", "converted", "x", "y"))
+    with path.open("a", encoding="utf8") as handle:
+        handle.write('{"input": "c.rst", "sta')
+    with Journal(path, "B") as journal:
+        journal.write(journal_record("b.rst", "converted", "x", "y"))
+    assert sorted(Journal.load(path, "A")) == [str(tmp_path / "a.rst")]
+    assert sorted(Journal.load(path, "B")) == [str(tmp_path / "b.rst")]
+
+
+def test_convert_resume(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    tmp_path.joinpath("a.rst").write_text("*a*\n", encoding="utf8")
+    tmp_path.joinpath("b.rst").write_text("*b*\n", encoding="utf8")
+    runner = CliRunner()
+    args = ["--no-sphinx", "--journal", "journal.jsonl", "--resume", "."]
+    result = runner.invoke(cli.convert, args)
+    assert result.exit_code == 0, result.output
+    assert "JOURNAL: 0 resumed" in result.output
+    records = [
+        json.loads(line)
+        for line in tmp_path.joinpath("journal.jsonl").read_text("utf8").splitlines()
+    ]
+    assert [record.get("status") for record in records] == [
+        None,
+        "converted",
+        "converted",
+    ]
+
+    tmp_path.joinpath("b.rst").write_text("*c*\n", encoding="utf8")
+    result = runner.invoke(cli.convert, args)
+    assert result.exit_code == 0, result.output
+    assert "RESUMED" in result.output
+    assert "JOURNAL: 1 resumed" in result.output
+    assert tmp_path.joinpath("b.md").read_text("utf8") == "*c*\n"
+
+    # resuming requires the same options
+    result = runner.invoke(cli.convert, ["--no-dollar-math", *args])
+    assert "JOURNAL: 0 resumed" in result.output
+
+
+def test_convert_resume_requires_journal(tmp_path):
+    result = CliRunner().invoke(cli.convert, ["--resume", str(tmp_path)])
+    assert result.exit_code == 2
+    assert "--resume requires --journal" in result.output
@@ -0,0 +1,196 @@
+import gc
+import json
+import os
+import time
+
+import pytest
+
+from rst_to_myst import pool
+from rst_to_myst.options import CLI_DEFAULTS, conversion_options
+from rst_to_myst.server import run_request
+
+OPTIONS = conversion_options(**{**CLI_DEFAULTS, "sphinx": False})
+
+# patches to the worker function are only inherited by forked workers
+requires_fork = pytest.mark.skipif(
+    pool.fork_context().get_start_method() != "fork", reason="requires fork"
+)
+
+
+def _pathological_task(converter, text, profile=False, memprofile=False):
+    if text.strip() == "sleep":
+        time.sleep(60)
+    if text.strip() == "exit":
+        os._exit(3)
+    return _run_task(converter, text, profile, memprofile)
+
+
+_run_task = pool.run_task
+
+
+def test_imap_ordered():
+    items = [("a", "*a*"), ("b", None), ("c", "**c**"), ("d", "`d`")]
+    with pool.ConversionPool(OPTIONS, workers=2) as conversion_pool:
+        results = list(conversion_pool.imap(items))
+    assert [key for key, _ in results] == ["a", "b", "c", "d"]
+    assert results[1][1] is None
+    assert [result.text for _, result in results if result] == [
+        "*a*\n",
+        "**c**\n",
+        "`d`\n",
+    ]
+
+
+def test_conversion_pool_export():
+    from rst_to_myst import ConversionPool
+
+    assert ConversionPool is pool.ConversionPool
+
+
+@requires_fork
+def test_fork_after_warm(monkeypatch):
+    """Workers are forked from the warmed (and frozen) parent process."""
+    calls = []
+    monkeypatch.setattr(pool, "warm", calls.append)
+    with pool.ConversionPool(OPTIONS, workers=2) as conversion_pool:
+        assert calls == [OPTIONS]
+        assert gc.get_freeze_count() > 0
+        results = dict(conversion_pool.imap([("a", "*a*"), ("b", "**b**")]))
+    assert gc.get_freeze_count() == 0
+    assert results["a"].text == "*a*\n"
+    assert results["b"].text == "**b**\n"
+
+
+@requires_fork
+def test_close_keeps_other_freezes(monkeypatch):
+    """Closing a pool does not unfreeze objects frozen by others."""
+    monkeypatch.setattr(pool, "warm", lambda options: None)
+    first = pool.ConversionPool(OPTIONS, workers=1)
+    second = pool.ConversionPool(OPTIONS, workers=1)
+    first.close()
+    assert gc.get_freeze_count() > 0
+    second.close()
+    assert gc.get_freeze_count() == 0
+    # frozen by the application
+    gc.freeze()
+    try:
+        frozen = gc.get_freeze_count()
+        pool.ConversionPool(OPTIONS, workers=1).close()
+        assert gc.get_freeze_count() >= frozen
+    finally:
+        gc.unfreeze()
+
+
+@requires_fork
+def test_forked_executor():
+    with pool.forked_executor(2, OPTIONS) as executor:
+        assert gc.get_freeze_count() > 0
+        result = executor.submit(run_request, "convert", "*a*", OPTIONS).result()
+    assert result["text"] == "*a*\n"
+    assert gc.get_freeze_count() == 0
+
+
+def test_warm():
+    pool.warm(OPTIONS)
+    from rst_to_myst.converter import get_converter
+
+    output = get_converter(**OPTIONS).convert(pool.WARM_TEXT)
+    assert not output.diagnostics
+
+
+@requires_fork
+def test_imap_timeout(monkeypatch):
+    monkeypatch.setattr(pool, "run_task", _pathological_task)
+    items = [("a", "*a*"), ("b", "sleep"), ("c", "*c*")]
+    start = time.monotonic()
+    with pool.ConversionPool(OPTIONS, workers=1, timeout=0.5) as conversion_pool:
+        results = dict(conversion_pool.imap(items))
+    assert time.monotonic() - start < 30
+    assert results["a"].status == "converted"
+    assert results["b"].status == "timeout"
+    assert results["b"].error_type == "TimeoutError"
+    # the worker is replaced, for the following conversions
+    assert results["c"].status == "converted"
+
+
+@requires_fork
+def test_imap_worker_exit(monkeypatch):
+    monkeypatch.setattr(pool, "run_task", _pathological_task)
+    items = [("a", "exit"), ("b", "*b*")]
+    with pool.ConversionPool(OPTIONS, workers=1) as conversion_pool:
+        results = dict(conversion_pool.imap(items))
+    assert results["a"].status == "failed"
+    assert results["a"].error == "Worker exited with code 3"
+    assert results["b"].status == "converted"
+
+
+@requires_fork
+def test_convert_timeout(tmp_path, monkeypatch):
+    from click.testing import CliRunner
+
+    from rst_to_myst import cli
+
+    monkeypatch.setattr(pool, "run_task", _pathological_task)
+    tmp_path.joinpath("a.rst").write_text("sleep\n", encoding="utf8")
+    tmp_path.joinpath("b.rst").write_text("*b*\n", encoding="utf8")
+    report_path = tmp_path / "report.jsonl"
+    result = CliRunner().invoke(
+        cli.convert,
+        [
+            *("--no-sphinx", "--timeout", "0.5", "-j", "2"),
+            *("--report", str(report_path), str(tmp_path)),
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert "TIMEOUT (exceeded 0.5s)" in result.output
+    assert "FILES: 1 written, 0 unchanged" in result.output
+    records = [json.loads(line) for line in report_path.read_text("utf8").splitlines()]
+    assert [record["status"] for record in records] == ["timeout", "converted"]
+
+
+def test_max_tasks_per_worker():
+    items = [(index, f"*{index}*") for index in range(5)]
+    with pool.ConversionPool(
+        OPTIONS, workers=1, max_tasks_per_worker=2
+    ) as conversion_pool:
+        results = list(conversion_pool.imap(items))
+    assert [result.text for _, result in results] == [
+        f"*{index}*\n" for index in range(5)
+    ]
+    assert conversion_pool.restarts == 2
+
+
+@pytest.mark.skipif(pool.rss_bytes() is None, reason="requires /proc")
+def test_max_worker_rss():
+    items = [(index, f"*{index}*") for index in range(3)]
+    with pool.ConversionPool(OPTIONS, workers=1, max_worker_rss=1) as conversion_pool:
+        results = list(conversion_pool.imap(items))
+    assert all(result.status == "converted" for _, result in results)
+    # retired after each conversion, but only replaced for the following ones
+    assert conversion_pool.restarts == 2
+
+
+def test_convert_max_tasks_per_worker(tmp_path):
+    from click.testing import CliRunner
+
+    from rst_to_myst import cli
+
+    tmp_path.joinpath("a.rst").write_text("*a*\n", encoding="utf8")
+    tmp_path.joinpath("b.rst").write_text("*b*\n", encoding="utf8")
+    result = CliRunner().invoke(
+        cli.convert, ["--no-sphinx", "--max-tasks-per-worker", "1", str(tmp_path)]
+    )
+    assert result.exit_code == 0, result.output
+    assert "FILES: 2 written, 0 unchanged" in result.output
+    # the worker is not replaced after the last file
+    assert "WORKERS: 1 workers, 1 restarts" in result.output
+
+
+@requires_fork
+def test_imap_unordered(monkeypatch):
+    monkeypatch.setattr(pool, "run_task", _pathological_task)
+    items = [("a", "sleep"), ("b", "*b*"), ("c", "*c*")]
+    with pool.ConversionPool(OPTIONS, workers=2, timeout=2) as conversion_pool:
+        keys = [key for key, _ in conversion_pool.imap(items, ordered=False)]
+    # the slow item does not hold up the others
+    assert keys == ["b", "c", "a"]
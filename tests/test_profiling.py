@@ -0,0 +1,181 @@
+import tracemalloc
+
+import pytest
+
+from rst_to_myst import profiling, rst_to_myst
+from rst_to_myst.files import write_if_changed
+from rst_to_myst.profiling import CostCounter, MemoryProfile, Timings, TimingsSummary
+
+
+def test_timings():
+    output = rst_to_myst(":name:`content`", use_sphinx=False)
+    assert output.timings is None
+    output = rst_to_myst(":name:`content`", use_sphinx=False, profile=True)
+    assert isinstance(output.timings, Timings)
+    assert list(output.timings.as_dict()) == [
+        "namespace",
+        "parse",
+        "transforms",
+        "tokens",
+        "render",
+    ]
+    assert output.timings.wall > 0
+
+
+def test_timings_summary():
+    summary = TimingsSummary()
+    for _ in range(3):
+        summary.add(rst_to_myst("a", use_sphinx=False, profile=True).timings)
+    data = summary.as_dict()
+    assert summary.count == 3
+    assert set(data["parse"]) == {"p50", "p90", "p99", "max", "wall", "cpu"}
+    assert data["total"]["max"] >= data["total"]["p50"]
+
+
+def test_memory_profile():
+    output = rst_to_myst(":name:`content`", use_sphinx=False)
+    assert output.memory is None
+    output = rst_to_myst("- a\n- b\n", use_sphinx=False, memprofile=True)
+    assert isinstance(output.memory, MemoryProfile)
+    assert [stage.name for stage in output.memory.stages] == [
+        "to_docutils_ast",
+        "to_tokens",
+        "from_tokens",
+    ]
+    assert all(stage.peak >= stage.retained for stage in output.memory.stages)
+    assert output.memory.peak > 0
+    assert output.memory.sites
+    assert output.memory.format().startswith("MEMPROFILE (peak/retained KiB): ")
+    # tracing is stopped after the conversion
+    assert not tracemalloc.is_tracing()
+
+
+def test_memory_profile_traced():
+    """If already tracing, tracing is left running."""
+    tracemalloc.start()
+    try:
+        rst_to_myst("a", use_sphinx=False, memprofile=True)
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_memory_profile_nested():
+    """Tracing is stopped only when the last profile ends,
+    e.g. of concurrent conversions in other threads."""
+    outer = MemoryProfile()
+    with outer.tracing(), outer.stage("outer"):
+        output = rst_to_myst("- a\n- b\n", use_sphinx=False, memprofile=True)
+        assert tracemalloc.is_tracing()
+        assert output.memory.peak > 0
+    assert outer.peak > 0
+    assert not tracemalloc.is_tracing()
+
+
+@pytest.fixture
+def events():
+    """Record the events fired to hooks."""
+    recorded = []
+    profiling.add_hook(recorded.append)
+    yield recorded
+    profiling.remove_hook(recorded.append)
+
+
+def test_stage_without_hooks():
+    assert profiling.stage(None, "parse") is profiling.stage(None, "render")
+
+
+def test_hooks(events):
+    text = "a [#]_\n\n.. [#] b\n"
+    output = rst_to_myst(text, use_sphinx=False, profile=True)
+    names = [(event.name, event.phase) for event in events]
+    assert names[:3] == [
+        ("namespace", "before"),
+        ("namespace", "after"),
+        ("parse", "before"),
+    ]
+    assert names[-4:] == [
+        ("tokens", "before"),
+        ("tokens", "after"),
+        ("render", "before"),
+        ("render", "after"),
+    ]
+    assert events[2].info == {"chars": len(text)}
+    assert events[-1].info == {"tokens": len(output.tokens)}
+    assert events[-1].wall > 0
+    transforms = [
+        event.info["transform"]
+        for event in events
+        if event.name == "transform" and event.phase == "after"
+    ]
+    assert transforms[:2] == ["PropagateTargets", "FrontMatter"]
+    assert "Footnotes" in transforms
+    # timings are still recorded
+    assert list(output.timings.as_dict()) == [
+        "namespace",
+        "parse",
+        "transforms",
+        "tokens",
+        "render",
+    ]
+
+
+def test_hooks_write(events, tmp_path):
+    path = tmp_path / "a.md"
+    assert write_if_changed(path, "text\n")
+    assert [(event.name, event.phase) for event in events] == [
+        ("write", "before"),
+        ("write", "after"),
+    ]
+    assert events[0].info == {"path": str(path), "bytes": 5}
+
+
+def test_costs():
+    text = """\
+.. note:: :ref:`a`
+
+   .. code-block:: python
+
+      x
+
+.. unknown:: y
+
+:math:`a` `b` :ref:`c`
+"""
+    assert rst_to_myst(text).costs is None
+    output = rst_to_myst(text, profile=True)
+    data = output.costs.as_dict()
+    assert {
+        name: (item["count"], item["conversions"])
+        for name, item in data["directives"].items()
+    } == {
+        "note": (1, {"parse_content": 1}),
+        "code-block": (1, {"direct": 1}),
+        "unknown": (1, {"eval_rst": 1}),
+    }
+    assert {
+        name: (item["count"], item["conversions"])
+        for name, item in data["roles"].items()
+    } == {
+        "ref": (2, {"direct": 2}),
+        "math": (1, {"dollarmath": 1}),
+        "(default)": (1, {"literal": 1}),
+    }
+    # times are inclusive of nested directives
+    note, code = data["directives"]["note"], data["directives"]["code-block"]
+    assert note["parse"] >= code["parse"] > 0
+    assert note["render"] >= code["render"] > 0
+    assert output.costs.format().startswith("COSTS (ms):")
+
+
+def test_costs_update():
+    costs = CostCounter()
+    for text in (".. note:: a", ".. note:: b\n\n.. unknown:: c"):
+        costs.update(rst_to_myst(text, use_sphinx=False, profile=True).costs)
+    data = costs.as_dict()
+    assert data["directives"]["note"]["count"] == 2
+    assert data["directives"]["unknown"]["conversions"] == {"eval_rst": 1}
+    # as_dict round-trips, e.g. from a report
+    merged = CostCounter()
+    merged.update(data)
+    assert merged.as_dict() == data
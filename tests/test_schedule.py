@@ -0,0 +1,44 @@
+from click.testing import CliRunner
+import pytest
+
+from rst_to_myst import cli
+from rst_to_myst.schedule import estimate_costs, lpt_order, parallel_efficiency
+
+
+def test_estimate_costs(tmp_path):
+    paths = []
+    for name, size in (("a", 100), ("b", 400), ("c", 200)):
+        path = tmp_path / f"{name}.rst"
+        path.write_text("x" * size, encoding="utf8")
+        paths.append(path)
+    a, b, c = paths
+    # sizes only
+    assert estimate_costs(paths, {}) == {a: 100, b: 400, c: 200}
+    # durations, with sizes scaled by the seconds per byte of known files
+    costs = estimate_costs(paths, {a: 1.0})
+    assert costs == {a: 1.0, b: pytest.approx(4.0), c: pytest.approx(2.0)}
+    assert lpt_order(costs) == [b, c, a]
+
+
+def test_parallel_efficiency():
+    assert parallel_efficiency(3.0, 2.0, 2) == 0.75
+    assert parallel_efficiency(1.0, 0.0, 2) == 0.0
+
+
+def test_convert_lpt(tmp_path):
+    tmp_path.joinpath("small.rst").write_text("a\n", encoding="utf8")
+    tmp_path.joinpath("large.rst").write_text("a\n\n" * 200, encoding="utf8")
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.convert, ["--no-sphinx", "--schedule", "lpt", str(tmp_path)]
+    )
+    assert result.exit_code == 0, result.output
+    # the largest file is converted first
+    assert result.output.index("large.rst") < result.output.index("small.rst")
+
+    result = runner.invoke(
+        cli.convert, ["--no-sphinx", "--schedule", "lpt", "-j", "2", str(tmp_path)]
+    )
+    assert result.exit_code == 0, result.output
+    assert "FILES: 0 written, 2 unchanged" in result.output
+    assert "parallel efficiency" in result.output
@@ -0,0 +1,210 @@
+from io import BytesIO, StringIO
+import json
+from pathlib import Path
+import socket
+import socketserver
+import threading
+import time
+
+import pytest
+
+from rst_to_myst import server as server_module
+from rst_to_myst.server import (
+    INTERNAL_ERROR,
+    INVALID_PARAMS,
+    METHOD_NOT_FOUND,
+    PARSE_ERROR,
+    Server,
+)
+
+
+def _requests(*requests) -> StringIO:
+    return StringIO(
+        "".join(
+            (request if isinstance(request, str) else json.dumps(request)) + "\n"
+            for request in requests
+        )
+    )
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_serve_stream(workers):
+    instream = _requests(
+        {"jsonrpc": "2.0", "id": 1, "method": "convert", "params": {"text": ":a:`b`"}},
+        {"jsonrpc": "2.0", "id": 2, "method": "tokens", "params": {"text": "*a*"}},
+        {"jsonrpc": "2.0", "id": 3, "method": "ast", "params": {"text": "*a*"}},
+        {"jsonrpc": "2.0", "id": 4, "method": "other", "params": {"text": "a"}},
+        "{not json",
+    )
+    outstream = StringIO()
+    with Server({"sphinx": False}, workers=workers) as server:
+        server.serve_stream(instream, outstream)
+    responses = {
+        response["id"]: response
+        for response in map(json.loads, outstream.getvalue().splitlines())
+    }
+    assert responses[1]["result"] == {
+        "text": "{a}`b`\n",
+        "extensions": [],
+        "warnings": [],
+    }
+    assert responses[2]["result"]["tokens"][0]["type"] == "paragraph_open"
+    assert "<emphasis>" in responses[3]["result"]["ast"]
+    assert responses[4]["error"]["code"] == METHOD_NOT_FOUND
+    assert responses[None]["error"]["code"] == PARSE_ERROR
+
+
+@pytest.mark.skipif(
+    not hasattr(socketserver, "ThreadingUnixStreamServer"),
+    reason="requires Unix sockets",
+)
+def test_serve_unix(tmp_path: Path):
+    socket_path = str(tmp_path / "server.sock")
+    server = Server({"sphinx": False})
+    thread = threading.Thread(target=server.serve_unix, args=(socket_path,))
+    thread.daemon = True
+    thread.start()
+    for _ in range(100):
+        if Path(socket_path).exists():
+            break
+        time.sleep(0.01)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        request = {"jsonrpc": "2.0", "id": 1, "method": "convert"}
+        request["params"] = {"text": "*a*", "dollar_math": False}
+        client.sendall((json.dumps(request) + "\n").encode("utf8"))
+        client.shutdown(socket.SHUT_WR)
+        response = json.loads(client.makefile("rb").readline())
+    assert response["result"]["text"] == "*a*\n"
+
+
+@pytest.mark.skipif(
+    not hasattr(socketserver, "ThreadingUnixStreamServer"),
+    reason="requires Unix sockets",
+)
+def test_serve_unix_existing(tmp_path: Path):
+    """An existing file or live socket is kept, and a stale socket replaced."""
+    file_path = tmp_path / "file"
+    file_path.write_text("content")
+    with Server({"sphinx": False}) as server, pytest.raises(FileExistsError):
+        server.serve_unix(str(file_path))
+    assert file_path.read_text() == "content"
+
+    socket_path = str(tmp_path / "server.sock")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as live:
+        live.bind(socket_path)
+        live.listen()
+        with Server({"sphinx": False}) as server, pytest.raises(FileExistsError):
+            server.serve_unix(socket_path)
+        assert Path(socket_path).exists()
+    # the socket file remains once closed (stale)
+
+    ready = threading.Event()
+    server = Server({"sphinx": False})
+    thread = threading.Thread(
+        target=server.serve_unix, args=(socket_path, ready.set), daemon=True
+    )
+    thread.start()
+    assert ready.wait(10)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+
+
+class _DisconnectedFile:
+    def write(self, data: bytes) -> int:
+        raise BrokenPipeError("client disconnected")
+
+    def flush(self) -> None:
+        pass
+
+
+def test_serve_connection_disconnected():
+    """Responses to a disconnected client are dropped, without blocking."""
+    request = {"jsonrpc": "2.0", "id": 1, "method": "convert", "params": {"text": "a"}}
+    rfile = BytesIO(b"{not json\n" + json.dumps(request).encode("utf8") + b"\n")
+    with Server({"sphinx": False}) as server:
+        thread = threading.Thread(
+            target=server.serve_connection, args=(rfile, _DisconnectedFile())
+        )
+        thread.start()
+        thread.join(10)
+        assert not thread.is_alive()
+
+
+def test_invalid_params():
+    """Params of the wrong type are rejected, and later requests still answered."""
+    instream = _requests(
+        {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "convert",
+            "params": {"text": "a", "cite_prefix": 1},
+        },
+        {
+            "jsonrpc": "2.0",
+            "id": 2,
+            "method": "convert",
+            "params": {"text": "a", "extensions": [1]},
+        },
+        {"jsonrpc": "2.0", "id": 3, "method": "convert", "params": {"text": "*a*"}},
+    )
+    outstream = StringIO()
+    with Server({"sphinx": False}) as server:
+        server.serve_stream(instream, outstream)
+    responses = {
+        response["id"]: response
+        for response in map(json.loads, outstream.getvalue().splitlines())
+    }
+    assert responses[1]["error"]["code"] == INVALID_PARAMS
+    assert "cite_prefix" in responses[1]["error"]["message"]
+    assert responses[2]["error"]["code"] == INVALID_PARAMS
+    assert responses[3]["result"]["text"] == "*a*\n"
+
+
+def test_internal_error(monkeypatch):
+    def _fail(**options):
+        raise RuntimeError("unexpected")
+
+    monkeypatch.setattr(server_module, "conversion_options", _fail)
+    responses = []
+    with Server({"sphinx": False}) as server:
+        server.handle_line(
+            json.dumps(
+                {
+                    "jsonrpc": "2.0",
+                    "id": 7,
+                    "method": "convert",
+                    "params": {"text": "a"},
+                }
+            ),
+            responses.append,
+        )
+    assert responses[0]["id"] == 7
+    assert responses[0]["error"]["code"] == INTERNAL_ERROR
+
+
+def test_max_pending(monkeypatch):
+    """Handling a request blocks while the maximum number are in flight."""
+    release = threading.Event()
+
+    def _blocking(method, text, options):
+        release.wait()
+        return {"text": text}
+
+    monkeypatch.setattr(server_module, "run_request", _blocking)
+    responses = []
+    line = json.dumps(
+        {"jsonrpc": "2.0", "id": 1, "method": "convert", "params": {"text": "a"}}
+    )
+    with Server({"sphinx": False}, max_pending=2) as server:
+        server.handle_line(line, responses.append)
+        server.handle_line(line, responses.append)
+        thread = threading.Thread(
+            target=server.handle_line, args=(line, responses.append)
+        )
+        thread.start()
+        thread.join(0.1)
+        assert thread.is_alive()
+        release.set()
+        thread.join()
+    assert len(responses) == 3
@@ -0,0 +1,84 @@
+import json
+
+from click.testing import CliRunner
+import pytest
+
+from rst_to_myst import cli
+from rst_to_myst.shard import Sharder, balance, hash_shard, load_manifest, parse_shard
+
+
+def test_parse_shard():
+    assert parse_shard("2/3") == (2, 3)
+    for text in ("2", "0/3", "4/3", "a/b"):
+        with pytest.raises(ValueError):
+            parse_shard(text)
+
+
+def test_hash_shard_stable():
+    # the assignment must not change between runs or machines
+    assert [hash_shard(f"docs/{index}.rst", 3) for index in range(6)] == [
+        2,
+        2,
+        2,
+        3,
+        2,
+        1,
+    ]
+
+
+def test_balance():
+    weights = {"a": 10, "b": 6, "c": 5, "d": 4, "e": 1}
+    assert balance(weights, 2) == {"a": 1, "b": 2, "c": 2, "d": 1, "e": 2}
+
+
+def test_load_manifest_report(tmp_path):
+    path = tmp_path / "report.jsonl"
+    path.write_text(
+        json.dumps({"input": "a.rst", "input_bytes": 10, "status": "cached"})
+        + "\n"
+        + json.dumps({"input": "b/c.rst", "input_bytes": 5, "status": "converted"})
+        + "\n",
+        encoding="utf8",
+    )
+    assert load_manifest(path) == {"a.rst": 10.0, "b/c.rst": 5.0}
+
+
+def test_shards_partition(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    paths = [tmp_path / f"{index}.rst" for index in range(20)]
+    manifest = {"0.rst": 100, "1.rst": 50}
+    selected = [set(Sharder(index, 3, manifest).select(paths)) for index in range(1, 4)]
+    assert set().union(*selected) == set(paths)
+    assert sum(len(shard) for shard in selected) == len(paths)
+    assert tmp_path / "0.rst" in selected[0]
+    assert tmp_path / "1.rst" in selected[1]
+
+
+def test_convert_shards_and_merge(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for index in range(6):
+        tmp_path.joinpath(f"{index}.rst").write_text(
+            "term\n  definition\n" if index == 0 else "`a`\n", encoding="utf8"
+        )
+    runner = CliRunner()
+    for shard in ("1/2", "2/2"):
+        result = runner.invoke(
+            cli.convert,
+            [
+                *("--no-sphinx", "--shard", shard),
+                *("--report", f"report{shard[0]}.jsonl", "."),
+            ],
+        )
+        assert result.exit_code == 0, result.output
+        assert f"SHARD: {shard}" in result.output
+    assert len(list(tmp_path.glob("*.md"))) == 6
+
+    result = runner.invoke(
+        cli.merge_reports,
+        ["report1.jsonl", "report2.jsonl", "--output", "merged.jsonl"],
+    )
+    assert result.exit_code == 0, result.output
+    assert "files: 6\n" in result.output
+    assert "  converted: 6\n" in result.output
+    assert "extensions:\n- deflist\n" in result.output
+    assert len(tmp_path.joinpath("merged.jsonl").read_text("utf8").splitlines()) == 6
@@ -0,0 +1,125 @@
+"""Test conversions running concurrently in threads."""
+
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+import sys
+import threading
+
+from docutils import nodes
+import pytest
+
+from rst_to_myst import rst_to_myst
+from rst_to_myst.corpus import generate_document
+from rst_to_myst.namespace import compile_namespace
+
+# a mix of nested content (nested parses), warnings (docutils and mdformat),
+# and a custom (sphinx) extension
+TEXTS = [
+    generate_document(seed=seed, sections=2, list_depth=3) for seed in range(4)
+] + [
+    "Title\n=====\n\n`unclosed\n\n- a\n\n  - b\n\n    .. note::\n\n       c\n",
+    "| line *one*\n| line two\n\n:: \n\n   literal\n\n.. unknown::\n\n   x\n",
+    ".. autosummary::\n\n   a.b\n\n:math:`x` and |sub|\n\n.. |sub| replace:: s\n",
+]
+
+OPTIONS = {"extensions": ["sphinx.ext.autosummary"]}
+
+
+def _convert(text):
+    stream = StringIO()
+    output = rst_to_myst(text, warning_stream=stream, **OPTIONS)
+    return output.text, stream.getvalue(), sorted(output.extensions)
+
+
+@pytest.fixture(autouse=True)
+def switch_often():
+    """Switch threads often, to expose any races."""
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def test_concurrent_conversions_match_serial():
+    expected = [_convert(text) for text in TEXTS]
+    assert any(warnings for _, warnings, _ in expected)
+    texts = TEXTS * 4
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(_convert, texts))
+    assert results == expected * 4
+
+
+def test_concurrent_compile_namespace():
+    expected = compile_namespace(extensions=["sphinx.ext.autosummary"])
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        namespaces = list(
+            executor.map(
+                lambda _: compile_namespace(extensions=["sphinx.ext.autosummary"]),
+                range(16),
+            )
+        )
+    for namespace in namespaces:
+        assert namespace.list_directives() == expected.list_directives()
+        assert namespace.list_roles() == expected.list_roles()
+
+
+def test_docutils_parser_unaffected():
+    """The state classes of docutils itself do not share the nested state machines
+    of conversions, so docutils can still parse (in the same thread) afterwards."""
+    from docutils.core import publish_doctree
+
+    text = (
+        ":a: first\n:b: second\n\n    .. note:: hi\n:c: third\n\n    .. note:: there\n"
+    )
+    rst_to_myst(text)
+    document = publish_doctree(text, settings_overrides={"report_level": 5})
+    assert len(list(document.findall(nodes.note))) == 2
+
+
+def test_compile_namespace_waits_for_recording():
+    """Namespaces do not read the registries while an extension is recorded."""
+    from docutils.parsers.rst import roles
+
+    from rst_to_myst import namespace
+
+    results = []
+    thread = threading.Thread(
+        target=lambda: results.append(compile_namespace(use_sphinx=False))
+    )
+    with namespace.LOCK:
+        # as replaced by ``_record_extension``
+        original = roles._roles
+        roles._roles = {**original, "recorded": object()}
+        try:
+            thread.start()
+            thread.join(0.1)
+            assert thread.is_alive()
+        finally:
+            roles._roles = original
+    thread.join()
+    assert "recorded" not in results[0].roles
+
+
+def test_compile_namespace_keyword_setup(monkeypatch):
+    """Registrations made with keyword arguments are replayed."""
+    from types import ModuleType
+
+    from docutils.parsers.rst import Directive
+
+    class KeywordDirective(Directive):
+        pass
+
+    def keyword_role(name, rawtext, text, lineno, inliner, options=None, content=()):
+        return [], []
+
+    def setup(app):
+        app.add_directive("keyword-directive", cls=KeywordDirective)
+        app.add_role(name="keyword-role", role=keyword_role)
+        return {"parallel_read_safe": True}
+
+    module = ModuleType("keyword_setup_extension")
+    module.setup = setup
+    monkeypatch.setitem(sys.modules, module.__name__, module)
+    namespace = compile_namespace(extensions=[module.__name__])
+    assert namespace.directives["keyword-directive"] is KeywordDirective
+    assert namespace.roles["keyword-role"] is keyword_role
@@ -0,0 +1,28 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+from rst_to_myst.watch import InotifyWatcher, PollingWatcher
+
+WATCHERS = [PollingWatcher]
+if sys.platform.startswith("linux"):
+    WATCHERS.append(InotifyWatcher)
+
+
+@pytest.mark.parametrize("watcher_cls", WATCHERS)
+def test_watcher(tmp_path: Path, watcher_cls):
+    tmp_path.joinpath("skip").mkdir()
+    tmp_path.joinpath("a.rst").write_text("a", encoding="utf8")
+    kwargs = {"interval": 0.01} if watcher_cls is PollingWatcher else {}
+    with watcher_cls([str(tmp_path)], exclude=["skip"], **kwargs) as watcher:
+        assert watcher.wait(timeout=0.05, debounce=0.05) == set()
+        tmp_path.joinpath("a.rst").write_text("a changed", encoding="utf8")
+        tmp_path.joinpath("a.md").write_text("a", encoding="utf8")
+        tmp_path.joinpath("skip", "b.rst").write_text("b", encoding="utf8")
+        tmp_path.joinpath("new").mkdir()
+        tmp_path.joinpath("new", "c.rst").write_text("c", encoding="utf8")
+        assert watcher.wait(timeout=2, debounce=0.05) == {
+            tmp_path / "a.rst",
+            tmp_path / "new" / "c.rst",
+        }